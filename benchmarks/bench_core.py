@@ -0,0 +1,115 @@
+# benchmarks.bench_core
+# Benchmarks of point decoding, row buffering and time conversion
+#
+# Author:   PingThings
+# Created:  Sun Nov 01 09:55:14 2026 -0500
+#
+# For license information, see LICENSE.txt
+# ID: bench_core.py [] allen@pingthings.io $
+
+"""
+Benchmarks of point decoding, row buffering and time conversion, which do
+not send any requests.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from btrdb.point import RawPoint, StatPoint
+from btrdb.utils.buffer import PointBuffer
+from btrdb.utils.timez import to_nanoseconds
+from btrdb.grpcinterface import btrdb_pb2
+
+from conftest import START, INTERVAL, SIZES, STREAM_COUNTS
+
+
+##########################################################################
+## Point Benchmarks
+##########################################################################
+
+@pytest.mark.parametrize("points", SIZES)
+def bench_raw_from_proto_list(throughput, points):
+    protos = [btrdb_pb2.RawPoint(time=START + idx, value=float(idx)) for idx in range(points)]
+    throughput(points, RawPoint.from_proto_list, protos)
+
+
+@pytest.mark.parametrize("points", SIZES)
+def bench_stat_from_proto_list(throughput, points):
+    protos = [
+        btrdb_pb2.StatPoint(time=START + idx, min=0.0, mean=1.0, max=2.0, count=10, stddev=0.5)
+        for idx in range(points)
+    ]
+    throughput(points, StatPoint.from_proto_list, protos)
+
+
+##########################################################################
+## PointBuffer Benchmarks
+##########################################################################
+
+def align(streams):
+    """
+    Merges lists of points into rows like `StreamSet.rows`.
+    """
+    buffer = PointBuffer(len(streams))
+    iterators = [iter(points) for points in streams]
+    rows = []
+    while True:
+        empty = True
+        for idx, points in enumerate(iterators):
+            if buffer.active[idx]:
+                try:
+                    buffer.add_point(idx, next(points))
+                    empty = False
+                except StopIteration:
+                    buffer.deactivate(idx)
+
+        key = buffer.next_key_ready()
+        if key:
+            rows.append(tuple(buffer.pop(key)))
+        if empty and len(buffer.keys()) == 0:
+            return rows
+
+
+@pytest.mark.parametrize("count", STREAM_COUNTS)
+@pytest.mark.parametrize("points", SIZES[:2])
+def bench_point_buffer(throughput, count, points):
+    # every other stream is offset by one interval, so that rows are partial
+    streams = [
+        [RawPoint(START + (offset + idx) * INTERVAL, float(idx)) for idx in range(points)]
+        for offset in (idx % 2 for idx in range(count))
+    ]
+    throughput(count * points, align, streams)
+
+
+##########################################################################
+## Time Conversion Benchmarks
+##########################################################################
+
+VALUES = 10000
+
+TIMES = {
+    "int": lambda idx: START + idx,
+    "float": lambda idx: float(START + idx),
+    "datetime": lambda idx: datetime(2017, 7, 14, tzinfo=timezone.utc) + timedelta(microseconds=idx),
+    "str": lambda idx: "2017-07-14 02:40:00.{:06d}".format(idx % 1000000),
+}
+
+
+def convert(values):
+    return [to_nanoseconds(value) for value in values]
+
+
+@pytest.mark.parametrize("kind", sorted(TIMES) + ["datetime64"])
+def bench_to_nanoseconds(throughput, kind):
+    if kind == "datetime64":
+        np = pytest.importorskip("numpy")
+        # nanosecond datetime64 values cannot be converted to datetime
+        values = [np.datetime64(START // 1000 + idx, "us") for idx in range(VALUES)]
+    else:
+        values = [TIMES[kind](idx) for idx in range(VALUES)]
+    throughput(VALUES, convert, values)
@@ -0,0 +1,48 @@
+# benchmarks.bench_inserts
+# Benchmarks of stream inserts
+#
+# Author:   PingThings
+# Created:  Sun Nov 01 09:55:14 2026 -0500
+#
+# For license information, see LICENSE.txt
+# ID: bench_inserts.py [] allen@pingthings.io $
+
+"""
+Benchmarks of stream inserts
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import pytest
+
+from conftest import SIZES, STREAM_COUNTS, make_points
+
+
+##########################################################################
+## Insert Benchmarks
+##########################################################################
+
+@pytest.mark.parametrize("points", SIZES)
+def bench_insert(throughput, server, db, points):
+    data = make_points(points)
+
+    def setup():
+        # insert into a new stream in each round so that every round does
+        # the same work on the server
+        stream = db.stream_from_uuid(server.add_stream("benchmarks/insert"))
+        return (stream, data), {}
+
+    throughput(points, lambda stream, data: stream.insert(data), setup=setup)
+
+
+@pytest.mark.parametrize("count", STREAM_COUNTS)
+def bench_streamset_insert(throughput, server, db, count):
+    data = make_points(10000)
+
+    def setup():
+        streams = db.streams(*(server.add_stream("benchmarks/insert") for _ in range(count)))
+        return (streams, [data] * count), {}
+
+    throughput(count * len(data), lambda streams, data: streams.insert(data), setup=setup)
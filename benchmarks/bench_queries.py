@@ -0,0 +1,64 @@
+# benchmarks.bench_queries
+# Benchmarks of stream queries and StreamSet row alignment
+#
+# Author:   PingThings
+# Created:  Sun Nov 01 09:55:14 2026 -0500
+#
+# For license information, see LICENSE.txt
+# ID: bench_queries.py [] allen@pingthings.io $
+
+"""
+Benchmarks of stream queries and StreamSet row alignment
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import pytest
+
+from conftest import START, SIZES, STREAM_COUNTS, end_of
+
+
+##########################################################################
+## Stream Benchmarks
+##########################################################################
+
+@pytest.mark.parametrize("points", SIZES)
+def bench_values(throughput, dataset, points):
+    stream = dataset(1, points)[0]
+    throughput(points, stream.values, START, end_of(points))
+
+
+@pytest.mark.parametrize("points", SIZES)
+def bench_aligned_windows(throughput, dataset, points):
+    # windows of 2^20 ns hold about one point each, so that as many
+    # StatPoints as raw points are decoded
+    stream = dataset(1, points)[0]
+    windows = len(stream.aligned_windows(START, end_of(points), 20))
+    throughput(windows, stream.aligned_windows, START, end_of(points), 20)
+
+
+@pytest.mark.parametrize("points", SIZES)
+def bench_windows(throughput, dataset, points):
+    stream = dataset(1, points)[0]
+    windows = len(stream.windows(START, end_of(points), 2000000))
+    throughput(windows, stream.windows, START, end_of(points), 2000000)
+
+
+##########################################################################
+## StreamSet Benchmarks
+##########################################################################
+
+@pytest.mark.parametrize("count", STREAM_COUNTS)
+@pytest.mark.parametrize("points", SIZES[:2])
+def bench_streamset_values(throughput, dataset, count, points):
+    streams = dataset(count, points)
+    throughput(count * points, streams.values)
+
+
+@pytest.mark.parametrize("count", STREAM_COUNTS)
+@pytest.mark.parametrize("points", SIZES[:2])
+def bench_streamset_rows(throughput, dataset, count, points):
+    streams = dataset(count, points)
+    throughput(count * points, streams.rows)
@@ -0,0 +1,57 @@
+# benchmarks.bench_transformers
+# Benchmarks of the StreamSet transformers
+#
+# Author:   PingThings
+# Created:  Sun Nov 01 09:55:14 2026 -0500
+#
+# For license information, see LICENSE.txt
+# ID: bench_transformers.py [] allen@pingthings.io $
+
+"""
+Benchmarks of the StreamSet transformers. Each transformer queries its
+streams, so compare with bench_streamset_values and bench_streamset_rows to
+tell the transformation from the query.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import io
+
+import pytest
+
+from conftest import STREAM_COUNTS
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+POINTS = 2000
+
+# the transformers by name with the module they require
+TRANSFORMERS = {
+    "to_array": (lambda streams: streams.to_array(), "numpy"),
+    "to_series": (lambda streams: streams.to_series(), "pandas"),
+    "to_dataframe": (lambda streams: streams.to_dataframe(), "pandas"),
+    "to_dict": (lambda streams: streams.to_dict(), None),
+    "to_csv": (lambda streams: streams.to_csv(io.StringIO()), None),
+    "to_table": (lambda streams: streams.to_table(), "tabulate"),
+    "to_dask": (lambda streams: streams.to_dask(partition_freq="1s").compute(), "dask.dataframe"),
+}
+
+
+##########################################################################
+## Transformer Benchmarks
+##########################################################################
+
+@pytest.mark.parametrize("count", STREAM_COUNTS)
+@pytest.mark.parametrize("name", sorted(TRANSFORMERS))
+def bench_transformer(throughput, dataset, name, count):
+    transform, requires = TRANSFORMERS[name]
+    if requires is not None:
+        pytest.importorskip(requires)
+
+    streams = dataset(count, POINTS)
+    throughput(count * POINTS, transform, streams)
@@ -0,0 +1,123 @@
+# benchmarks.conftest
+# Fixtures shared by the benchmark suite
+#
+# Author:   PingThings
+# Created:  Sun Nov 01 09:55:14 2026 -0500
+#
+# For license information, see LICENSE.txt
+# ID: conftest.py [] allen@pingthings.io $
+
+"""
+Fixtures shared by the benchmark suite. Queries and inserts are sent to an
+in-process FakeServer, so the benchmarks measure the client end-to-end
+(including gRPC and protobuf) and the fake server's own work.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import pytest
+
+from btrdb.stream import StreamSet
+from btrdb.utils.fake import FakeServer
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+# the time of the first point and the interval between points (1 ms)
+START = 1500000000000000000
+INTERVAL = 1000000
+
+# the number of points per stream and streams per StreamSet benchmarked
+SIZES = (1000, 10000, 100000)
+STREAM_COUNTS = (1, 4, 16)
+
+
+def end_of(points):
+    return START + points * INTERVAL
+
+
+def make_points(points, offset=0):
+    return [(START + (offset + idx) * INTERVAL, float(idx % 1000)) for idx in range(points)]
+
+
+##########################################################################
+## Hooks
+##########################################################################
+
+def pytest_sessionstart(session):
+    """
+    Fails a comparison (e.g. `make benchmark`) if there is no baseline to
+    compare with, instead of only warning and passing.
+    """
+    bs = getattr(session.config, "_benchmarksession", None)
+    if bs is not None and bs.compare and not bs.compared_mapping:
+        raise pytest.UsageError(
+            "no benchmark baseline to compare with in {}, save one with "
+            "`make benchmark-baseline`".format(bs.storage)
+        )
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+@pytest.fixture(scope="session")
+def server():
+    with FakeServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def db(server):
+    return server.connect()
+
+
+@pytest.fixture(scope="session")
+def dataset(server, db):
+    """
+    Returns a function creating (once) `count` streams of `points` points
+    and returning them as a StreamSet filtered to the points, with the
+    metadata and versions of its streams known so that no round trips other
+    than the queries are benchmarked.
+    """
+    cache = {}
+
+    def make(count, points):
+        if (count, points) not in cache:
+            collection = "benchmarks/{}x{}".format(count, points)
+            for idx in range(count):
+                server.add_stream(
+                    collection, tags={"name": "stream{:02d}".format(idx), "unit": "V"},
+                    points=make_points(points, offset=idx % 2),
+                )
+            streams = sorted(db.streams_in_collection(collection), key=lambda s: s.name)
+            streams = StreamSet(streams).filter(start=START, end=end_of(points + 1))
+            cache[(count, points)] = streams.pin_versions()
+        return cache[(count, points)]
+    return make
+
+
+@pytest.fixture
+def throughput(benchmark):
+    """
+    Returns a function benchmarking func with args and recording the number
+    of points it handles and its points per second in the extra info of the
+    benchmark. With setup, func is called with the args returned by setup in
+    each round instead (see `benchmark.pedantic`).
+    """
+    def run(points, func, *args, setup=None, rounds=10):
+        if setup is None:
+            result = benchmark(func, *args)
+        else:
+            result = benchmark.pedantic(func, setup=setup, rounds=rounds)
+
+        benchmark.extra_info["points"] = points
+        stats = getattr(benchmark, "stats", None)
+        if stats is not None:
+            benchmark.extra_info["points_per_second"] = points / stats.stats.mean
+        return result
+    return run
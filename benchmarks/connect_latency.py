@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# benchmarks.connect_latency
+# Compares first query latency of cold and warmed up connections
+#
+# Author:   PingThings
+# Created:  Fri Oct 23 15:42:11 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: connect_latency.py [] allen@pingthings.io $
+
+"""
+Compares the latency of the first query on a lazily connected (cold) client
+with a client created with `warmup=True`, which connects before returning.
+
+Usage::
+
+    $ BTRDB_ENDPOINTS=... BTRDB_API_KEY=... python benchmarks/connect_latency.py -n 20
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import argparse
+import statistics
+
+import btrdb
+
+
+##########################################################################
+## Benchmark
+##########################################################################
+
+def measure(runs, **kwargs):
+    """
+    Returns lists of the connect and first query times in seconds. Each
+    connection is closed after it is measured so that the next one cannot
+    reuse its connected subchannels.
+    """
+    connects, queries = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        db = btrdb.connect(**kwargs)
+        try:
+            connected = time.perf_counter()
+            db.info()
+            queries.append(time.perf_counter() - connected)
+            connects.append(connected - started)
+        finally:
+            db.close()
+    return connects, queries
+
+
+def summarize(name, values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    print("{:<24} median {:8.2f} ms   p95 {:8.2f} ms".format(
+        name, statistics.median(values) * 1000, p95 * 1000
+    ))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-e", "--endpoints", default=None, help="the BTrDB address, by default $BTRDB_ENDPOINTS")
+    parser.add_argument("-k", "--apikey", default=None, help="the API key, by default $BTRDB_API_KEY")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="the number of connections of each kind")
+    args = parser.parse_args(args)
+
+    for warmup in (False, True):
+        label = "warm" if warmup else "cold"
+        connects, queries = measure(args.runs, conn_str=args.endpoints, apikey=args.apikey, warmup=warmup)
+        summarize("{} connect".format(label), connects)
+        summarize("{} first query".format(label), queries)
+        summarize("{} total".format(label), [c + q for c, q in zip(connects, queries)])
+
+
+if __name__ == "__main__":
+    main()
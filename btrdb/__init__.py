@@ -15,11 +15,15 @@ Package for the btrdb database library.
 ## Imports
 ##########################################################################
 
-from btrdb.conn import Connection, BTrDB
+from btrdb.conn import Connection, BTrDB, DEFAULT_WARMUP_TIMEOUT, DEFAULT_MAX_CONCURRENCY
 from btrdb.endpoint import Endpoint
 from btrdb.exceptions import ConnectionError
 from btrdb.version import get_version
 from btrdb.utils.credentials import credentials_by_profile, credentials
+from btrdb.utils.mash import MashRouter
+from btrdb.utils.retry import RetryPolicy
+from btrdb.utils.limiter import Limiter
+from btrdb.utils.metrics import Metrics, InMemoryMetrics, PrometheusMetrics
 from btrdb.stream import MINIMUM_TIME, MAXIMUM_TIME
 
 ##########################################################################
@@ -37,17 +41,71 @@ BTRDB_PROFILE = "BTRDB_PROFILE"
 ## Functions
 ##########################################################################
 
-def _connect(endpoints=None, apikey=None):
-    return BTrDB(Endpoint(Connection(endpoints, apikey=apikey).channel))
-
-def connect(conn_str=None, apikey=None, profile=None):
+def _connect(endpoints=None, apikey=None, pool_size=1, balancing="round_robin",
+             mash_routing=False, discover_proxies=False, retry=None, timeout=None,
+             warmup=False, keepalive_time=None, idle_timeout=None, limiter=None,
+             metrics=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    if retry is True:
+        retry = RetryPolicy()
+
+    # the arguments needed to reconnect after pickling or forking
+    spec = {
+        "endpoints": endpoints, "apikey": apikey, "pool_size": pool_size, "balancing": balancing,
+        "mash_routing": mash_routing, "discover_proxies": discover_proxies, "retry": retry,
+        "timeout": timeout, "warmup": warmup, "keepalive_time": keepalive_time,
+        "idle_timeout": idle_timeout, "limiter": limiter, "metrics": metrics,
+        "max_concurrency": max_concurrency,
+    }
+
+    channel_options = {}
+    if keepalive_time is not None:
+        channel_options.update(keepalive_time=keepalive_time)
+    if idle_timeout is not None:
+        channel_options.update(idle_timeout=idle_timeout)
+
+    if pool_size == 1 and timeout is None and not (
+        mash_routing or discover_proxies or retry or warmup or channel_options or limiter
+        or metrics or "," in (endpoints or "")
+    ):
+        return BTrDB(
+            Endpoint(Connection(endpoints, apikey=apikey).channel),
+            max_concurrency=max_concurrency, connection_spec=spec,
+        )
+
+    conn = Connection(endpoints, apikey=apikey, pool_size=pool_size, **channel_options)
+    if discover_proxies:
+        for address in Endpoint(conn.channel).info().proxy.proxyEndpoints:
+            try:
+                conn.add_address(address)
+            except ValueError:
+                # e.g. an insecure proxy address when using an API key
+                continue
+
+    if warmup:
+        # discovered proxies that cannot be reached are dropped
+        conn.warmup(DEFAULT_WARMUP_TIMEOUT if warmup is True else warmup, drop_unready=discover_proxies)
+
+    channels = conn.channels if len(conn.channels) > 1 else conn.channel
+    endpoint = Endpoint(
+        channels, balancing=balancing, retry=retry, timeout=timeout, limiter=limiter, metrics=metrics
+    )
+    if mash_routing:
+        open_channel = lambda address: endpoint.instrument(conn.open_channel(address))
+        endpoint.stub = MashRouter(endpoint.stub, open_channel)
+    return BTrDB(endpoint, max_concurrency=max_concurrency, connection_spec=spec)
+
+def connect(conn_str=None, apikey=None, profile=None, pool_size=1, balancing="round_robin",
+            mash_routing=False, discover_proxies=False, retry=None, timeout=None,
+            warmup=False, keepalive_time=None, idle_timeout=None, limiter=None, metrics=None,
+            max_concurrency=DEFAULT_MAX_CONCURRENCY):
     """
     Connect to a BTrDB server.
 
     Parameters
     ----------
     conn_str: str, default=None
-        The address and port of the cluster to connect to, e.g. `192.168.1.1:4411`.
+        The address and port of the cluster to connect to, e.g. `192.168.1.1:4411`,
+        or a comma separated list of proxy addresses to spread requests across.
         If set to None, will look in the environment variable `$BTRDB_ENDPOINTS`
         (recommended).
     apikey: str, default=None
@@ -57,6 +115,56 @@ def connect(conn_str=None, apikey=None, profile=None):
         The name of a profile containing the required connection information as
         found in the user's predictive grid credentials file
         `~/.predictivegrid/credentials.yaml`.
+    pool_size: int, default=1
+        The number of channels (HTTP/2 connections) to open to each address.
+        RPCs are dispatched across the channels, which allows concurrent
+        queries to use more bandwidth than a single connection provides.
+    balancing: str, default="round_robin"
+        How RPCs are assigned to channels when there is more than one:
+        "round_robin" or "least_outstanding" (the channel with the fewest
+        requests in flight).
+    mash_routing: bool, default=False
+        Fetch the cluster map at connect time and send requests for a single
+        stream directly to the node that owns the stream instead of through
+        the proxy, removing a network hop from data queries and inserts.
+    discover_proxies: bool, default=False
+        Also connect to the proxies listed in the server info. Requests are
+        spread across all proxies and retried on another proxy if one is
+        unavailable (inserts and other writes only if they were not sent).
+    retry: RetryPolicy or bool, default=None
+        Retry idempotent reads (raw values, windows, nearest, stream info and
+        lookups) that fail with transient errors, resuming streaming reads
+        after the last point received. Pass True for the default policy or a
+        RetryPolicy to configure backoff and hedged requests.
+    timeout: float, default=None
+        The default deadline in seconds of queries (raw values, windows,
+        nearest and stream info). Queries that take longer are cancelled and
+        raise DeadlineExceeded. Individual queries may override it.
+    warmup: bool or float, default=False
+        Connect eagerly, waiting until the connection is ready (at most 10
+        seconds, or the given number of seconds) so the first query does not
+        pay for connection setup. Raises ConnectionError if the server cannot
+        be reached in time. With `discover_proxies`, proxies that cannot be
+        reached are dropped as long as one of them is ready.
+    keepalive_time: float, default=None
+        Seconds between keepalive pings, which keep idle connections open
+        and detect broken ones before the next query. The server must allow
+        pings at this rate.
+    idle_timeout: float, default=None
+        Seconds without requests after which a connection is closed and
+        re-established on the next request (gRPC's default is 30 minutes).
+    limiter: Limiter, default=None
+        Limit the number of concurrent requests and the points or bytes per
+        second read and inserted, protecting a shared cluster from parallel
+        queries and inserts. Requests wait until they are admitted; see
+        `Limiter.stats` for the time spent waiting.
+    metrics: Metrics, default=None
+        Report the latency, status, messages, points and bytes of every
+        request and the time spent decoding query results to a metrics
+        collector such as PrometheusMetrics or InMemoryMetrics.
+    max_concurrency: int, default=8
+        The maximum number of requests that multi-stream operations (e.g.
+        StreamSet queries and inserts) have in flight at once.
 
     Returns
     -------
@@ -68,14 +176,41 @@ def connect(conn_str=None, apikey=None, profile=None):
     if conn_str and profile:
         raise ValueError("Received both conn_str and profile arguments.")
 
+    # only pass channel options that differ from the defaults
+    options = {}
+    if pool_size > 1:
+        options.update(pool_size=pool_size)
+    if balancing != "round_robin":
+        options.update(balancing=balancing)
+    if mash_routing:
+        options.update(mash_routing=True)
+    if discover_proxies:
+        options.update(discover_proxies=True)
+    if retry:
+        options.update(retry=retry)
+    if timeout is not None:
+        options.update(timeout=timeout)
+    if warmup:
+        options.update(warmup=warmup)
+    if keepalive_time is not None:
+        options.update(keepalive_time=keepalive_time)
+    if idle_timeout is not None:
+        options.update(idle_timeout=idle_timeout)
+    if limiter is not None:
+        options.update(limiter=limiter)
+    if metrics is not None:
+        options.update(metrics=metrics)
+    if max_concurrency != DEFAULT_MAX_CONCURRENCY:
+        options.update(max_concurrency=max_concurrency)
+
     # use specific profile if requested
     if profile:
-        return _connect(**credentials_by_profile(profile))
+        return _connect(**credentials_by_profile(profile), **options)
 
     # resolve credentials using combination of arguments, env
     creds = credentials(conn_str, apikey)
     if "endpoints" in creds:
-        return _connect(**creds)
+        return _connect(**creds, **options)
 
     raise ConnectionError("Could not determine credentials to use.")
 
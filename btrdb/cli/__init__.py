@@ -0,0 +1,55 @@
+# btrdb.cli
+# Command line utilities for bulk loading and exporting BTrDB data
+#
+# Author:   PingThings
+# Created:  Tue Oct 20 09:03:17 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: __init__.py [] allen@pingthings.io $
+
+"""
+Command line utilities for bulk loading and exporting BTrDB data
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import btrdb
+
+
+##########################################################################
+## Helpers
+##########################################################################
+
+def add_connection_arguments(parser):
+    """
+    Adds the arguments used to connect to BTrDB to an argparse parser.
+    """
+    group = parser.add_argument_group("connection")
+    group.add_argument(
+        "--endpoints", default=None, metavar="ADDR:PORT",
+        help="address of the cluster, defaults to $BTRDB_ENDPOINTS",
+    )
+    group.add_argument(
+        "--apikey", default=None,
+        help="API key used to authenticate, defaults to $BTRDB_API_KEY",
+    )
+    group.add_argument(
+        "--profile", default=None,
+        help="name of a profile in the predictive grid credentials file",
+    )
+    group.add_argument(
+        "-w", "--workers", type=int, default=8,
+        help="maximum number of concurrent requests (default: %(default)s)",
+    )
+    return parser
+
+
+def connect(args):
+    """
+    Returns a BTrDB connection using the parsed connection arguments.
+    """
+    db = btrdb.connect(conn_str=args.endpoints, apikey=args.apikey, profile=args.profile)
+    db.max_concurrency = args.workers
+    return db
@@ -0,0 +1,378 @@
+# btrdb.cli.exporter
+# Command line tool for bulk exporting BTrDB streams to data files
+#
+# Author:   PingThings
+# Created:  Tue Oct 20 14:26:51 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: exporter.py [] allen@pingthings.io $
+
+"""
+Command line tool for bulk exporting BTrDB streams to data files.
+
+Streams matching a collection prefix and tags are exported as raw values,
+aligned windows or windows. Output is partitioned into one file per stream
+and (UTC) day, fetched in parallel, and written atomically so that an
+interrupted export can be resumed by running the same command again.
+
+Example::
+
+    btrdb-export --collection sensors/ --start 2020-01-01 --end 2020-02-01 \\
+        --format parquet --output /data/snapshot
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+
+from btrdb.cli import add_connection_arguments, connect
+from btrdb.stream import MAXIMUM_TIME
+from btrdb.utils.timez import to_nanoseconds
+from btrdb.exceptions import BTrDBError, BTRDBValueError
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+FORMATS = ("parquet", "csv", "npz")
+MODES = ("raw", "aligned", "windows")
+DAY = 86400 * 10**9
+METADATA_FILENAME = "stream.json"
+
+RAW_COLUMNS = ("time", "value")
+STAT_COLUMNS = ("time", "min", "mean", "max", "count", "stddev")
+
+
+##########################################################################
+## Partitioning
+##########################################################################
+
+def day_partitions(start, end):
+    """
+    Returns the (start, end) ranges of each UTC day overlapping [start, end),
+    clipped to the requested range.
+    """
+    partitions = []
+    day = start - (start % DAY)
+    while day < end:
+        partitions.append((max(day, start), min(day + DAY, end)))
+        day += DAY
+    return partitions
+
+
+def window_partitions(start, end, width):
+    """
+    Returns the day partitions of [start, end) moved to the boundaries of the
+    windows of width ns starting at start, so that every window is exported
+    by the partition of the day it starts in (including windows straddling
+    midnight). As with a single windows query, only windows ending by end are
+    included and partitions without windows are omitted.
+    """
+    align = lambda t: start + -(-(t - start) // width) * width
+    last = start + (end - start) // width * width
+
+    partitions = []
+    for pstart, pend in day_partitions(start, end):
+        pstart, pend = align(pstart), min(align(pend), last)
+        if pstart < pend:
+            partitions.append((pstart, pend))
+    return partitions
+
+
+def partition_name(start, fmt):
+    day = datetime.fromtimestamp((start - start % DAY) // 10**9, tz=timezone.utc)
+    return "{}.{}".format(day.strftime("%Y-%m-%d"), fmt)
+
+
+##########################################################################
+## Fetching and Writing
+##########################################################################
+
+def fetch(stream, start, end, version, mode="raw", pointwidth=None, width=None):
+    """
+    Returns the points of a stream starting in [start, end). Aligned window
+    queries are widened to the pointwidth boundary so that windows straddling
+    partition boundaries are returned by exactly one partition. For windows,
+    start and end must be window boundaries (see `window_partitions`).
+    """
+    if mode == "raw":
+        points = stream.values(start, end, version=version)
+    elif mode == "aligned":
+        size = 2 ** pointwidth
+        query_end = min(-(-end // size) * size, MAXIMUM_TIME)
+        points = stream.aligned_windows(start, query_end, pointwidth, version=version)
+    elif mode == "windows":
+        points = stream.windows(start, end, width, version=version)
+    else:
+        raise BTRDBValueError("unsupported mode `{}`".format(mode))
+
+    return [point for point, _ in points if start <= point.time < end]
+
+
+def to_columns(points, mode):
+    """
+    Returns a dict of column name to numpy array for a list of points.
+    """
+    import numpy as np
+
+    names = RAW_COLUMNS if mode == "raw" else STAT_COLUMNS
+    columns = {}
+    for idx, name in enumerate(names):
+        dtype = np.int64 if name in ("time", "count") else np.float64
+        columns[name] = np.fromiter((p[idx] for p in points), dtype=dtype, count=len(points))
+    return columns
+
+
+def write_partition(path, columns, fmt):
+    """
+    Writes the columns to path atomically using a temporary file.
+    """
+    tmp = path + ".tmp"
+    if fmt == "csv":
+        names = list(columns)
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            writer.writerows(zip(*(columns[name].tolist() for name in names)))
+
+    elif fmt == "npz":
+        import numpy as np
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+
+    elif fmt == "parquet":
+        import pandas as pd
+        pd.DataFrame(columns).to_parquet(tmp, index=False)
+
+    else:
+        raise BTRDBValueError("unsupported format `{}`".format(fmt))
+
+    os.replace(tmp, path)
+
+
+##########################################################################
+## Exporting
+##########################################################################
+
+class Exporter(object):
+    """
+    Exports streams into per-stream, per-day partition files.
+
+    Parameters
+    ----------
+    db : BTrDB
+        The connection used to query streams.
+    output : str
+        Directory the partitions are written to.
+    fmt : str
+        One of "parquet", "csv" or "npz".
+    mode : str
+        One of "raw", "aligned" or "windows".
+    start, end : int
+        Time range to export; defaults to the extent of each stream.
+    pointwidth : int
+        Pointwidth used by the "aligned" mode.
+    width : int
+        Window width in nanoseconds used by the "windows" mode.
+    overwrite : bool
+        Re-export partitions that already exist instead of resuming.
+
+    """
+
+    def __init__(self, db, output, fmt="parquet", mode="raw", start=None, end=None,
+                 pointwidth=None, width=None, overwrite=False):
+        if mode == "aligned" and pointwidth is None:
+            raise BTRDBValueError("--pointwidth is required for aligned mode")
+        if mode == "windows" and not width:
+            raise BTRDBValueError("--width is required for windows mode")
+
+        self.db = db
+        self.output = output
+        self.fmt = fmt
+        self.mode = mode
+        self.start = start
+        self.end = end
+        self.pointwidth = pointwidth
+        self.width = width
+        self.overwrite = overwrite
+
+        self.points = 0
+        self.written = 0
+        self.skipped = 0
+
+    def stream_dir(self, stream):
+        return os.path.join(self.output, str(stream.uuid))
+
+    def prepare(self, stream):
+        """
+        Writes the stream metadata and returns the partition tasks for the
+        stream. The data version is pinned on the first run and reused when
+        the export is resumed so that all partitions are consistent.
+        """
+        directory = self.stream_dir(stream)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, METADATA_FILENAME)
+
+        meta = None
+        if not self.overwrite and os.path.exists(path):
+            with open(path, "r") as f:
+                meta = json.load(f)
+
+        if meta is None:
+            annotations, _ = stream.annotations()
+            meta = {
+                "uuid": str(stream.uuid),
+                "collection": stream.collection,
+                "tags": stream.tags(),
+                "annotations": annotations,
+                "version": stream.version(),
+                "mode": self.mode,
+                "pointwidth": self.pointwidth,
+                "width": self.width,
+            }
+            with open(path + ".tmp", "w") as f:
+                json.dump(meta, f, indent=2, default=str)
+            os.replace(path + ".tmp", path)
+
+        version = meta["version"]
+        start, end = self.start, self.end
+        if start is None:
+            earliest = stream.earliest(version=version)
+            if earliest is None:
+                return []
+            start = earliest[0].time
+        if end is None:
+            latest = stream.latest(version=version)
+            if latest is None:
+                return []
+            end = latest[0].time + 1
+
+        if self.mode == "windows":
+            partitions = window_partitions(start, end, self.width)
+        else:
+            partitions = day_partitions(start, end)
+        return [(stream, version, pstart, pend) for pstart, pend in partitions]
+
+    def export_partition(self, task):
+        stream, version, start, end = task
+        path = os.path.join(self.stream_dir(stream), partition_name(start, self.fmt))
+        if not self.overwrite and os.path.exists(path):
+            return None
+
+        points = fetch(stream, start, end, version, self.mode, self.pointwidth, self.width)
+        # partitions without points are written too, so that resuming the
+        # export does not query them again
+        write_partition(path, to_columns(points, self.mode), self.fmt)
+        return len(points)
+
+    def run(self, streams):
+        """
+        Exports the streams, returning the number of points written.
+        """
+        tasks = [
+            task
+            for tasks in self.db._fan_out(self.prepare, streams)
+            for task in tasks
+        ]
+        for count in self.db._fan_out(self.export_partition, tasks):
+            if count is None:
+                self.skipped += 1
+            else:
+                self.written += 1
+                self.points += count
+        return self.points
+
+
+def parse_pairs(values, what):
+    """
+    Parses KEY=VALUE arguments into a dict.
+    """
+    pairs = {}
+    for value in values or []:
+        key, sep, val = value.partition("=")
+        if not sep or not key:
+            raise BTRDBValueError("invalid {} `{}`, expected KEY=VALUE".format(what, value))
+        pairs[key] = val
+    return pairs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="btrdb-export",
+        description="Bulk export BTrDB streams to Parquet, CSV or NPZ files partitioned by stream and day.",
+    )
+    parser.add_argument(
+        "-c", "--collection", required=True,
+        help="collection prefix of the streams to export",
+    )
+    parser.add_argument(
+        "--tag", action="append", default=[], metavar="KEY=VALUE",
+        help="only export streams with this tag, may be repeated",
+    )
+    parser.add_argument(
+        "--annotation", action="append", default=[], metavar="KEY=VALUE",
+        help="only export streams with this annotation, may be repeated",
+    )
+    parser.add_argument("--start", default=None, help="inclusive start time (ns or RFC3339)")
+    parser.add_argument("--end", default=None, help="exclusive end time (ns or RFC3339)")
+    parser.add_argument(
+        "--mode", choices=MODES, default="raw",
+        help="export raw values, aligned windows or windows (default: %(default)s)",
+    )
+    parser.add_argument("--pointwidth", type=int, default=None, help="pointwidth for aligned mode")
+    parser.add_argument("--width", type=int, default=None, help="window width in ns for windows mode")
+    parser.add_argument(
+        "-f", "--format", choices=FORMATS, default="parquet",
+        help="output format (default: %(default)s)",
+    )
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument(
+        "--overwrite", action="store_true",
+        help="re-export existing partitions instead of resuming",
+    )
+    return add_connection_arguments(parser)
+
+
+def main(argv=None, db=None):
+    """
+    Entry point of the btrdb-export command.
+    """
+    args = build_parser().parse_args(argv)
+    started = time.monotonic()
+
+    try:
+        db = db or connect(args)
+        exporter = Exporter(
+            db, args.output, fmt=args.format, mode=args.mode,
+            start=to_nanoseconds(args.start), end=to_nanoseconds(args.end),
+            pointwidth=args.pointwidth, width=args.width, overwrite=args.overwrite,
+        )
+        streams = db.streams_in_collection(
+            args.collection, is_collection_prefix=True,
+            tags=parse_pairs(args.tag, "tag"),
+            annotations=parse_pairs(args.annotation, "annotation"),
+        )
+        exporter.run(streams)
+    except (BTrDBError, ValueError, ImportError, OSError) as exc:
+        print("btrdb-export: error: {}".format(exc), file=sys.stderr)
+        return 1
+
+    elapsed = time.monotonic() - started
+    print("exported {:,} points from {} streams into {} partitions ({} already exported) in {:.2f}s ({:,.0f} points/sec)".format(
+        exporter.points, len(streams), exporter.written, exporter.skipped, elapsed,
+        exporter.points / elapsed if elapsed else 0
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+# btrdb.cli.importer
+# Command line tool for bulk importing data files into BTrDB streams
+#
+# Author:   PingThings
+# Created:  Tue Oct 20 09:03:17 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: importer.py [] allen@pingthings.io $
+
+"""
+Command line tool for bulk importing data files into BTrDB streams.
+
+Each file contains a time column and one column per stream. Columns are
+mapped to streams by UUID or "collection/name" and missing streams may be
+created. Files are read in chunks with vectorized readers and each chunk
+is inserted into all of its streams concurrently.
+
+Example::
+
+    btrdb-import --collection sensors/pmu1 --create --unit volts archive.csv
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import re
+import sys
+import time
+import argparse
+import uuid as uuidlib
+
+from btrdb.cli import add_connection_arguments, connect
+from btrdb.stream import StreamSet
+from btrdb.exceptions import BTrDBError, BTRDBValueError
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+FORMATS = ("csv", "parquet", "npz")
+MERGE_POLICIES = ("never", "equal", "retain", "replace")
+TIME_UNITS = {"ns": 1, "us": 10**3, "ms": 10**6, "s": 10**9}
+DEFAULT_CHUNKSIZE = 500000
+
+UUID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+
+
+##########################################################################
+## Reading Files
+##########################################################################
+
+def detect_format(path):
+    """
+    Returns the file format based on the file extension.
+    """
+    name = path.lower()
+    if name.endswith((".csv", ".csv.gz", ".csv.bz2", ".csv.zip", ".txt")):
+        return "csv"
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith(".npz"):
+        return "npz"
+    raise BTRDBValueError("cannot determine the format of `{}`, use --format".format(path))
+
+
+def read_frames(path, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yields pandas DataFrames of at most `chunksize` rows from a data file.
+    """
+    import pandas as pd
+
+    if fmt == "csv":
+        for frame in pd.read_csv(path, chunksize=chunksize):
+            yield frame
+
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Please install pyarrow to import parquet files.")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+    elif fmt == "npz":
+        import numpy as np
+        with np.load(path) as arrays:
+            frame = pd.DataFrame({key: arrays[key] for key in arrays.files})
+        for i in range(0, len(frame), chunksize):
+            yield frame.iloc[i:i + chunksize]
+
+    else:
+        raise BTRDBValueError("unsupported format `{}`".format(fmt))
+
+
+def to_nanoseconds_array(times, unit="ns"):
+    """
+    Converts a pandas Series of times into a numpy array of int64 nanoseconds.
+    Numeric times are scaled from `unit`; anything else is parsed as a
+    datetime (naive datetimes are assumed to be UTC).
+    """
+    import numpy as np
+    import pandas as pd
+
+    factor = TIME_UNITS[unit]
+    if pd.api.types.is_integer_dtype(times):
+        return times.to_numpy(dtype=np.int64) * factor
+    if pd.api.types.is_float_dtype(times):
+        return np.round(times.to_numpy(dtype=np.float64) * factor).astype(np.int64)
+
+    parsed = pd.to_datetime(times, utc=True)
+    return ((parsed - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(1, "ns")).to_numpy(dtype=np.int64)
+
+
+##########################################################################
+## Resolving Streams
+##########################################################################
+
+class StreamResolver(object):
+    """
+    Maps file columns to streams, caching the result and optionally creating
+    streams that do not exist.
+
+    Parameters
+    ----------
+    db : BTrDB
+        The connection used to look up and create streams.
+    mapping : dict
+        Explicit column to stream mappings (UUID or "collection/name").
+    collection : str
+        Collection used for columns that are not explicitly mapped. If None,
+        unmapped column names must be a UUID or "collection/name".
+    create : bool
+        Create streams identified by "collection/name" that do not exist.
+    unit : str
+        The unit tag of created streams.
+
+    """
+
+    def __init__(self, db, mapping=None, collection=None, create=False, unit="unknown"):
+        self.db = db
+        self.mapping = mapping or {}
+        self.collection = collection
+        self.create = create
+        self.unit = unit
+        self.created = []
+        self._cache = {}
+
+    @property
+    def streams(self):
+        """
+        Returns the distinct streams resolved so far.
+        """
+        return list({stream.uuid: stream for stream in self._cache.values()}.values())
+
+    def target(self, column):
+        column = str(column)
+        if column in self.mapping:
+            return self.mapping[column]
+        if self.collection:
+            return "{}/{}".format(self.collection.rstrip("/"), column)
+        return column
+
+    def resolve(self, column):
+        if column not in self._cache:
+            stream = self._resolve(self.target(column))
+            for other, resolved in self._cache.items():
+                if resolved.uuid == stream.uuid:
+                    raise BTRDBValueError(
+                        "columns `{}` and `{}` both map to stream `{}`".format(other, column, stream.uuid)
+                    )
+            self._cache[column] = stream
+        return self._cache[column]
+
+    def _resolve(self, target):
+        if UUID_PATTERN.match(target):
+            stream = self.db.stream_from_uuid(target)
+            if not stream.exists():
+                raise BTRDBValueError("stream `{}` does not exist".format(target))
+            return stream
+
+        if "/" not in target:
+            raise BTRDBValueError("cannot map `{}` to a stream, expected UUID or collection/name".format(target))
+
+        collection, name = target.rsplit("/", 1)
+        found = self.db.streams_in_collection(
+            collection, is_collection_prefix=False, tags={"name": name}
+        )
+        if len(found) == 1:
+            return found[0]
+        if len(found) > 1:
+            raise BTRDBValueError("found multiple streams for `{}`".format(target))
+        if not self.create:
+            raise BTRDBValueError("stream `{}` does not exist, use --create to create it".format(target))
+
+        stream = self.db.create(
+            uuidlib.uuid4(), collection, tags={"name": name, "unit": self.unit}
+        )
+        self.created.append(stream)
+        return stream
+
+
+##########################################################################
+## Importing
+##########################################################################
+
+def import_file(path, resolver, fmt=None, time_column="time", time_unit="ns",
+                chunksize=DEFAULT_CHUNKSIZE, merge="never", exclude=()):
+    """
+    Imports a single file, returning the number of points inserted.
+    """
+    fmt = fmt or detect_format(path)
+    points = 0
+
+    for frame in read_frames(path, fmt, chunksize):
+        if time_column not in frame.columns:
+            raise BTRDBValueError("time column `{}` not found in `{}`".format(time_column, path))
+
+        frame = frame.drop(columns=[c for c in exclude if c in frame.columns])
+        frame.index = to_nanoseconds_array(frame.pop(time_column), time_unit)
+        if frame.empty:
+            continue
+
+        streams = [resolver.resolve(column) for column in frame.columns]
+        frame.columns = [str(stream.uuid) for stream in streams]
+
+        StreamSet(streams).insert(frame, merge=merge)
+        points += int(frame.notna().to_numpy().sum())
+
+    return points
+
+
+def parse_mapping(values):
+    """
+    Parses COLUMN=STREAM mapping arguments into a dict.
+    """
+    mapping = {}
+    for value in values or []:
+        column, sep, target = value.partition("=")
+        if not sep or not column or not target:
+            raise BTRDBValueError("invalid mapping `{}`, expected COLUMN=STREAM".format(value))
+        if target in mapping.values():
+            raise BTRDBValueError("more than one column is mapped to `{}`".format(target))
+        mapping[column] = target
+    return mapping
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="btrdb-import",
+        description="Bulk import CSV, Parquet or NPZ files into BTrDB streams.",
+    )
+    parser.add_argument("files", nargs="+", help="data files to import")
+    parser.add_argument(
+        "-f", "--format", choices=FORMATS, default=None,
+        help="format of the files, detected from the extension by default",
+    )
+    parser.add_argument(
+        "-t", "--time-column", default="time",
+        help="name of the time column (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--time-unit", choices=sorted(TIME_UNITS), default="ns",
+        help="unit of numeric timestamps (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-m", "--map", action="append", default=[], metavar="COLUMN=STREAM",
+        help="map a column to a stream UUID or collection/name, may be repeated",
+    )
+    parser.add_argument(
+        "-c", "--collection", default=None,
+        help="collection of streams named after unmapped columns",
+    )
+    parser.add_argument(
+        "-x", "--exclude", action="append", default=[], metavar="COLUMN",
+        help="column to skip, may be repeated",
+    )
+    parser.add_argument(
+        "--create", action="store_true",
+        help="create streams that do not exist",
+    )
+    parser.add_argument(
+        "--unit", default="unknown",
+        help="unit tag of created streams (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--merge", choices=MERGE_POLICIES, default="never",
+        help="merge policy for inserts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+        help="number of rows read and inserted at a time (default: %(default)s)",
+    )
+    return add_connection_arguments(parser)
+
+
+def main(argv=None, db=None):
+    """
+    Entry point of the btrdb-import command.
+    """
+    args = build_parser().parse_args(argv)
+
+    try:
+        db = db or connect(args)
+        resolver = StreamResolver(
+            db, parse_mapping(args.map), args.collection, args.create, args.unit
+        )
+
+        total, started = 0, time.monotonic()
+        for path in args.files:
+            file_started = time.monotonic()
+            points = import_file(
+                path, resolver, fmt=args.format, time_column=args.time_column,
+                time_unit=args.time_unit, chunksize=args.chunksize,
+                merge=args.merge, exclude=args.exclude,
+            )
+            total += points
+            elapsed = time.monotonic() - file_started
+            print("{}: {:,} points in {:.2f}s ({:,.0f} points/sec)".format(
+                os.path.basename(path), points, elapsed, points / elapsed if elapsed else 0
+            ))
+    except (BTrDBError, ValueError, ImportError, OSError) as exc:
+        print("btrdb-import: error: {}".format(exc), file=sys.stderr)
+        return 1
+
+    elapsed = time.monotonic() - started
+    print("imported {:,} points into {} streams ({} created) in {:.2f}s ({:,.0f} points/sec)".format(
+        total, len(resolver.streams), len(resolver.created), elapsed,
+        total / elapsed if elapsed else 0
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
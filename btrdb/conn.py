@@ -17,16 +17,27 @@ Connection related objects for the BTrDB library
 
 import os
 import re
+import copy
 import json
+import time
+import weakref
+import threading
 import uuid as uuidlib
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import grpc
+from grpc import FutureTimeoutError
 from grpc._cython.cygrpc import CompressionAlgorithm
 
 from btrdb.stream import Stream, StreamSet
+from btrdb.writer import BufferedWriter
+from btrdb.utils.spool import InsertSpool
 from btrdb.utils.general import unpack_stream_descriptor
 from btrdb.utils.conversion import to_uuid
-from btrdb.exceptions import StreamNotFoundError, InvalidOperation
+from btrdb.utils import tracing, profile
+from btrdb.exceptions import StreamNotFoundError, InvalidOperation, StreamExists, BTRDBValueError
+from btrdb.exceptions import ConnectionError
 
 ##########################################################################
 ## Module Variables
@@ -35,6 +46,14 @@ from btrdb.exceptions import StreamNotFoundError, InvalidOperation
 MIN_TIME = -(16 << 56)
 MAX_TIME = 48 << 56
 MAX_POINTWIDTH = 63
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_WARMUP_TIMEOUT = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 20
+
+# BTrDB objects that can reconnect, and those restored from a pickle by id
+_RECONNECTABLE = weakref.WeakSet()
+_RESTORED = weakref.WeakValueDictionary()
+_RESTORED_LOCK = threading.Lock()
 
 
 ##########################################################################
@@ -43,20 +62,159 @@ MAX_POINTWIDTH = 63
 
 class Connection(object):
 
-    def __init__(self, addrportstr, apikey=None):
+    def __init__(self, addrportstr, apikey=None, pool_size=1, keepalive_time=None,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT, idle_timeout=None, options=None):
         """
         Connects to a BTrDB server
 
         Parameters
         ----------
         addrportstr: str
-            The address of the cluster to connect to, e.g 123.123.123:4411
+            The address of the cluster to connect to, e.g 123.123.123:4411,
+            or a comma separated list of addresses of several proxies.
         apikey: str
             The option API key to authenticate requests
+        pool_size: int, default: 1
+            The number of channels (HTTP/2 connections) to open to each
+            address. With more than one channel, each channel gets its own
+            subchannel so that the connections are not shared.
+        keepalive_time: float, optional
+            Seconds between HTTP/2 keepalive pings, which are also sent while
+            no calls are active so that idle connections are not silently
+            dropped by load balancers or NAT. The server must allow pings at
+            this rate. Keepalive is disabled by default.
+        keepalive_timeout: float, default: 20
+            Seconds to wait for a keepalive ping to be acknowledged before the
+            connection is considered broken.
+        idle_timeout: float, optional
+            Seconds without calls after which a channel closes its connection
+            (it reconnects on the next call); by default gRPC's 30 minutes.
+        options: list of tuple, optional
+            Additional gRPC channel arguments, e.g.
+            `[("grpc.max_receive_message_length", -1)]`.
 
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.apikey = apikey
+        self.pool_size = pool_size
+        self.chan_ops = [('grpc.default_compression_algorithm', CompressionAlgorithm.gzip)]
+
+        if pool_size > 1:
+            # channels to the same target share connections via the global
+            # subchannel pool unless they are given a local one
+            self.chan_ops.append(('grpc.use_local_subchannel_pool', 1))
+
+        if keepalive_time is not None:
+            self.chan_ops.extend([
+                ('grpc.keepalive_time_ms', int(keepalive_time * 1000)),
+                ('grpc.keepalive_timeout_ms', int(keepalive_timeout * 1000)),
+                ('grpc.keepalive_permit_without_calls', 1),
+                ('grpc.http2.max_pings_without_data', 0),
+            ])
+
+        if idle_timeout is not None:
+            self.chan_ops.append(('grpc.client_idle_timeout_ms', int(idle_timeout * 1000)))
+
+        if options:
+            self.chan_ops.extend(options)
+
+        self.addresses = []
+        self.channels = []
+        for address in addrportstr.split(","):
+            self.add_address(address.strip())
+        self.channel = self.channels[0]
+
+    def add_address(self, addrportstr):
+        """
+        Opens `pool_size` channels to another address (e.g. a proxy that was
+        discovered from the server info) unless it is already connected.
+
+        Returns
+        -------
+        bool
+            True if channels to the address were opened.
+        """
+        if addrportstr in self.addresses:
+            return False
+
+        channels = [self.open_channel(addrportstr) for _ in range(self.pool_size)]
+        self.addresses.append(addrportstr)
+        self.channels.extend(channels)
+        return True
+
+    def warmup(self, timeout=DEFAULT_WARMUP_TIMEOUT, drop_unready=False):
+        """
+        Establishes the connections of all channels now rather than on the
+        first request, waiting until every channel is ready.
+
+        Parameters
+        ----------
+        timeout: float, default: 10
+            The maximum number of seconds to wait for all channels.
+        drop_unready: bool, default: False
+            Close and remove the channels of addresses that are not ready
+            before the timeout (e.g. dead proxies that were discovered from
+            the server info) instead of raising, as long as one address is.
+
+        Raises
+        ------
+        ConnectionError
+            If a channel is not ready before the timeout.
+        """
+        futures = [grpc.channel_ready_future(channel) for channel in self.channels]
+        deadline = time.monotonic() + timeout
+        ready = []
+        try:
+            for future in futures:
+                try:
+                    future.result(timeout=max(0, deadline - time.monotonic()))
+                    ready.append(True)
+                except FutureTimeoutError:
+                    ready.append(False)
+        finally:
+            for future in futures:
+                future.cancel()
+
+        # the channels of each address are consecutive
+        size = self.pool_size
+        unready = [
+            address for idx, address in enumerate(self.addresses)
+            if not all(ready[idx * size:(idx + 1) * size])
+        ]
+        if not unready:
+            return
+
+        if not drop_unready or len(unready) == len(self.addresses):
+            raise ConnectionError(
+                "could not connect to {} within {}s".format(", ".join(unready), timeout)
+            )
+
+        for address in unready:
+            idx = self.addresses.index(address)
+            for channel in self.channels[idx * size:(idx + 1) * size]:
+                channel.close()
+            del self.channels[idx * size:(idx + 1) * size]
+            del self.addresses[idx]
+        self.channel = self.channels[0]
+
+    def open_channel(self, addrportstr):
+        """
+        Opens a new channel to `addrportstr` using the credentials and options
+        of this connection. Port 4411 uses TLS, any other port is insecure.
+
+        Parameters
+        ----------
+        addrportstr: str
+            The address of the server to connect to, e.g 123.123.123:4411
+
+        Returns
+        -------
+        grpc.Channel
         """
         addrport = addrportstr.split(":", 2)
-        chan_ops = [('grpc.default_compression_algorithm', CompressionAlgorithm.gzip)]
+        apikey, chan_ops = self.apikey, self.chan_ops
 
         if len(addrport) != 2:
             raise ValueError("expecting address:port")
@@ -73,24 +231,23 @@ class Connection(object):
                 contents = None
 
             if apikey is None:
-                self.channel = grpc.secure_channel(
+                return grpc.secure_channel(
                     addrportstr,
                     grpc.ssl_channel_credentials(contents),
                     options=chan_ops
                 )
-            else:
-                self.channel = grpc.secure_channel(
-                    addrportstr,
-                    grpc.composite_channel_credentials(
-                        grpc.ssl_channel_credentials(contents),
-                        grpc.access_token_call_credentials(apikey)
-                    ),
-                    options=chan_ops
-                )
-        else:
-            if apikey is not None:
-                raise ValueError("cannot use an API key with an insecure (port 4410) BTrDB API. Try port 4411")
-            self.channel = grpc.insecure_channel(addrportstr, chan_ops)
+            return grpc.secure_channel(
+                addrportstr,
+                grpc.composite_channel_credentials(
+                    grpc.ssl_channel_credentials(contents),
+                    grpc.access_token_call_credentials(apikey)
+                ),
+                options=chan_ops
+            )
+
+        if apikey is not None:
+            raise ValueError("cannot use an API key with an insecure (port 4410) BTrDB API. Try port 4411")
+        return grpc.insecure_channel(addrportstr, chan_ops)
 
 
 
@@ -98,12 +255,125 @@ class Connection(object):
 class BTrDB(object):
     """
     The primary server connection object for communicating with a BTrDB server.
+
+    Parameters
+    ----------
+    endpoint : Endpoint
+        The endpoint used to issue RPCs to the server.
+    max_concurrency : int, default: 8
+        The maximum number of requests that multi-stream operations such as
+        `insert_many` will have in flight at once.
+    connection_spec : dict, optional
+        The arguments of `btrdb.connect` used to create the endpoint. Objects
+        with a connection spec can be pickled (e.g. to send streams to other
+        processes), reconnecting lazily on first use after unpickling, and
+        reconnect in child processes after a fork.
     """
 
-    def __init__(self, endpoint):
+    def __init__(self, endpoint, max_concurrency=DEFAULT_MAX_CONCURRENCY, connection_spec=None):
         self.ep = endpoint
+        self.max_concurrency = max_concurrency
+        self.spool = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._ep_lock = threading.Lock()
+
+        self.connection_spec = connection_spec
+        self._spec_id = None
+        if connection_spec is not None:
+            self._spec_id = uuidlib.uuid4().hex
+            _RECONNECTABLE.add(self)
+
+    @property
+    def ep(self):
+        """
+        Returns the endpoint used to issue RPCs, connecting first if the
+        object was unpickled or inherited by a forked process.
+        """
+        if self._ep is None and self.connection_spec is not None:
+            with self._ep_lock:
+                if self._ep is None:
+                    from btrdb import _connect
+                    self._ep = _connect(**self.connection_spec).ep
+        return self._ep
+
+    @ep.setter
+    def ep(self, endpoint):
+        self._ep = endpoint
+
+    def _reset(self):
+        """
+        Drops the endpoint and executor (e.g. in a forked child process, where
+        the parent's channels and threads cannot be used) so that they are
+        re-created on first use.
+        """
+        if self.connection_spec is not None:
+            # the retry policy and limiter hold the parent's locks and threads,
+            # copying them re-creates those while keeping their settings
+            spec = dict(self.connection_spec)
+            for key in ("retry", "limiter"):
+                if spec.get(key) is not None:
+                    spec[key] = copy.copy(spec[key])
+            self.connection_spec = spec
+
+        self._ep = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._ep_lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """
+        Returns the thread pool shared by all multi-stream operations on this
+        object. Because the pool is shared, `max_concurrency` is a global
+        limit on the number of requests they have in flight.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="btrdb"
+                )
+            return self._executor
 
-    def query(self, stmt, params=[]):
+    def close(self):
+        """
+        Shuts down the executor of multi-stream operations, closes the spool
+        (if enabled) and closes the channels of the endpoint.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        if self.spool is not None:
+            self.spool.close()
+        if self._ep is not None:
+            self._ep.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _fan_out(self, func, items):
+        """
+        Applies func to each item using the shared executor and returns the
+        results in the order of the items. The first exception raised by any
+        call is re-raised once all calls have completed.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [func(item) for item in items]
+
+        # run each call in a copy of the caller's context so that its trace
+        # context and query profile apply in the worker threads
+        with profile.waiting():
+            futures = [self.executor.submit(copy_context().run, func, item) for item in items]
+            wait(futures)
+        return [future.result() for future in futures]
+
+    def query(self, stmt, params=[], timeout=None):
         """
         Performs a SQL query on the database metadata and returns a list of
         dictionaries from the resulting cursor.
@@ -118,6 +388,9 @@ class BTrDB(object):
             a list of parameter values to be sanitized and interpolated into the
             SQL statement. Using parameters forces value/type checking and is
             considered a best practice at the very least.
+        timeout : float, optional
+            The deadline of the query in seconds, by default the connection's
+            timeout.
 
         Returns
         -------
@@ -133,11 +406,14 @@ class BTrDB(object):
 
         See https://btrdb.readthedocs.io/en/latest/ for more info.
         """
-        return [
-            json.loads(row.decode("utf-8"))
-            for page in self.ep.sql_query(stmt, params)
-            for row in page
-        ]
+        with tracing.span("btrdb.query", statement=stmt) as span:
+            rows = [
+                json.loads(row.decode("utf-8"))
+                for page in self.ep.sql_query(stmt, params, timeout=timeout)
+                for row in page
+            ]
+            tracing.set_attributes(span, rows=len(rows))
+        return rows
 
 
     def streams(self, *identifiers, versions=None, is_collection_prefix=False):
@@ -251,6 +527,125 @@ class BTrDB(object):
             property_version=0
         )
 
+    def create_many(self, specs, on_exists="include"):
+        """
+        Creates many streams at once. The `Create` calls are sent
+        concurrently, bounded by `max_concurrency`, and the returned streams
+        have their metadata cached so no further round trips are required.
+
+        Parameters
+        ----------
+        specs : iterable of dict
+            The streams to create. Each dict has the keys `collection`, and
+            optionally `uuid` (a random UUID is generated if missing), `tags`
+            and `annotations`, i.e. the arguments of `create`.
+        on_exists : str
+            What to do when a stream UUID already exists. "include" loads the
+            existing stream into the result, "skip" leaves it out of the
+            result and "raise" raises `StreamExists` once all other streams
+            have been created.
+
+        Returns
+        -------
+        StreamSet
+            The created streams in the order of `specs`.
+        """
+        if on_exists not in ("include", "skip", "raise"):
+            raise BTRDBValueError("on_exists must be one of 'include', 'skip' or 'raise'")
+
+        specs = [dict(spec) for spec in specs]
+        for spec in specs:
+            spec["uuid"] = to_uuid(spec.get("uuid") or uuidlib.uuid4())
+
+        def create(spec):
+            try:
+                return self.create(**spec)
+            except StreamExists as exc:
+                if on_exists == "raise":
+                    return exc
+                if on_exists == "skip":
+                    return None
+                stream = self.stream_from_uuid(spec["uuid"])
+                stream.refresh_metadata()
+                return stream
+
+        results = self._fan_out(create, specs)
+        for result in results:
+            if isinstance(result, StreamExists):
+                raise result
+        return StreamSet([stream for stream in results if stream is not None])
+
+    def insert_many(self, data, merge='never'):
+        """
+        Inserts points into many streams at once. The per-stream inserts are
+        sent concurrently, bounded by `max_concurrency`.
+
+        Parameters
+        ----------
+        data : dict
+            A dict whose keys are stream UUIDs (UUID or str) or Stream objects
+            and whose values are lists of (time, value) tuples to insert.
+        merge : str
+            A string describing the merge policy (see `Stream.insert`).
+
+        Returns
+        -------
+        dict
+            The version of each stream after inserting (dict[UUID, int]).
+        """
+        streams = [
+            (key if isinstance(key, Stream) else self.stream_from_uuid(key), points)
+            for key, points in data.items()
+        ]
+        versions = self._fan_out(
+            lambda item: item[0].insert(item[1], merge=merge), streams
+        )
+        return {stream.uuid: version for (stream, _), version in zip(streams, versions)}
+
+    def enable_spool(self, path, **kwargs):
+        """
+        Enables a durable local spool for inserts. When enabled, insert
+        batches that fail because the server cannot be reached are written
+        to append-only segment files in `path` instead of raising, and are
+        replayed in order before the next insert once the connection has
+        recovered. Call `spool.replay(conn)` to replay them explicitly.
+
+        Parameters
+        ----------
+        path : str
+            The directory used to store spooled inserts.
+        kwargs : dict
+            Options passed to :class:`btrdb.utils.spool.InsertSpool` such as
+            `fsync`, `max_bytes`, `segment_bytes` and `merge`.
+
+        Returns
+        -------
+        InsertSpool
+            the spool used by this BTrDB object
+        """
+        self.spool = InsertSpool(path, **kwargs)
+        return self.spool
+
+    def buffered_writer(self, **kwargs):
+        """
+        Returns a BufferedWriter that coalesces points for any number of
+        streams and inserts them in batches from a background thread pool.
+        Be sure to call `close()` on the writer (or use it as a context
+        manager) so that all buffered points are written.
+
+        Parameters
+        ----------
+        kwargs : dict
+            Options passed to :class:`btrdb.writer.BufferedWriter` such as
+            `merge`, `batch_size`, `max_age`, `max_buffered` and `max_workers`.
+
+        Returns
+        -------
+        BufferedWriter
+            a writer bound to this BTrDB object
+        """
+        return BufferedWriter(self, **kwargs)
+
     def info(self):
         """
         Returns information about the connected BTrDB srerver.
@@ -268,17 +663,25 @@ class BTrDB(object):
             "proxy": { "proxyEndpoints": [ep for ep in info.proxy.proxyEndpoints] },
         }
 
-    def list_collections(self, starts_with=""):
+    def list_collections(self, starts_with="", timeout=None):
         """
         Returns a list of collection paths using the `starts_with` argument for
         filtering.
 
+        Parameters
+        ----------
+        starts_with : str, default: ""
+            Only collections starting with this prefix are returned.
+        timeout : float, optional
+            The deadline of the query in seconds, by default the connection's
+            timeout.
+
         Returns
         -------
         collection paths: list[str]
 
         """
-        return [c for some in self.ep.listCollections(starts_with) for c in some]
+        return [c for some in self.ep.listCollections(starts_with, timeout=timeout) for c in some]
 
     def streams_in_collection(self, *collection, is_collection_prefix=True, tags=None, annotations=None):
         """
@@ -352,4 +755,37 @@ class BTrDB(object):
         return pyTags, pyAnn
 
     def __reduce__(self):
-        raise InvalidOperation("BTrDB object cannot be reduced.")
+        if self.connection_spec is None:
+            raise InvalidOperation(
+                "BTrDB object cannot be reduced unless it was created with btrdb.connect."
+            )
+        return (_restore, (self._spec_id, self.connection_spec, self.max_concurrency))
+
+
+##########################################################################
+## Pickling and Fork Safety
+##########################################################################
+
+def _restore(spec_id, connection_spec, max_concurrency):
+    """
+    Unpickles a BTrDB object. All objects pickled from the same connection
+    share one (lazily connected) BTrDB object per process.
+    """
+    with _RESTORED_LOCK:
+        db = _RESTORED.get(spec_id)
+        if db is None:
+            db = BTrDB(None, max_concurrency=max_concurrency, connection_spec=connection_spec)
+            db._spec_id = spec_id
+            _RESTORED[spec_id] = db
+        return db
+
+
+def _reset_after_fork():
+    global _RESTORED_LOCK
+    _RESTORED_LOCK = threading.Lock()
+    for db in list(_RECONNECTABLE):
+        db._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
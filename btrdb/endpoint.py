@@ -25,42 +25,189 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import grpc
+
 from btrdb.grpcinterface import btrdb_pb2
 from btrdb.grpcinterface import btrdb_pb2_grpc
 from btrdb.point import RawPoint
 from btrdb.exceptions import BTrDBError, error_handler, check_proto_stat
 from btrdb.utils.general import unpack_stream_descriptor
+from btrdb.utils.pool import ChannelPool
+from btrdb.utils.limiter import message_size
+from btrdb.utils.metrics import MetricsInterceptor
+from btrdb.utils import tracing, profile
 
 
 class Endpoint(object):
-    def __init__(self, channel):
-        self.stub = btrdb_pb2_grpc.BTrDBStub(channel)
+    def __init__(self, channel, balancing="round_robin", retry=None, timeout=None, limiter=None,
+                 metrics=None):
+        # optional Metrics collector notified of every call and decode
+        self.metrics = metrics
+
+        # the channels of the endpoint, closed by close
+        self.channels = list(channel) if isinstance(channel, (list, tuple)) else [channel]
+
+        # a list of channels dispatches calls across all of them
+        if isinstance(channel, (list, tuple)):
+            self.stub = ChannelPool([self.instrument(c) for c in channel], balancing)
+        else:
+            self.stub = btrdb_pb2_grpc.BTrDBStub(self.instrument(channel))
+
+        # optional RetryPolicy for idempotent calls
+        self.retry = retry
+
+        # default deadline in seconds of queries
+        self.timeout = timeout
+
+        # optional Limiter admitting calls to protect the server
+        self.limiter = limiter
+
+    def instrument(self, channel):
+        """
+        Returns the channel intercepted to report its calls to the metrics
+        collector and to trace them if OpenTelemetry is installed, or the
+        channel itself if neither applies.
+        """
+        interceptors = []
+        if self.metrics is not None:
+            interceptors.append(MetricsInterceptor(self.metrics))
+        if tracing.trace is not None:
+            interceptors.append(tracing.TracingInterceptor())
+
+        if not interceptors:
+            return channel
+        return grpc.intercept_channel(channel, *interceptors)
+
+    def close(self):
+        """
+        Closes the channels of the endpoint.
+        """
+        for channel in self.channels:
+            close = getattr(channel, "close", None)
+            if close is not None:
+                close()
+
+    def _deadline(self, timeout):
+        return self.timeout if timeout is None else timeout
+
+    def _call(self, method, params, timeout=None):
+        """
+        Sends a unary call, retrying it according to the retry policy.
+        """
+        timeout = self._deadline(timeout)
+        func = lambda: self._send(method, params, kind="read", timeout=timeout)
+        if self.retry is None:
+            return func()
+        return self.retry.call(method, func)
+
+    def _send(self, method, params, kind=None, points=0, **kwargs):
+        """
+        Sends a unary call once admitted by the limiter. Writes are charged
+        with their points and size before they are sent, reads with the size
+        of the response once it has been received.
+        """
+        func = lambda: getattr(self.stub, method)(params, **kwargs)
+        report = profile.active()
+        if report is not None:
+            report.record_rpc(method)
+        if self.limiter is None:
+            return func()
+
+        nbytes = message_size(params) if kind == "write" else 0
+        result = self.limiter.call(func, kind, points, nbytes)
+        if kind == "read":
+            self.limiter.charge("read", 0, message_size(result))
+        return result
+
+    def _stream(self, method, params, timeout=None):
+        """
+        Yields the responses of a streaming call, cancelling the call if the
+        generator is closed (or garbage collected) before it is exhausted.
+        """
+        call = None
+        report = profile.active()
+
+        def open_call():
+            nonlocal call
+            if report is not None:
+                report.record_rpc(method)
+            call = getattr(self.stub, method)(params, timeout=self._deadline(timeout))
+            return call
+
+        try:
+            if self.limiter is None:
+                yield from open_call()
+            else:
+                yield from self.limiter.stream(open_call)
+        finally:
+            cancel = getattr(call, "cancel", None) or getattr(call, "close", None)
+            if cancel is not None:
+                cancel()
+
+    def _read(self, method, make_params, start, version, width=None, timeout=None):
+        """
+        Yields the (values, version) results of a streaming read. With a
+        retry policy, a failed read is resumed after the last point received
+        at the same version: windows resume at the next window (`width` ns
+        later) and raw values resume at the time of the last point, skipping
+        the points at that time that were already received.
+        """
+        if self.retry is None:
+            for result in self._stream(method, make_params(start, version), timeout):
+                check_proto_stat(result.stat)
+                yield result.values, result.versionMajor
+            return
+
+        state = {"start": start, "version": version, "last": None, "dupes": 0, "skip": 0}
+
+        def open_stream():
+            if state["last"] is not None:
+                if width is None:
+                    state["start"], state["skip"] = state["last"], state["dupes"]
+                else:
+                    state["start"] = state["last"] + width
+            return self._stream(method, make_params(state["start"], state["version"]), timeout)
+
+        for result in self.retry.stream(open_stream):
+            check_proto_stat(result.stat)
+            state["version"] = result.versionMajor
+
+            values = list(result.values)
+            if state["skip"]:
+                skipped = 0
+                while skipped < min(len(values), state["skip"]) and values[skipped].time == state["last"]:
+                    skipped += 1
+                state["skip"] = state["skip"] - skipped if skipped == len(values) else 0
+                values = values[skipped:]
+
+            for value in values:
+                if value.time == state["last"]:
+                    state["dupes"] += 1
+                else:
+                    state["last"], state["dupes"] = value.time, 1
+            yield values, result.versionMajor
 
     @error_handler
-    def rawValues(self, uu, start, end, version=0):
-        params = btrdb_pb2.RawValuesParams(
+    def rawValues(self, uu, start, end, version=0, timeout=None):
+        make_params = lambda start, version: btrdb_pb2.RawValuesParams(
             uuid=uu.bytes, start=start, end=end, versionMajor=version
         )
-        for result in self.stub.RawValues(params):
-            check_proto_stat(result.stat)
-            yield result.values, result.versionMajor
+        yield from self._read("RawValues", make_params, start, version, timeout=timeout)
 
     @error_handler
-    def alignedWindows(self, uu, start, end, pointwidth, version=0):
-        params = btrdb_pb2.AlignedWindowsParams(
+    def alignedWindows(self, uu, start, end, pointwidth, version=0, timeout=None):
+        make_params = lambda start, version: btrdb_pb2.AlignedWindowsParams(
             uuid=uu.bytes,
             start=start,
             end=end,
             versionMajor=version,
             pointWidth=int(pointwidth),
         )
-        for result in self.stub.AlignedWindows(params):
-            check_proto_stat(result.stat)
-            yield result.values, result.versionMajor
+        yield from self._read("AlignedWindows", make_params, start, version, 1 << int(pointwidth), timeout)
 
     @error_handler
-    def windows(self, uu, start, end, width, depth, version=0):
-        params = btrdb_pb2.WindowsParams(
+    def windows(self, uu, start, end, width, depth, version=0, timeout=None):
+        make_params = lambda start, version: btrdb_pb2.WindowsParams(
             uuid=uu.bytes,
             start=start,
             end=end,
@@ -68,16 +215,14 @@ class Endpoint(object):
             width=width,
             depth=depth,
         )
-        for result in self.stub.Windows(params):
-            check_proto_stat(result.stat)
-            yield result.values, result.versionMajor
+        yield from self._read("Windows", make_params, start, version, width, timeout)
 
     @error_handler
     def streamInfo(self, uu, omitDescriptor, omitVersion):
         params = btrdb_pb2.StreamInfoParams(
             uuid=uu.bytes, omitVersion=omitVersion, omitDescriptor=omitDescriptor
         )
-        result = self.stub.StreamInfo(params)
+        result = self._call("StreamInfo", params)
         desc = result.descriptor
         check_proto_stat(result.stat)
         tagsanns = unpack_stream_descriptor(desc)
@@ -86,7 +231,7 @@ class Endpoint(object):
     @error_handler
     def obliterate(self, uu):
         params = btrdb_pb2.ObliterateParams(uuid=uu.bytes)
-        result = self.stub.Obliterate(params)
+        result = self._send("Obliterate", params)
         check_proto_stat(result.stat)
 
     @error_handler
@@ -107,7 +252,7 @@ class Endpoint(object):
             changes=annkvlist,
             removals=removals,
         )
-        result = self.stub.SetStreamAnnotations(params)
+        result = self._send("SetStreamAnnotations", params)
         check_proto_stat(result.stat)
 
     @error_handler
@@ -128,7 +273,7 @@ class Endpoint(object):
             tags=tag_data,
             collection=collection,
         )
-        result = self.stub.SetStreamTags(params)
+        result = self._send("SetStreamTags", params)
         check_proto_stat(result.stat)
 
     @error_handler
@@ -144,11 +289,11 @@ class Endpoint(object):
         params = btrdb_pb2.CreateParams(
             uuid=uu.bytes, collection=collection, tags=tagkvlist, annotations=annkvlist
         )
-        result = self.stub.Create(params)
+        result = self._send("Create", params)
         check_proto_stat(result.stat)
 
     @error_handler
-    def listCollections(self, prefix):
+    def listCollections(self, prefix, timeout=None):
         """
         Returns a generator for windows of collection paths matching search
 
@@ -157,7 +302,7 @@ class Endpoint(object):
         collection paths : list[str]
         """
         params = btrdb_pb2.ListCollectionsParams(prefix=prefix)
-        for msg in self.stub.ListCollections(params):
+        for msg in self._stream("ListCollections", params, timeout):
             check_proto_stat(msg.stat)
             yield msg.collections
 
@@ -189,28 +334,33 @@ class Endpoint(object):
             tags=tagkvlist,
             annotations=annkvlist,
         )
-        for result in self.stub.LookupStreams(params):
+        if self.retry is None:
+            results = self._stream("LookupStreams", params)
+        else:
+            # results cannot be resumed, only retry if nothing was received
+            results = self.retry.stream(lambda: self._stream("LookupStreams", params), resumable=False)
+        for result in results:
             check_proto_stat(result.stat)
             yield result.results
 
     @error_handler
-    def nearest(self, uu, time, version, backward):
+    def nearest(self, uu, time, version, backward, timeout=None):
         params = btrdb_pb2.NearestParams(
             uuid=uu.bytes, time=time, versionMajor=version, backward=backward
         )
-        result = self.stub.Nearest(params)
+        result = self._call("Nearest", params, timeout)
         check_proto_stat(result.stat)
         return result.value, result.versionMajor
     
     @error_handler
-    def changes(self, uu, fromVersion, toVersion, resolution):
+    def changes(self, uu, fromVersion, toVersion, resolution, timeout=None):
         params = btrdb_pb2.ChangesParams(
             uuid=uu.bytes,
             fromMajor=fromVersion,
             toMajor=toVersion,
             resolution=resolution,
         )
-        for result in self.stub.Changes(params):
+        for result in self._stream("Changes", params, timeout):
             check_proto_stat(result.stat)
             yield result.ranges, result.versionMajor
 
@@ -229,46 +379,47 @@ class Endpoint(object):
             values=protoValues,
             merge_policy=policy_map[policy],
         )
-        result = self.stub.Insert(params)
+        result = self._send("Insert", params, kind="write", points=len(protoValues))
         check_proto_stat(result.stat)
         return result.versionMajor
 
     @error_handler
     def deleteRange(self, uu, start, end):
         params = btrdb_pb2.DeleteParams(uuid=uu.bytes, start=start, end=end)
-        result = self.stub.Delete(params)
+        result = self._send("Delete", params)
         check_proto_stat(result.stat)
         return result.versionMajor
 
     @error_handler
     def info(self):
         params = btrdb_pb2.InfoParams()
-        result = self.stub.Info(params)
+        result = self._send("Info", params)
         check_proto_stat(result.stat)
         return result
 
     @error_handler
     def faultInject(self, typ, args):
         params = btrdb_pb2.FaultInjectParams(type=typ, params=args)
-        result = self.stub.FaultInject(params)
+        result = self._send("FaultInject", params)
         check_proto_stat(result.stat)
         return result.rv
 
     @error_handler
     def flush(self, uu):
         params = btrdb_pb2.FlushParams(uuid=uu.bytes)
-        result = self.stub.Flush(params)
+        result = self._send("Flush", params)
         check_proto_stat(result.stat)
+        return result.versionMajor
 
     @error_handler
     def getMetadataUsage(self, prefix):
         params = btrdb_pb2.MetadataUsageParams(prefix=prefix)
-        result = self.stub.GetMetadataUsage(params)
+        result = self._send("GetMetadataUsage", params)
         check_proto_stat(result.stat)
         return result.tags, result.annotations
 
     @error_handler
-    def generateCSV(self, queryType, start, end, width, depth, includeVersions, *streams):
+    def generateCSV(self, queryType, start, end, width, depth, includeVersions, *streams, timeout=None):
         protoStreams = [btrdb_pb2.StreamCSVConfig(version = stream[0],
                         label = stream[1],
                         uuid = stream[2].bytes)
@@ -280,13 +431,13 @@ class Endpoint(object):
                                             depth = depth,
                                             includeVersions = includeVersions,
                                             streams = protoStreams)
-        for result in self.stub.GenerateCSV(params):
+        for result in self._stream("GenerateCSV", params, timeout):
             check_proto_stat(result.stat)
             yield result.row
 
     @error_handler
-    def sql_query(self, stmt, params=[]):
+    def sql_query(self, stmt, params=[], timeout=None):
         request = btrdb_pb2.SQLQueryParams(query=stmt, params=params)
-        for page in self.stub.SQLQuery(request):
+        for page in self._stream("SQLQuery", request, timeout):
             check_proto_stat(page.stat)
             yield page.SQLQueryRow
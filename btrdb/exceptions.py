@@ -66,12 +66,18 @@ def handle_grpc_error(err):
     details = err.details()
     if details == "[404] stream does not exist":
         raise StreamNotFoundError("Stream not found with provided uuid") from None
-    elif details == "failed to connect to all addresses":
+    elif (details or "").startswith("failed to connect to all addresses"):
         raise ConnectionError("Failed to connect to BTrDB") from None
+    elif str(err.code()) == "StatusCode.UNAVAILABLE":
+        raise ConnectionError(details) from None
     elif any(str(e) in err.details() for e in BTRDB_SERVER_ERRORS):
         raise BTRDBServerError("An error has occured with btrdb-server") from None
     elif str(err.code()) == "StatusCode.PERMISSION_DENIED":
         raise PermissionDenied(details) from None
+    elif str(err.code()) == "StatusCode.DEADLINE_EXCEEDED":
+        raise DeadlineExceeded(details) from None
+    elif str(err.code()) == "StatusCode.CANCELLED":
+        raise QueryCancelled(details) from None
     raise BTrDBError(details) from None
 
 
@@ -108,6 +114,25 @@ class ConnectionError(BTrDBError):
     """
     pass
 
+class DeadlineExceeded(BTrDBError):
+    """
+    Raised when a query does not complete before its deadline
+    """
+    pass
+
+class QueryCancelled(BTrDBError):
+    """
+    Raised when a query is cancelled before it completes
+    """
+    pass
+
+class SpoolFull(BTrDBError):
+    """
+    Raised when an insert could not be spooled because the spool has reached its
+    maximum size on disk.
+    """
+    pass
+
 class StreamNotFoundError(BTrDBError):
     """
     Raised when attempting to perform an operation on a stream that does not exist in
@@ -133,6 +158,13 @@ class BTRDBServerError(BTrDBError):
     """
     pass
 
+class PropertyVersionMismatch(BTRDBServerError):
+    """
+    Raised when the metadata of a stream was changed by someone else since it
+    was last read (the expected property version did not match).
+    """
+    pass
+
 class BTRDBTypeError(TypeError, BTrDBError):
     """
     Raised when attempting to perform an operation with an invalid type.
@@ -245,6 +277,7 @@ BTRDB_ERRORS = {
     415: InvalidPointWidth,
     417: StreamExists,
     418: AmbiguousStream,
+    423: PropertyVersionMismatch,
     425: BadValue,
     429: RecycledUUID,
     441: BadSQLValue,
@@ -258,7 +291,6 @@ BTRDB_SERVER_ERRORS = [
     405,    # WrongEndpoint
     414,    # InsertTooBig
     421,    # WrongArgs
-    423,    # AnnotationVersionMismatch
     424,    # FaultInjectionDisabled
     426,    # ResourceDepleted
     427,    # InvalidVersions
@@ -17,9 +17,11 @@ Module for Stream and related classes
 
 import re
 import json
+import time
 import uuid as uuidlib
 from copy import deepcopy
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 
 from btrdb.utils.buffer import PointBuffer
 from btrdb.point import RawPoint, StatPoint
@@ -27,6 +29,7 @@ from btrdb.transformers import StreamSetTransformer
 from btrdb.utils.timez import currently_as_ns, to_nanoseconds
 from btrdb.utils.conversion import AnnotationEncoder, AnnotationDecoder
 from btrdb.utils.general import pointwidth as pw
+from btrdb.utils import tracing, profile
 from btrdb.exceptions import (
     BTrDBError,
     BTRDBTypeError,
@@ -34,7 +37,9 @@ from btrdb.exceptions import (
     InvalidOperation,
     InvalidCollection,
     StreamNotFoundError,
-    NoSuchPoint
+    NoSuchPoint,
+    ConnectionError,
+    PropertyVersionMismatch
 )
 
 
@@ -45,6 +50,7 @@ from btrdb.exceptions import (
 INSERT_BATCH_SIZE = 50000
 MINIMUM_TIME = -(16 << 56)
 MAXIMUM_TIME = (48 << 56) - 1
+UPDATE_RETRIES = 3
 
 try:
     RE_PATTERN = re._pattern_type
@@ -52,6 +58,81 @@ except Exception:
     RE_PATTERN = re.Pattern
 
 
+##########################################################################
+## Helper Functions
+##########################################################################
+
+def _is_point(item):
+    """
+    Returns True if the item is a single (time, value) point rather than a
+    chunk of points.
+    """
+    if hasattr(item, "time"):
+        return True
+    return len(item) == 2 and not hasattr(item[0], "__len__")
+
+
+def _array_points(arr):
+    """
+    Converts a 2D array of (time, value) rows into a list of points, casting
+    the times back to int since mixed arrays are stored as floats.
+    """
+    return [(int(t), v) for t, v in arr.tolist()]
+
+
+def _is_point_sequence(data):
+    """
+    Returns True if the insert data is a sequence of points that can be sliced
+    directly, judged by its first element so that a list of chunks is not.
+    """
+    return isinstance(data, Sequence) and (len(data) == 0 or _is_point(data[0]))
+
+
+def _insert_batches(data, size=INSERT_BATCH_SIZE):
+    """
+    Yields lists of at most `size` points from insert data. Sequences of
+    points are sliced; anything else (including a list of chunks) is consumed
+    lazily and may yield individual (time, value) points or chunks of points
+    (lists or 2D arrays).
+    """
+    if _is_point_sequence(data):
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+        return
+
+    if getattr(data, "ndim", None) == 2:
+        for i in range(0, len(data), size):
+            yield _array_points(data[i:i + size])
+        return
+
+    batch = []
+    for item in data:
+        if _is_point(item):
+            batch.append(item)
+        else:
+            batch.extend(_array_points(item) if getattr(item, "ndim", None) == 2 else item)
+
+        # slice full batches from an offset and compact once, so that a
+        # large chunk is not copied again for every batch it yields
+        offset = 0
+        while len(batch) - offset >= size:
+            yield batch[offset:offset + size]
+            offset += size
+        if offset:
+            del batch[:offset]
+
+    if batch:
+        yield batch
+
+
+def _deadline(timeout):
+    """
+    Returns the keyword arguments passing a per-query deadline to the
+    endpoint, leaving the endpoint's default in place if timeout is None.
+    """
+    return {} if timeout is None else {"timeout": timeout}
+
+
 ##########################################################################
 ## Stream Classes
 ##########################################################################
@@ -420,11 +501,18 @@ class Stream(object):
         consequence, the insert is not necessarily atomic, but can be used with
         a very large array.
 
+        Data that is not a list of points may be any iterable (e.g. a list or
+        a generator reading a file) of (time, value) tuples or of chunks of
+        points such as lists or 2D numpy arrays. Iterables are consumed lazily in batch sized
+        pieces and the next batch is read while the previous one is sent, so
+        unbounded sources are inserted in constant memory.
+
         Parameters
         ----------
-        data: list[tuple[int, float]]
+        data: list[tuple[int, float]] or iterable
             A list of tuples in which each tuple contains a time (int) and
-            value (float) for insertion to the database
+            value (float) for insertion to the database, or an iterable of
+            such tuples or of chunks of them.
         merge: str
             A string describing the merge policy. Valid policies are:
               - 'never': the default, no points are merged
@@ -435,17 +523,60 @@ class Stream(object):
         Returns
         -------
         int
-            The version of the stream after inserting new points.
+            The version of the stream after inserting new points. If a spool
+            is enabled on the BTrDB object and the insert was spooled because
+            the server could not be reached, None is returned.
 
         """
-        i = 0
-        version = 0
-        while i < len(data):
-            thisBatch = data[i:i + INSERT_BATCH_SIZE]
-            version = self._btrdb.ep.insert(self._uuid, thisBatch, merge)
-            i += INSERT_BATCH_SIZE
+        with tracing.span("btrdb.insert", uuid=str(self._uuid), merge=merge) as span:
+            version, points = self._insert(data, merge)
+            tracing.set_attributes(span, points=points, version=version)
         return version
 
+    def _insert(self, data, merge):
+        """
+        Inserts data in batches, returning the version of the stream after
+        the last batch and the number of points inserted.
+        """
+        batches = _insert_batches(data)
+        version, points = 0, 0
+        if _is_point_sequence(data):
+            for batch in batches:
+                version = self._insert_batch(batch, merge)
+                points += len(batch)
+            return version, points
+
+        # overlap reading the next batch with sending the previous one
+        insert_batch = tracing.propagate_context(self._insert_batch)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="btrdb-insert") as sender:
+            pending = None
+            for batch in batches:
+                if pending is not None:
+                    version = pending.result()
+                pending = sender.submit(insert_batch, batch, merge)
+                points += len(batch)
+            if pending is not None:
+                version = pending.result()
+        return version, points
+
+    def _insert_batch(self, batch, merge):
+        """
+        Sends a single insert batch. If the BTrDB object has a spool, batches
+        that cannot be sent because the server is unreachable are spooled and
+        previously spooled batches are replayed first to preserve ordering.
+        """
+        spool = getattr(self._btrdb, "spool", None)
+        if spool is None:
+            return self._btrdb.ep.insert(self._uuid, batch, merge)
+
+        try:
+            if spool.pending:
+                spool.replay(self._btrdb)
+            return self._btrdb.ep.insert(self._uuid, batch, merge)
+        except ConnectionError:
+            spool.append(self._uuid, batch, merge)
+            return None
+
     def _update_tags_collection(self, tags, collection):
         tags = self.tags() if tags is None else tags
         collection = self.collection if collection is None else collection
@@ -577,7 +708,49 @@ class Stream(object):
         return self._btrdb.ep.deleteRange(self._uuid, to_nanoseconds(start),
             to_nanoseconds(end))
 
-    def values(self, start, end, version=0):
+    def _materialize(self, results, point_cls, limit=None):
+        """
+        Converts the (points, version) messages returned by the endpoint into
+        a list of (point, version) tuples, stopping after `limit` points. The
+        results are closed afterwards so that an unfinished call is cancelled.
+        """
+        materialized = []
+        metrics = getattr(self._btrdb.ep, "metrics", None)
+        decoding = waiting = 0.0
+        messages = 0
+        try:
+            if limit is not None and limit <= 0:
+                return materialized
+            results = iter(results)
+            while True:
+                started = time.perf_counter()
+                try:
+                    points, version = next(results)
+                except StopIteration:
+                    break
+                finally:
+                    waiting += time.perf_counter() - started
+
+                messages += 1
+                started = time.perf_counter()
+                for point in points:
+                    materialized.append((point_cls.from_proto(point), version))
+                    if limit is not None and len(materialized) >= limit:
+                        decoding += time.perf_counter() - started
+                        return materialized
+                decoding += time.perf_counter() - started
+        finally:
+            close = getattr(results, "close", None)
+            if close is not None:
+                close()
+            if metrics is not None:
+                metrics.observe_decode(point_cls.__name__, len(materialized), decoding)
+            report = profile.active()
+            if report is not None:
+                report.record_query(self._uuid, messages, len(materialized), waiting, decoding)
+        return materialized
+
+    def values(self, start, end, version=0, limit=None, timeout=None):
         """
         Read raw values from BTrDB between time [a, b) in nanoseconds.
 
@@ -595,6 +768,12 @@ class Stream(object):
             :func:`btrdb.utils.timez.to_nanoseconds` for valid input types)
         version: int
             The version of the stream to be queried
+        limit : int, optional
+            The maximum number of points to return. The query is cancelled
+            once enough points have been received.
+        timeout : float, optional
+            The deadline of the query in seconds, by default the connection's
+            timeout.
 
         Returns
         ------
@@ -612,17 +791,17 @@ class Stream(object):
         the vector nodes.
 
         """
-        materialized = []
         start = to_nanoseconds(start)
         end = to_nanoseconds(end)
 
-        point_windows = self._btrdb.ep.rawValues(self._uuid, start, end, version)
-        for point_list, version in point_windows:
-            for point in point_list:
-                materialized.append((RawPoint.from_proto(point), version))
-        return materialized
+        with tracing.span("btrdb.values", uuid=str(self._uuid), start=start, end=end,
+                          version=version, limit=limit) as span:
+            point_windows = self._btrdb.ep.rawValues(self._uuid, start, end, version, **_deadline(timeout))
+            points = self._materialize(point_windows, RawPoint, limit)
+            tracing.set_attributes(span, points=len(points))
+        return points
 
-    def aligned_windows(self, start, end, pointwidth, version=0):
+    def aligned_windows(self, start, end, pointwidth, version=0, limit=None, timeout=None):
         """
         Read statistical aggregates of windows of data from BTrDB.
 
@@ -652,6 +831,12 @@ class Stream(object):
             Specify the number of ns between data points (2**pointwidth)
         version : int
             Version of the stream to query
+        limit : int, optional
+            The maximum number of windows to return. The query is cancelled
+            once enough windows have been received.
+        timeout : float, optional
+            The deadline of the query in seconds, by default the connection's
+            timeout.
 
         Returns
         -------
@@ -665,18 +850,17 @@ class Stream(object):
         As the window-width is a power-of-two, it aligns with BTrDB internal
         tree data structure and is faster to execute than `windows()`.
         """
-        materialized = []
         start = to_nanoseconds(start)
         end = to_nanoseconds(end)
 
-        windows = self._btrdb.ep.alignedWindows(self._uuid, start, end, pointwidth, version)
-        for stat_points, version in windows:
-            for point in stat_points:
-                materialized.append((StatPoint.from_proto(point), version))
-
-        return tuple(materialized)
+        with tracing.span("btrdb.aligned_windows", uuid=str(self._uuid), start=start, end=end,
+                          pointwidth=pointwidth, version=version, limit=limit) as span:
+            windows = self._btrdb.ep.alignedWindows(self._uuid, start, end, pointwidth, version, **_deadline(timeout))
+            points = tuple(self._materialize(windows, StatPoint, limit))
+            tracing.set_attributes(span, points=len(points))
+        return points
 
-    def windows(self, start, end, width, depth=0, version=0):
+    def windows(self, start, end, width, depth=0, version=0, limit=None, timeout=None):
         """
         Read arbitrarily-sized windows of data from BTrDB.  StatPoint objects
         will be returned representing the data for each window.
@@ -693,6 +877,12 @@ class Stream(object):
             The number of nanoseconds in each window.
         version : int
             The version of the stream to query.
+        limit : int, optional
+            The maximum number of windows to return. The query is cancelled
+            once enough windows have been received.
+        timeout : float, optional
+            The deadline of the query in seconds, by default the connection's
+            timeout.
 
         Returns
         -------
@@ -716,18 +906,17 @@ class Stream(object):
         for depth is now 0.
 
         """
-        materialized = []
         start = to_nanoseconds(start)
         end = to_nanoseconds(end)
 
-        windows = self._btrdb.ep.windows(self._uuid, start, end, width, depth, version)
-        for stat_points, version in windows:
-            for point in stat_points:
-                materialized.append((StatPoint.from_proto(point), version))
+        with tracing.span("btrdb.windows", uuid=str(self._uuid), start=start, end=end, width=width,
+                          depth=depth, version=version, limit=limit) as span:
+            windows = self._btrdb.ep.windows(self._uuid, start, end, width, depth, version, **_deadline(timeout))
+            points = tuple(self._materialize(windows, StatPoint, limit))
+            tracing.set_attributes(span, points=len(points))
+        return points
 
-        return tuple(materialized)
-
-    def nearest(self, time, version, backward=False):
+    def nearest(self, time, version, backward=False, timeout=None):
         """
         Finds the closest point in the stream to a specified time.
 
@@ -746,6 +935,9 @@ class Stream(object):
             Version of the stream to use in search
         backward : boolean
             True to search backwards from time, else false for forward
+        timeout : float, optional
+            The deadline of the query in seconds, by default the connection's
+            timeout.
 
         Returns
         -------
@@ -756,7 +948,7 @@ class Stream(object):
         """
         try:
             rp, version = self._btrdb.ep.nearest(self._uuid,
-                to_nanoseconds(time), version, backward)
+                to_nanoseconds(time), version, backward, **_deadline(timeout))
         except BTrDBError as exc:
             if not isinstance(exc, NoSuchPoint):
                 raise
@@ -782,8 +974,13 @@ class Stream(object):
         """
         Flush writes the stream buffers out to persistent storage.
 
+        Returns
+        -------
+        int
+            The version of the stream after flushing
+
         """
-        self._btrdb.ep.flush(self._uuid)
+        return self._btrdb.ep.flush(self._uuid)
 
     def __repr__(self):
         return "<Stream collection={} name={}>".format(self.collection,
@@ -806,6 +1003,7 @@ class StreamSetBase(Sequence):
         self.pointwidth = None
         self.width = None
         self.depth = None
+        self.point_limit = None
 
     @property
     def allow_window(self):
@@ -1174,6 +1372,53 @@ class StreamSetBase(Sequence):
         self.pointwidth = int(pointwidth)
         return self
 
+    def limit(self, n):
+        """
+        Stores the maximum number of points (or windows) to read from each
+        stream when the query is eventually materialized. Each stream's query
+        is cancelled as soon as enough points have been received.
+
+        Parameters
+        ----------
+        n : int
+            The maximum number of points per stream.
+
+        Returns
+        -------
+        StreamSet
+            Returns self
+
+        """
+        n = int(n)
+        if n < 0:
+            raise BTRDBValueError("limit must not be negative")
+
+        self.point_limit = n
+        return self
+
+    def head(self, n=5):
+        """
+        Returns the first `n` points (or windows) of each stream, reading no
+        more than that from the server. The StreamSet itself is not modified.
+
+        Parameters
+        ----------
+        n : int, default: 5
+            The number of points per stream.
+
+        Returns
+        -------
+        list
+            A list of lists of points, one list per stream.
+
+        """
+        params = self._params_from_filters()
+        obj = self.filter(
+            start=params.get("start", MINIMUM_TIME),
+            end=params.get("end", MAXIMUM_TIME),
+        )
+        return obj.limit(n).values()
+
     def _streamset_data(self, as_iterators=False):
         """
         Private method to return a list of lists representing the data from each
@@ -1188,6 +1433,9 @@ class StreamSetBase(Sequence):
         versions = self.versions()
         data = []
 
+        if self.point_limit is not None:
+            params.update({"limit": self.point_limit})
+
         if self.pointwidth is not None:
             # create list of stream.aligned_windows data
             params.update({"pointwidth": self.pointwidth})
@@ -1206,7 +1454,9 @@ class StreamSetBase(Sequence):
 
         else:
             # create list of stream.values
-            data = [s.values(**params) for s in self._streams]
+            for s in self._streams:
+                params.update({"version": versions[s.uuid]})
+                data.append(s.values(**params))
 
         if as_iterators:
             return [iter(ii) for ii in data]
@@ -1231,10 +1481,23 @@ class StreamSetBase(Sequence):
             version (list(tuple(RawPoint, int))).
 
         """
-        result = []
-        streamset_data = self._streamset_data(as_iterators=True)
-        buffer = PointBuffer(len(self._streams))
+        with self._span("btrdb.streamset.rows") as span, profile.phase("materialize"):
+            result = []
+            streamset_data = self._streamset_data(as_iterators=True)
+            buffer = PointBuffer(len(self._streams))
+
+            with profile.phase("align"):
+                self._align(streamset_data, buffer, result)
 
+            tracing.set_attributes(span, rows=len(result))
+
+        return result
+
+    def _align(self, streamset_data, buffer, result):
+        """
+        Merges the points of the streams' iterators into rows of points at
+        the same time, appending them to result.
+        """
         while True:
             streams_empty = True
 
@@ -1257,7 +1520,41 @@ class StreamSetBase(Sequence):
             if streams_empty and len(buffer.keys()) == 0:
                 break
 
-        return result
+    def profile(self):
+        """
+        Returns a context manager profiling the queries and transformations
+        run in its block, yielding a :class:`btrdb.utils.profile.QueryProfile`
+        of the RPCs sent and the time spent waiting for results, constructing
+        point objects, aligning rows and transforming data, overall and per
+        stream. Streams are named by collection and name in the report; the
+        metadata of streams that is not yet known is fetched beforehand.
+
+        Examples
+        --------
+        >>> with streams.profile() as report:
+        ...     df = streams.to_dataframe()
+        >>> print(report)
+
+        """
+        unknown = [s for s in self._streams if s._collection is None or s._tags is None]
+        self._fan_out(lambda s: s.refresh_metadata(), unknown)
+
+        names = {}
+        for s in self._streams:
+            name = s._tags.get("name")
+            names[s.uuid] = str(s.uuid) if name is None else "{}/{}".format(s._collection, name)
+        return profile.profile(names)
+
+    def _span(self, name):
+        """
+        Returns a tracing span for a materialization of the streamset with
+        its filters and window settings as attributes.
+        """
+        params = self._params_from_filters()
+        return tracing.span(
+            name, streams=len(self._streams), start=params.get("start"), end=params.get("end"),
+            pointwidth=self.pointwidth, width=self.width, depth=self.depth, limit=self.point_limit,
+        )
 
     def _params_from_filters(self):
         params = {}
@@ -1278,13 +1575,291 @@ class StreamSetBase(Sequence):
         """
         Returns a fully materialized list of lists for the stream values/points
         """
-        result = []
-        streamset_data = self._streamset_data()
-        for stream_data in streamset_data:
-            result.append([point[0] for point in stream_data])
+        with self._span("btrdb.streamset.values") as span, profile.phase("materialize"):
+            result = []
+            streamset_data = self._streamset_data()
+            for stream_data in streamset_data:
+                result.append([point[0] for point in stream_data])
+            tracing.set_attributes(span, points=sum(len(points) for points in result))
 
         return result
 
+    def arrays(self, engine=None, transform=None):
+        """
+        Returns the data of each stream as a numpy structured array with
+        "time" and "value" fields (or the fields of a StatPoint when a
+        window operation is requested), skipping the creation of point
+        objects.
+
+        Parameters
+        ----------
+        engine : ProcessQueryEngine, optional
+            Fetch and decode the streams in worker processes (see
+            :class:`btrdb.utils.parallel.ProcessQueryEngine`) to use more
+            than one CPU core. By default the streams are fetched
+            concurrently in this process.
+        transform : callable, optional
+            A function applied to each stream's array, returning an array.
+            With an engine it must be picklable and is run in the workers.
+
+        Returns
+        -------
+        list of numpy.ndarray
+            One array per stream.
+
+        """
+        with self._span("btrdb.streamset.arrays") as span, profile.phase("materialize"):
+            arrays = self._arrays(engine, transform)
+            tracing.set_attributes(span, points=sum(len(arr) for arr in arrays))
+        return arrays
+
+    def _arrays(self, engine, transform):
+        from btrdb.utils.parallel import fetch_array, window_query
+
+        if engine is not None:
+            return engine.run(self, transform=transform)
+
+        params = self._params_from_filters()
+        versions = self.versions()
+        query, _ = window_query(self)
+
+        def fetch(stream):
+            arr = fetch_array(
+                stream, params.get("start", MINIMUM_TIME), params.get("end", MAXIMUM_TIME),
+                versions[stream.uuid], query,
+            )
+            return arr if transform is None else transform(arr)
+
+        return self._fan_out(fetch)
+
+    def _fan_out(self, func, items=None):
+        """
+        Applies func to each item (by default each stream) concurrently using
+        the executor of the streams' BTrDB object, returning the results in
+        the order of the items.
+        """
+        items = self._streams if items is None else items
+        if not self._streams or not items:
+            return []
+        return self._streams[0].btrdb._fan_out(func, items)
+
+    def _insert_payload(self, data):
+        """
+        Returns a list of (stream, points) tuples for the supported StreamSet
+        insert data formats.
+        """
+        if isinstance(data, dict):
+            payload = []
+            for key, points in data.items():
+                if not isinstance(key, uuidlib.UUID):
+                    key = uuidlib.UUID(str(key))
+                try:
+                    payload.append((self[key], points))
+                except KeyError:
+                    raise BTRDBValueError("stream `{}` is not in the StreamSet".format(key)) from None
+            return payload
+
+        # duck type pandas DataFrame objects to avoid importing pandas
+        if hasattr(data, "columns") and hasattr(data, "index"):
+            return self._insert_payload_from_frame(data)
+
+        if isinstance(data, (list, tuple)):
+            if len(data) != len(self._streams):
+                raise BTRDBValueError("expected data for each of the {} streams".format(len(self._streams)))
+            return list(zip(self._streams, data))
+
+        raise BTRDBTypeError("data must be a dict, list, or pandas DataFrame")
+
+    def _insert_payload_from_frame(self, df):
+        """
+        Converts a wide DataFrame (time index, one column per stream) into a
+        list of (stream, points) tuples. Columns may be named by stream UUID
+        or by "collection/name". Missing (NaN) values are not inserted.
+        """
+        import numpy as np
+
+        index = df.index
+        if str(index.dtype).startswith("datetime64"):
+            if getattr(index, "tz", None) is not None:
+                index = index.tz_convert("UTC").tz_localize(None)
+            times = np.asarray(index.values.astype("datetime64[ns]").astype(np.int64))
+        else:
+            times = np.asarray(index.values, dtype=np.int64)
+
+        by_name = {}
+        for stream in self._streams:
+            by_name[str(stream.uuid)] = stream
+            by_name[stream.uuid] = stream
+
+        payload = []
+        for column in df.columns:
+            stream = by_name.get(column)
+            if stream is None and isinstance(column, str) and "/" in column:
+                matches = [
+                    s for s in self._streams
+                    if "{}/{}".format(s.collection, s.name) == column
+                ]
+                stream = matches[0] if len(matches) == 1 else None
+            if stream is None:
+                raise BTRDBValueError("could not match column `{}` to a stream in the StreamSet".format(column))
+
+            values = np.asarray(df[column].values, dtype=np.float64)
+            mask = ~np.isnan(values)
+            payload.append((stream, list(zip(times[mask].tolist(), values[mask].tolist()))))
+        return payload
+
+    def insert(self, data, merge='never'):
+        """
+        Inserts data into the streams of the StreamSet. The per-stream inserts
+        are sent concurrently, bounded by the `max_concurrency` of the
+        BTrDB object.
+
+        Parameters
+        ----------
+        data : dict, list or pandas.DataFrame
+            The data to insert in one of the following forms:
+              - a dict with stream UUID keys and lists of (time, value) tuples
+              - a list with a list of (time, value) tuples for each stream
+              - a DataFrame indexed by time (int nanoseconds or datetime64)
+                with one column per stream named by UUID or "collection/name".
+                NaN values are skipped.
+        merge : str
+            A string describing the merge policy (see `Stream.insert`).
+
+        Returns
+        -------
+        dict
+            The version of each stream after inserting (dict[UUID, int]).
+
+        """
+        payload = self._insert_payload(data)
+        versions = self._fan_out(
+            lambda item: item[0].insert(item[1], merge=merge), payload
+        )
+        return {stream.uuid: version for (stream, _), version in zip(payload, versions)}
+
+    def delete(self, start, end, dry_run=False):
+        """
+        "Delete" all points between [`start`, `end`) in every stream of the
+        StreamSet. The per-stream deletes are sent concurrently, bounded by
+        the `max_concurrency` of the BTrDB object.
+
+        Parameters
+        ----------
+        start : int or datetime like object
+            The start time in nanoseconds for the range to be deleted. (see
+            :func:`btrdb.utils.timez.to_nanoseconds` for valid input types)
+        end : int or datetime like object
+            The end time in nanoseconds for the range to be deleted. (see
+            :func:`btrdb.utils.timez.to_nanoseconds` for valid input types)
+        dry_run : bool, default: False
+            Do not delete anything and instead return the number of points in
+            the range for each stream. Counts are computed with
+            ``aligned_windows`` (see `Stream.count`) so they may not include
+            points near `start` and `end` that fall outside of a full window.
+
+        Returns
+        -------
+        dict
+            The version of each stream after deleting (dict[UUID, int]), or
+            the number of points that would be deleted if `dry_run` is True.
+        """
+        start, end = to_nanoseconds(start), to_nanoseconds(end)
+        if start >= end:
+            raise BTRDBValueError("start must be before end")
+
+        if dry_run:
+            versions = self._pinned_versions or {}
+            func = lambda s: s.count(start, end, version=versions.get(s.uuid, 0))
+        else:
+            func = lambda s: s.delete(start, end)
+
+        results = self._fan_out(func)
+        return {stream.uuid: result for stream, result in zip(self._streams, results)}
+
+    def update(self, tags=None, annotations=None, collection=None,
+               encoder=AnnotationEncoder, replace=False, retries=UPDATE_RETRIES):
+        """
+        Updates the metadata of every stream in the StreamSet as an UPSERT
+        operation (see `Stream.update`). The per-stream updates are sent
+        concurrently, bounded by the `max_concurrency` of the BTrDB object.
+
+        If the metadata of a stream was changed by someone else since it was
+        read, the stream's metadata is re-read and the update is retried.
+
+        Parameters
+        -----------
+        tags : dict or callable, optional
+            The tags to upsert or replace in each stream, or a function that
+            is called with each stream and returns its tags (or None to leave
+            them unchanged). Functions are called again with the refreshed
+            stream when an update is retried.
+        annotations : dict or callable, optional
+            The annotations to upsert or replace in each stream, or a
+            function of the stream as with `tags`.
+        collection : str or callable, optional
+            The new collection of each stream, or a function of the stream
+            as with `tags`.
+        encoder : json.JSONEncoder or None
+            JSON encoder class to use for annotation serialization. Set to None
+            to prevent JSON encoding of the annotations.
+        replace : bool, default: False
+            Replace all annotations or tags with the specified dictionaries
+            instead of performing the normal upsert operation.
+        retries : int, default: 3
+            The number of times the update of a stream is retried after a
+            property version mismatch before PropertyVersionMismatch is raised.
+
+        Returns
+        -------
+        dict
+            The property version of each stream after updating
+            (dict[UUID, int]). Streams for which every callable returned None
+            are left unchanged and map to their current property version.
+        """
+        if tags is None and annotations is None and collection is None:
+            raise BTRDBValueError("you must supply a tags, annotations, or collection argument")
+
+        def resolve(value, stream):
+            return value(stream) if callable(value) else value
+
+        def update(stream):
+            if stream._property_version is None:
+                stream.refresh_metadata()
+
+            for attempt in range(retries + 1):
+                changes = {
+                    "tags": resolve(tags, stream),
+                    "annotations": resolve(annotations, stream),
+                    "collection": resolve(collection, stream),
+                }
+                if all(value is None for value in changes.values()):
+                    return stream._property_version
+
+                try:
+                    return stream.update(encoder=encoder, replace=replace, **changes)
+                except PropertyVersionMismatch:
+                    if attempt == retries:
+                        raise
+                    stream.refresh_metadata()
+
+        versions = self._fan_out(update)
+        return {stream.uuid: version for stream, version in zip(self._streams, versions)}
+
+    def flush(self):
+        """
+        Flushes the buffers of every stream in the StreamSet out to persistent
+        storage. The per-stream flushes are sent concurrently, bounded by the
+        `max_concurrency` of the BTrDB object.
+
+        Returns
+        -------
+        dict
+            The version of each stream after flushing (dict[UUID, int]).
+        """
+        versions = self._fan_out(lambda stream: stream.flush())
+        return {stream.uuid: version for stream, version in zip(self._streams, versions)}
+
     def __repr__(self):
         token = "stream" if len(self) == 1 else "streams"
         return "<{}({} {})>".format(
@@ -20,6 +20,8 @@ import contextlib
 from collections import OrderedDict
 from warnings import warn
 
+from btrdb.utils.profile import profiled
+
 ##########################################################################
 ## Helper Functions
 ##########################################################################
@@ -47,6 +49,7 @@ def _stream_names(streamset, func):
 ## Transform Functions
 ##########################################################################
 
+@profiled("transform")
 def to_series(streamset, datetime64_index=True, agg="mean", name_callable=None):
     """
     Returns a list of Pandas Series objects indexed by time
@@ -101,6 +104,7 @@ def to_series(streamset, datetime64_index=True, agg="mean", name_callable=None):
     return result
 
 
+@profiled("transform")
 def to_dataframe(streamset, columns=None, agg="mean", name_callable=None):
     """
     Returns a Pandas DataFrame object indexed by time and using the values of a
@@ -156,6 +160,134 @@ def to_dataframe(streamset, columns=None, agg="mean", name_callable=None):
     return df
 
 
+def _dask_partition(streamset, meta, agg, datetime64_index):
+    """
+    private function run by Dask workers to materialize one time partition
+    of a StreamSet as a Pandas DataFrame matching meta.
+    """
+    import pandas as pd
+
+    data = to_dict(streamset, agg=agg)
+    if not data:
+        return meta.copy()
+
+    df = pd.DataFrame(data).set_index("time")
+    df.columns = meta.columns
+    if datetime64_index:
+        df.index = pd.Index(df.index, dtype='datetime64[ns]', name="time")
+    return df.astype(meta.dtypes.to_dict())
+
+
+@profiled("transform")
+def to_dask(streamset, partition_freq="1D", agg="mean", name_callable=None, datetime64_index=True):
+    """
+    Returns a lazy Dask DataFrame indexed by time and using the values of a
+    stream for each column. Each partition is a time range of the query that
+    is fetched by a Dask worker using the stream versions of the StreamSet,
+    and the divisions of the DataFrame are known from the partition bounds.
+
+    If the StreamSet has no start or end filter, the time range is taken from
+    the earliest and latest points of the streams.
+
+    Parameters
+    ----------
+    partition_freq : str, pd.Timedelta or int, default: "1D"
+        The time span of each partition as a Pandas frequency string,
+        Timedelta or int in nanoseconds. Partitions are aligned to multiples
+        of partition_freq since the epoch and, for window queries, rounded up
+        to a multiple of the window size.
+
+    agg : str, default: "mean"
+        Specify the StatPoint field (e.g. aggregating function) to create the
+        columns from. Must be one of "min", "mean", "max", "count", or
+        "stddev". This argument is ignored if RawPoint values are queried.
+
+    name_callable : lambda, default: lambda s: s.collection + "/" +  s.name
+        Sprecify a callable that can be used to determine the column name given
+        a Stream object.
+
+    datetime64_index: bool
+        Directs function to convert the index to np.datetime64[ns] or leave
+        it as np.int64.
+
+    """
+    try:
+        import pandas as pd
+        import dask
+        import dask.dataframe as dd
+    except ImportError:
+        raise ImportError("Please install Dask and Pandas to use this transformation function.")
+
+    from btrdb.stream import MINIMUM_TIME, MAXIMUM_TIME
+    from btrdb.exceptions import BTRDBValueError
+
+    # TODO: allow this at some future point
+    if agg == "all":
+        raise AttributeError("cannot use 'all' as aggregate at this time")
+
+    if streamset.point_limit is not None:
+        raise BTRDBValueError("cannot partition a StreamSet with a point limit")
+
+    if not callable(name_callable):
+        name_callable = lambda s: s.collection + "/" +  s.name
+
+    if isinstance(partition_freq, int):
+        step = partition_freq
+    else:
+        step = pd.Timedelta(partition_freq).value
+    if step <= 0:
+        raise BTRDBValueError("partition_freq must be a positive time span")
+
+    # every partition is fetched at the same versions
+    streamset = streamset.clone()
+    streamset.pin_versions(streamset.versions())
+
+    params = streamset._params_from_filters()
+    start = params.get("start")
+    end = params.get("end")
+    if start is None:
+        points = [p for p in streamset.earliest() if p is not None]
+        start = min(p.time for p in points) if points else MINIMUM_TIME
+    if end is None:
+        points = [p for p in streamset.latest() if p is not None]
+        end = max(p.time for p in points) + 1 if points else start + 1
+
+    # partition boundaries must fall on window boundaries
+    if streamset.pointwidth is not None:
+        align = 1 << streamset.pointwidth
+        start -= start % align
+    elif streamset.width is not None and streamset.depth is not None:
+        align = streamset.width
+    else:
+        align = 1
+    step = -(-step // align) * align
+
+    if align > 1 and streamset.pointwidth is None:
+        bounds = list(range(start, end, step))
+    else:
+        bounds = [start] + list(range(start - start % step + step, end, step))
+    bounds.append(end)
+
+    names = _stream_names(streamset, name_callable)
+    index_dtype = 'datetime64[ns]' if datetime64_index else 'int64'
+    meta = pd.DataFrame(
+        {name: pd.Series(dtype='float64') for name in names},
+        index=pd.Index([], dtype=index_dtype, name="time"),
+    )
+
+    partition = dask.delayed(_dask_partition, pure=True)
+    parts = [
+        partition(streamset.filter(start=lo, end=hi), meta, agg, datetime64_index)
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+
+    divisions = bounds[:-1] + [end - 1]
+    if datetime64_index:
+        divisions = list(pd.Index(divisions, dtype='datetime64[ns]'))
+    return dd.from_delayed(parts, meta=meta, divisions=divisions)
+
+
+@profiled("transform")
 def to_array(streamset, agg="mean"):
     """
     Returns a multidimensional numpy array (similar to a list of lists) containing point
@@ -190,6 +322,7 @@ def to_array(streamset, agg="mean"):
     return np.array(results)
 
 
+@profiled("transform")
 def to_dict(streamset, agg="mean", name_callable=None):
     """
     Returns a list of OrderedDict for each time code with the appropriate
@@ -230,6 +363,7 @@ def to_dict(streamset, agg="mean", name_callable=None):
     return data
 
 
+@profiled("transform")
 def to_csv(streamset, fobj, dialect=None, fieldnames=None, agg="mean", name_callable=None):
     """
     Saves stream data as a CSV file.
@@ -288,6 +422,7 @@ def to_csv(streamset, fobj, dialect=None, fieldnames=None, agg="mean", name_call
             writer.writerow(item)
 
 
+@profiled("transform")
 def to_table(streamset, agg="mean", name_callable=None):
     """
     Returns string representation of the data in tabular form using the tabulate
@@ -332,6 +467,7 @@ class StreamSetTransformer(object):
     to_array = to_array
     to_series = to_series
     to_dataframe = to_dataframe
+    to_dask = to_dask
 
     to_csv = to_csv
     to_table = to_table
@@ -0,0 +1,653 @@
+# btrdb.utils.fake
+# An in-process fake BTrDB server for tests and benchmarks
+#
+# Author:   PingThings
+# Created:  Sat Oct 31 10:17:42 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: fake.py [] allen@pingthings.io $
+
+"""
+An in-process fake BTrDB server for tests and benchmarks.
+
+FakeServer serves a FakeBTrDB servicer over gRPC on a local port, keeping
+versioned streams in memory. Queries, inserts, deletes, stream metadata,
+lookups and a small subset of SQL are supported, so the client can be run
+end-to-end (including gRPC streaming, message sizes and decoding) without a
+cluster. The latency of each call and the number of points per response
+message are configurable to approximate a real server.
+
+Usage::
+
+    with FakeServer(latency=0.002) as server:
+        uu = server.add_stream("sensors", tags={"name": "voltage"}, points=points)
+        db = server.connect()
+        db.stream_from_uuid(uu).values(start, end)
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import re
+import json
+import math
+import time
+import bisect
+import threading
+import uuid as uuidlib
+from operator import itemgetter
+from collections import Counter
+from concurrent import futures
+
+import grpc
+
+from btrdb.grpcinterface import btrdb_pb2, btrdb_pb2_grpc
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+# the version of a newly created stream
+INITIAL_VERSION = 10
+
+# the number of points or rows per response message of streaming calls
+DEFAULT_CHUNK_SIZE = 5000
+
+# status codes of the errors returned by the fake server
+NO_SUCH_POINT = 401
+STREAM_NOT_FOUND = 404
+INVALID_TIME_RANGE = 413
+STREAM_EXISTS = 417
+PROPERTY_VERSION_MISMATCH = 423
+VERSION_NOT_AVAILABLE = 450
+NOT_IMPLEMENTED = 501
+
+SQL_COLUMNS = ("uuid", "collection", "name", "unit", "tags", "annotations", "property_version")
+
+SQL_SELECT = re.compile(
+    r"^\s*select\s+(?P<columns>.+?)\s+from\s+streams"
+    r"(?:\s+where\s+(?P<where>.+?))?(?:\s+limit\s+(?P<limit>\d+))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+SQL_CONDITION = re.compile(
+    r"^\s*(?P<column>\w+)\s*(?P<op>=|like|ilike)\s*(?P<value>\$\d+|'(?:[^']|'')*')\s*$",
+    re.IGNORECASE,
+)
+
+
+class FakeError(Exception):
+    """
+    Raised inside the servicer to return an error status to the client.
+    """
+
+    def __init__(self, code, msg):
+        super(FakeError, self).__init__(msg)
+        self.code = code
+        self.msg = msg
+
+    def stat(self):
+        return btrdb_pb2.Status(code=self.code, msg=self.msg)
+
+
+##########################################################################
+## Streams
+##########################################################################
+
+class FakeStream(object):
+    """
+    The metadata and version history of a stream. Each version is an
+    immutable snapshot of sorted times and values, so queries of older
+    versions are consistent while new versions are written.
+    """
+
+    def __init__(self, uuid, collection, tags=None, annotations=None):
+        self.uuid = uuid
+        self.collection = collection
+        self.tags = dict(tags or {})
+        self.annotations = dict(annotations or {})
+        self.property_version = 0
+
+        # (version, times, values, changed range) tuples in version order
+        self.versions = [(INITIAL_VERSION, [], [], None)]
+
+    @property
+    def version(self):
+        return self.versions[-1][0]
+
+    def snapshot(self, version=0):
+        """
+        Returns the (version, times, values) of version, 0 being the latest.
+        """
+        if version == 0:
+            version, times, values, _ = self.versions[-1]
+            return version, times, values
+
+        idx = bisect.bisect_right([v[0] for v in self.versions], version) - 1
+        if idx < 0:
+            raise FakeError(VERSION_NOT_AVAILABLE, "[450] version is not available")
+        version, times, values, _ = self.versions[idx]
+        return version, times, values
+
+    def commit(self, times, values, changed):
+        version = self.version + 1
+        self.versions.append((version, times, values, changed))
+        return version
+
+    def insert(self, points, policy=btrdb_pb2.MergePolicy.NEVER):
+        """
+        Merges (time, value) points into a new version, returning it.
+        """
+        points = sorted(points, key=itemgetter(0))
+        if not points:
+            return self.version
+
+        _, times, values = self.snapshot()
+        if not times or points[0][0] > times[-1]:
+            # the common case of appending points
+            new_times = times + [t for t, _ in points]
+            new_values = values + [v for _, v in points]
+        else:
+            existing = list(zip(times, values))
+            if policy == btrdb_pb2.MergePolicy.EQUAL:
+                known = set(existing)
+                points = [p for p in points if p not in known]
+            elif policy == btrdb_pb2.MergePolicy.RETAIN:
+                known = set(times)
+                points = [p for p in points if p[0] not in known]
+            elif policy == btrdb_pb2.MergePolicy.REPLACE:
+                replaced = set(t for t, _ in points)
+                existing = [p for p in existing if p[0] not in replaced]
+            if not points:
+                return self.version
+            merged = sorted(existing + points, key=itemgetter(0))
+            new_times = [t for t, _ in merged]
+            new_values = [v for _, v in merged]
+
+        return self.commit(new_times, new_values, (points[0][0], points[-1][0] + 1))
+
+    def delete(self, start, end):
+        _, times, values = self.snapshot()
+        lo, hi = bisect.bisect_left(times, start), bisect.bisect_left(times, end)
+        return self.commit(times[:lo] + times[hi:], values[:lo] + values[hi:], (start, end))
+
+    def changes(self, from_version, to_version, resolution):
+        """
+        Returns the merged (start, end) ranges changed after from_version up
+        to to_version, rounded out to multiples of 2^resolution ns.
+        """
+        size = 1 << resolution
+        ranges = sorted(
+            (changed[0] // size * size, -(-changed[1] // size) * size)
+            for version, _, _, changed in self.versions
+            if changed is not None and from_version < version <= to_version
+        )
+
+        merged = []
+        for start, end in ranges:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    def descriptor(self):
+        return btrdb_pb2.StreamDescriptor(
+            uuid=self.uuid.bytes,
+            collection=self.collection,
+            tags=_key_values(self.tags),
+            annotations=_key_values(self.annotations),
+            propertyVersion=self.property_version,
+        )
+
+    def row(self, columns):
+        values = {
+            "uuid": str(self.uuid),
+            "collection": self.collection,
+            "name": self.tags.get("name"),
+            "unit": self.tags.get("unit"),
+            "tags": dict(self.tags),
+            "annotations": dict(self.annotations),
+            "property_version": self.property_version,
+        }
+        return {column: values[column] for column in columns}
+
+
+def _key_values(mapping):
+    return [
+        btrdb_pb2.KeyOptValue(key=key, val=btrdb_pb2.OptValue(value=value))
+        for key, value in mapping.items()
+    ]
+
+
+def _update(mapping, changes, removals=()):
+    """
+    Applies KeyOptValue changes to mapping; keys without a value and keys in
+    removals are removed.
+    """
+    for change in changes:
+        if change.HasField("val"):
+            mapping[change.key] = change.val.value
+        else:
+            mapping.pop(change.key, None)
+    for key in removals:
+        mapping.pop(key, None)
+
+
+def _matches(mapping, expected):
+    for kv in expected:
+        if kv.key not in mapping:
+            return False
+        if kv.HasField("val") and mapping[kv.key] != kv.val.value:
+            return False
+    return True
+
+
+def _stat_point(time, values):
+    count = len(values)
+    mean = sum(values) / count
+    stddev = math.sqrt(sum((value - mean) ** 2 for value in values) / count)
+    return btrdb_pb2.StatPoint(
+        time=time, min=min(values), mean=mean, max=max(values), count=count, stddev=stddev
+    )
+
+
+def _windows(times, values, start, end, width):
+    """
+    Returns the StatPoints of the non-empty windows [start + k * width,
+    start + (k + 1) * width) that end before end.
+    """
+    points = []
+    stop = start + (end - start) // width * width
+    lo, last = bisect.bisect_left(times, start), bisect.bisect_left(times, stop)
+    while lo < last:
+        window = start + (times[lo] - start) // width * width
+        hi = bisect.bisect_left(times, window + width, lo, last)
+        points.append(_stat_point(window, values[lo:hi]))
+        lo = hi
+    return points
+
+
+##########################################################################
+## Servicer
+##########################################################################
+
+class FakeBTrDB(btrdb_pb2_grpc.BTrDBServicer):
+    """
+    A BTrDB servicer keeping versioned streams in memory.
+
+    Parameters
+    ----------
+    latency : float, default: 0
+        The seconds each call is delayed by before it is handled.
+    chunk_size : int, default: 5000
+        The maximum number of points (or rows) per response message of
+        streaming calls.
+    """
+
+    def __init__(self, latency=0.0, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.latency = latency
+        self.chunk_size = chunk_size
+
+        # FakeStreams by UUID and the number of calls of each method
+        self.streams = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    ##########################################################################
+    ## Helpers
+    ##########################################################################
+
+    def create(self, uuid, collection, tags=None, annotations=None):
+        """
+        Creates a stream, returning its FakeStream.
+        """
+        with self._lock:
+            if uuid in self.streams:
+                raise FakeError(STREAM_EXISTS, "[417] stream already exists")
+            stream = self.streams[uuid] = FakeStream(uuid, collection, tags, annotations)
+            return stream
+
+    def stream(self, uuid):
+        if isinstance(uuid, bytes):
+            uuid = uuidlib.UUID(bytes=uuid)
+        stream = self.streams.get(uuid)
+        if stream is None:
+            raise FakeError(STREAM_NOT_FOUND, "[404] stream does not exist")
+        return stream
+
+    def _begin(self, method):
+        with self._lock:
+            self.calls[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _unary(self, method, response_cls, handler):
+        self._begin(method)
+        try:
+            return handler()
+        except FakeError as exc:
+            return response_cls(stat=exc.stat())
+
+    def _streaming(self, method, response_cls, handler):
+        self._begin(method)
+        try:
+            yield from handler()
+        except FakeError as exc:
+            yield response_cls(stat=exc.stat())
+
+    def _chunks(self, items):
+        size = max(1, self.chunk_size)
+        for idx in range(0, len(items), size):
+            yield items[idx:idx + size]
+
+    def _points(self, response_cls, version, points):
+        sent = False
+        for chunk in self._chunks(points):
+            sent = True
+            yield response_cls(versionMajor=version, values=chunk)
+        if not sent:
+            yield response_cls(versionMajor=version)
+
+    ##########################################################################
+    ## Queries
+    ##########################################################################
+
+    def RawValues(self, request, context):
+        def handler():
+            if request.start >= request.end:
+                raise FakeError(INVALID_TIME_RANGE, "[413] invalid time range")
+            version, times, values = self.stream(request.uuid).snapshot(request.versionMajor)
+            lo, hi = bisect.bisect_left(times, request.start), bisect.bisect_left(times, request.end)
+            points = [btrdb_pb2.RawPoint(time=t, value=v) for t, v in zip(times[lo:hi], values[lo:hi])]
+            return self._points(btrdb_pb2.RawValuesResponse, version, points)
+        return self._streaming("RawValues", btrdb_pb2.RawValuesResponse, handler)
+
+    def AlignedWindows(self, request, context):
+        def handler():
+            width = 1 << request.pointWidth
+            start, end = request.start // width * width, request.end // width * width
+            if start >= end:
+                raise FakeError(INVALID_TIME_RANGE, "[413] invalid time range")
+            version, times, values = self.stream(request.uuid).snapshot(request.versionMajor)
+            points = _windows(times, values, start, end, width)
+            return self._points(btrdb_pb2.AlignedWindowsResponse, version, points)
+        return self._streaming("AlignedWindows", btrdb_pb2.AlignedWindowsResponse, handler)
+
+    def Windows(self, request, context):
+        def handler():
+            if request.start >= request.end or request.width == 0:
+                raise FakeError(INVALID_TIME_RANGE, "[413] invalid time range")
+            version, times, values = self.stream(request.uuid).snapshot(request.versionMajor)
+            points = _windows(times, values, request.start, request.end, request.width)
+            return self._points(btrdb_pb2.WindowsResponse, version, points)
+        return self._streaming("Windows", btrdb_pb2.WindowsResponse, handler)
+
+    def Nearest(self, request, context):
+        def handler():
+            version, times, values = self.stream(request.uuid).snapshot(request.versionMajor)
+            if request.backward:
+                idx = bisect.bisect_left(times, request.time) - 1
+            else:
+                idx = bisect.bisect_left(times, request.time)
+            if idx < 0 or idx >= len(times):
+                raise FakeError(NO_SUCH_POINT, "[401] no such point")
+            return btrdb_pb2.NearestResponse(
+                versionMajor=version, value=btrdb_pb2.RawPoint(time=times[idx], value=values[idx])
+            )
+        return self._unary("Nearest", btrdb_pb2.NearestResponse, handler)
+
+    def Changes(self, request, context):
+        def handler():
+            stream = self.stream(request.uuid)
+            to_version = request.toMajor or stream.version
+            ranges = [
+                btrdb_pb2.ChangedRange(start=start, end=end)
+                for start, end in stream.changes(request.fromMajor, to_version, request.resolution)
+            ]
+            sent = False
+            for chunk in self._chunks(ranges):
+                sent = True
+                yield btrdb_pb2.ChangesResponse(versionMajor=to_version, ranges=chunk)
+            if not sent:
+                yield btrdb_pb2.ChangesResponse(versionMajor=to_version)
+        return self._streaming("Changes", btrdb_pb2.ChangesResponse, handler)
+
+    ##########################################################################
+    ## Writes
+    ##########################################################################
+
+    def Insert(self, request, context):
+        def handler():
+            points = [(point.time, point.value) for point in request.values]
+            with self._lock:
+                version = self.stream(request.uuid).insert(points, request.merge_policy)
+            return btrdb_pb2.InsertResponse(versionMajor=version)
+        return self._unary("Insert", btrdb_pb2.InsertResponse, handler)
+
+    def Delete(self, request, context):
+        def handler():
+            with self._lock:
+                version = self.stream(request.uuid).delete(request.start, request.end)
+            return btrdb_pb2.DeleteResponse(versionMajor=version)
+        return self._unary("Delete", btrdb_pb2.DeleteResponse, handler)
+
+    def Flush(self, request, context):
+        def handler():
+            return btrdb_pb2.FlushResponse(versionMajor=self.stream(request.uuid).version)
+        return self._unary("Flush", btrdb_pb2.FlushResponse, handler)
+
+    def Obliterate(self, request, context):
+        def handler():
+            with self._lock:
+                del self.streams[self.stream(request.uuid).uuid]
+            return btrdb_pb2.ObliterateResponse()
+        return self._unary("Obliterate", btrdb_pb2.ObliterateResponse, handler)
+
+    ##########################################################################
+    ## Metadata
+    ##########################################################################
+
+    def Create(self, request, context):
+        def handler():
+            tags = {kv.key: kv.val.value for kv in request.tags}
+            annotations = {kv.key: kv.val.value for kv in request.annotations}
+            self.create(uuidlib.UUID(bytes=request.uuid), request.collection, tags, annotations)
+            return btrdb_pb2.CreateResponse()
+        return self._unary("Create", btrdb_pb2.CreateResponse, handler)
+
+    def StreamInfo(self, request, context):
+        def handler():
+            stream = self.stream(request.uuid)
+            return btrdb_pb2.StreamInfoResponse(
+                versionMajor=0 if request.omitVersion else stream.version,
+                descriptor=None if request.omitDescriptor else stream.descriptor(),
+            )
+        return self._unary("StreamInfo", btrdb_pb2.StreamInfoResponse, handler)
+
+    def _set_properties(self, request, update):
+        with self._lock:
+            stream = self.stream(request.uuid)
+            if request.expectedPropertyVersion != stream.property_version:
+                raise FakeError(PROPERTY_VERSION_MISMATCH, "[423] property version mismatch")
+            update(stream)
+            stream.property_version += 1
+
+    def SetStreamTags(self, request, context):
+        def update(stream):
+            _update(stream.tags, request.tags, request.remove)
+            if request.collection:
+                stream.collection = request.collection
+
+        def handler():
+            self._set_properties(request, update)
+            return btrdb_pb2.SetStreamTagsResponse()
+        return self._unary("SetStreamTags", btrdb_pb2.SetStreamTagsResponse, handler)
+
+    def SetStreamAnnotations(self, request, context):
+        def handler():
+            self._set_properties(
+                request, lambda stream: _update(stream.annotations, request.changes, request.removals)
+            )
+            return btrdb_pb2.SetStreamAnnotationsResponse()
+        return self._unary("SetStreamAnnotations", btrdb_pb2.SetStreamAnnotationsResponse, handler)
+
+    def ListCollections(self, request, context):
+        def handler():
+            collections = sorted(set(
+                stream.collection for stream in list(self.streams.values())
+                if stream.collection.startswith(request.prefix)
+            ))
+            for chunk in self._chunks(collections):
+                yield btrdb_pb2.ListCollectionsResponse(collections=chunk)
+        return self._streaming("ListCollections", btrdb_pb2.ListCollectionsResponse, handler)
+
+    def LookupStreams(self, request, context):
+        def handler():
+            results = [
+                stream.descriptor() for stream in list(self.streams.values())
+                if (stream.collection.startswith(request.collection) if request.isCollectionPrefix
+                    else stream.collection == request.collection)
+                and _matches(stream.tags, request.tags)
+                and _matches(stream.annotations, request.annotations)
+            ]
+            sent = False
+            for chunk in self._chunks(results):
+                sent = True
+                yield btrdb_pb2.LookupStreamsResponse(results=chunk)
+            if not sent:
+                yield btrdb_pb2.LookupStreamsResponse()
+        return self._streaming("LookupStreams", btrdb_pb2.LookupStreamsResponse, handler)
+
+    def SQLQuery(self, request, context):
+        def handler():
+            columns, conditions, limit = _parse_sql(request.query, request.params)
+            rows = []
+            for stream in list(self.streams.values()):
+                row = stream.row(SQL_COLUMNS)
+                if all(condition(row) for condition in conditions):
+                    rows.append(json.dumps(stream.row(columns)).encode("utf-8"))
+            if limit is not None:
+                rows = rows[:limit]
+            for chunk in self._chunks(rows):
+                yield btrdb_pb2.SQLQueryResponse(SQLQueryRow=chunk)
+        return self._streaming("SQLQuery", btrdb_pb2.SQLQueryResponse, handler)
+
+    def Info(self, request, context):
+        return self._unary("Info", btrdb_pb2.InfoResponse, lambda: btrdb_pb2.InfoResponse(
+            majorVersion=5, minorVersion=0, build="fake",
+        ))
+
+
+def _parse_sql(query, params):
+    """
+    Parses `SELECT <columns> FROM streams [WHERE <col> = | LIKE | ILIKE
+    <value> [AND ...]] [LIMIT n]`, returning the selected columns, a list of
+    row predicates and the limit.
+    """
+    match = SQL_SELECT.match(query)
+    if match is None:
+        raise FakeError(NOT_IMPLEMENTED, "[501] unsupported query: {}".format(query))
+
+    columns = [column.strip().lower() for column in match.group("columns").split(",")]
+    if columns == ["*"]:
+        columns = list(SQL_COLUMNS)
+    for column in columns:
+        if column not in SQL_COLUMNS:
+            raise FakeError(NOT_IMPLEMENTED, "[501] unknown column: {}".format(column))
+
+    conditions = []
+    where = match.group("where")
+    for clause in re.split(r"\s+and\s+", where, flags=re.IGNORECASE) if where else []:
+        condition = SQL_CONDITION.match(clause)
+        if condition is None or condition.group("column").lower() not in SQL_COLUMNS:
+            raise FakeError(NOT_IMPLEMENTED, "[501] unsupported condition: {}".format(clause))
+
+        value = condition.group("value")
+        if value.startswith("$"):
+            value = params[int(value[1:]) - 1]
+        else:
+            value = value[1:-1].replace("''", "'")
+        conditions.append(_predicate(condition.group("column").lower(), condition.group("op").lower(), value))
+
+    limit = match.group("limit")
+    return columns, conditions, int(limit) if limit is not None else None
+
+
+def _predicate(column, op, value):
+    if op == "=":
+        return lambda row: row[column] == value
+
+    pattern = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char) for char in value
+    )
+    flags = re.IGNORECASE if op == "ilike" else 0
+    regex = re.compile("^{}$".format(pattern), flags | re.DOTALL)
+    return lambda row: row[column] is not None and regex.match(str(row[column])) is not None
+
+
+##########################################################################
+## Server
+##########################################################################
+
+class FakeServer(object):
+    """
+    Serves a FakeBTrDB servicer on a local port. Use it as a context manager
+    or call `start` and `stop`.
+
+    Parameters
+    ----------
+    latency : float, default: 0
+        The seconds each call is delayed by before it is handled.
+    chunk_size : int, default: 5000
+        The maximum number of points (or rows) per response message.
+    max_workers : int, default: 10
+        The number of threads handling calls.
+    """
+
+    def __init__(self, latency=0.0, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=10):
+        self.servicer = FakeBTrDB(latency=latency, chunk_size=chunk_size)
+        self.max_workers = max_workers
+        self.address = None
+        self._server = None
+
+    def start(self):
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.max_workers))
+        btrdb_pb2_grpc.add_BTrDBServicer_to_server(self.servicer, self._server)
+        port = self._server.add_insecure_port("127.0.0.1:0")
+        self._server.start()
+        self.address = "127.0.0.1:{}".format(port)
+        return self
+
+    def stop(self, grace=None):
+        if self._server is not None:
+            self._server.stop(grace)
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def connect(self, **kwargs):
+        """
+        Returns a BTrDB connection to the server; kwargs are the connection
+        options of `btrdb.connect`. Credentials from the environment or a
+        profile are ignored.
+        """
+        from btrdb import _connect
+        return _connect(endpoints=self.address, apikey=None, **kwargs)
+
+    def add_stream(self, collection, tags=None, annotations=None, points=None, uuid=None):
+        """
+        Creates a stream directly in the servicer, optionally inserting
+        (time, value) points, and returns its UUID.
+        """
+        uuid = uuid or uuidlib.uuid4()
+        stream = self.servicer.create(uuid, collection, tags, annotations)
+        if points is not None:
+            with self.servicer._lock:
+                stream.insert(list(points))
+        return uuid
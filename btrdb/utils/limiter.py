@@ -0,0 +1,259 @@
+# btrdb.utils.limiter
+# Client-side admission control for RPCs sent to the server
+#
+# Author:   PingThings
+# Created:  Tue Oct 27 09:41:26 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: limiter.py [] allen@pingthings.io $
+
+"""
+Client-side admission control for RPCs sent to the server
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import threading
+from contextlib import contextmanager
+
+from btrdb.exceptions import BTRDBValueError
+
+
+##########################################################################
+## Token Bucket
+##########################################################################
+
+class TokenBucket(object):
+    """
+    A token bucket refilling at `rate` tokens per second up to `burst`
+    seconds worth of tokens. Consuming may overdraw the bucket (e.g. an
+    insert larger than the burst), in which case later callers wait until
+    the debt is repaid. Not thread safe; the Limiter serializes access.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise BTRDBValueError("rates must be positive")
+        self.rate = rate
+        self.capacity = rate * burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now):
+        """
+        Returns the number of seconds until the bucket has tokens again.
+        """
+        self.refill(now)
+        return 0 if self.tokens > 0 else -self.tokens / self.rate
+
+    def consume(self, amount):
+        self.tokens -= amount
+
+
+##########################################################################
+## Limiter
+##########################################################################
+
+class Limiter(object):
+    """
+    Limits the RPCs an Endpoint sends so that parallel queries and inserts
+    cannot flood the server. The limits apply to every request sent through
+    the endpoint, including those of multi-stream operations such as
+    `StreamSet.values` and `BTrDB.insert_many`, and a single Limiter may be
+    shared by several connections to apply a combined budget.
+
+    Streaming reads hold a concurrency slot only while waiting for their
+    next response, so many reads may be open (e.g. `StreamSet.rows`) while
+    at most `max_concurrency` are transferring data. Read budgets are
+    charged for each response received and writes for each insert before it
+    is sent; once a budget is exhausted further requests wait until it has
+    been refilled.
+
+    Parameters
+    ----------
+    max_concurrency : int, optional
+        The maximum number of requests in flight at once.
+    read_points : float, optional
+        The number of points per second that may be read.
+    read_bytes : float, optional
+        The number of response bytes per second that may be read.
+    write_points : float, optional
+        The number of points per second that may be inserted.
+    write_bytes : float, optional
+        The number of request bytes per second that may be inserted.
+    burst : float, default: 1
+        The number of seconds of unused budget that may accumulate.
+
+    """
+
+    def __init__(self, max_concurrency=None, read_points=None, read_bytes=None,
+                 write_points=None, write_bytes=None, burst=1):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise BTRDBValueError("max_concurrency must be at least 1")
+        if burst <= 0:
+            raise BTRDBValueError("burst must be positive")
+
+        self.max_concurrency = max_concurrency
+        self.read_points = read_points
+        self.read_bytes = read_bytes
+        self.write_points = write_points
+        self.write_bytes = write_bytes
+        self.burst = burst
+
+        self.admitted = 0
+        self.queued = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.in_flight = 0
+
+        self._init_state()
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        self._slots = None
+        if self.max_concurrency is not None:
+            self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+        self._buckets = {"read": [], "write": []}
+        for kind in self._buckets:
+            for unit in ("points", "bytes"):
+                rate = getattr(self, "{}_{}".format(kind, unit))
+                self._buckets[kind].append(None if rate is None else TokenBucket(rate, self.burst))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attr in ("_lock", "_slots", "_buckets"):
+            del state[attr]
+        state["in_flight"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def stats(self):
+        """
+        Returns a dict of admission metrics: the number of requests admitted,
+        how many of them had to wait, the total and maximum seconds spent
+        waiting and the number currently in flight.
+        """
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "wait_time": self.wait_time,
+                "max_wait": self.max_wait,
+                "mean_wait": self.wait_time / self.admitted if self.admitted else 0.0,
+                "in_flight": self.in_flight,
+            }
+
+    ##########################################################################
+    ## Admission
+    ##########################################################################
+
+    def _wait_budget(self, kind, points=0, nbytes=0):
+        """
+        Waits until the budgets of kind ("read" or "write") have tokens and
+        then charges them with points and nbytes.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                buckets = [b for b in self._buckets[kind] if b is not None]
+                delay = max([b.delay(now) for b in buckets], default=0)
+                if delay <= 0:
+                    self._consume(kind, points, nbytes)
+                    return
+            time.sleep(delay)
+
+    def _consume(self, kind, points, nbytes):
+        points_bucket, bytes_bucket = self._buckets[kind]
+        if points_bucket is not None:
+            points_bucket.consume(points)
+        if bytes_bucket is not None:
+            bytes_bucket.consume(nbytes)
+
+    def charge(self, kind, points=0, nbytes=0):
+        """
+        Charges the budgets of kind ("read" or "write") for data that was
+        already transferred, without waiting.
+        """
+        with self._lock:
+            self._consume(kind, points, nbytes)
+
+    @contextmanager
+    def admit(self, kind=None, points=0, nbytes=0):
+        """
+        Context manager holding a concurrency slot for a request of kind
+        ("read", "write" or None for other requests), waiting for a slot and
+        for the budgets of kind first and charging them with points and
+        nbytes.
+        """
+        started = time.monotonic()
+        if kind is not None:
+            self._wait_budget(kind, points, nbytes)
+        if self._slots is not None:
+            self._slots.acquire()
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self.admitted += 1
+            self.in_flight += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > 0.001:
+                self.queued += 1
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    def call(self, func, kind=None, points=0, nbytes=0):
+        """
+        Calls func (which sends a unary RPC) once admitted.
+        """
+        with self.admit(kind, points, nbytes):
+            return func()
+
+    def stream(self, open_call):
+        """
+        Yields the responses of the streaming call returned by open_call,
+        admitting each response as a read and charging the read budgets with
+        its points and size.
+        """
+        call = None
+        while True:
+            with self.admit("read"):
+                if call is None:
+                    call = iter(open_call())
+                try:
+                    response = next(call)
+                except StopIteration:
+                    return
+            self.charge("read", len(getattr(response, "values", ())), message_size(response))
+            yield response
+
+
+##########################################################################
+## Helpers
+##########################################################################
+
+def message_size(message):
+    """
+    Returns the serialized size in bytes of a protobuf message (0 for
+    objects that are not messages).
+    """
+    size = getattr(message, "ByteSize", None)
+    size = size() if size is not None else 0
+    return size if isinstance(size, int) else 0
@@ -0,0 +1,245 @@
+# btrdb.utils.mash
+# Routes per-stream RPCs directly to the cluster node that owns the stream
+#
+# Author:   PingThings
+# Created:  Wed Oct 21 15:40:08 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: mash.py [] allen@pingthings.io $
+
+"""
+Routes per-stream RPCs directly to the cluster node that owns the stream.
+
+The cluster map (the "Mash") assigns each member node a range of the 32 bit
+murmur3 hash space. A stream is owned by the member whose range contains the
+hash of the stream's UUID bytes.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import struct
+import threading
+
+import grpc
+
+from btrdb.grpcinterface import btrdb_pb2, btrdb_pb2_grpc
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+DEFAULT_REFRESH_INTERVAL = 60
+
+# the status code returned by a node that does not own the stream
+WRONG_ENDPOINT = 405
+
+# status codes after which the map is refreshed and the call sent to the proxy
+FALLBACK_CODES = (grpc.StatusCode.UNAVAILABLE,)
+
+
+##########################################################################
+## Hashing
+##########################################################################
+
+def murmur3_32(data, seed=0):
+    """
+    Returns the unsigned 32 bit MurmurHash3 (x86 variant) of `data`.
+    """
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+    length = len(data)
+    h = seed & 0xffffffff
+    nblocks = length // 4
+
+    for (k,) in struct.iter_unpack("<I", data[:nblocks * 4]):
+        k = (k * c1) & 0xffffffff
+        k = ((k << 15) | (k >> 17)) & 0xffffffff
+        k = (k * c2) & 0xffffffff
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & 0xffffffff
+        h = (h * 5 + 0xe6546b64) & 0xffffffff
+
+    tail = data[nblocks * 4:]
+    k = 0
+    for i in reversed(range(len(tail))):
+        k = (k << 8) | tail[i]
+    if tail:
+        k = (k * c1) & 0xffffffff
+        k = ((k << 15) | (k >> 17)) & 0xffffffff
+        k = (k * c2) & 0xffffffff
+        h ^= k
+
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & 0xffffffff
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & 0xffffffff
+    h ^= h >> 16
+    return h
+
+
+##########################################################################
+## Router
+##########################################################################
+
+class MashRouter(object):
+    """
+    A drop in replacement for the BTrDB stub that sends RPCs for a single
+    stream (requests with a `uuid`) directly to the node that owns the stream
+    and all other RPCs to the proxy.
+
+    The cluster map is fetched from the proxy when the router is created and
+    re-fetched every `refresh_interval` seconds; node channels are only
+    rebuilt when the map revision changes. If a node is unavailable or
+    reports that it does not own the stream, the map is refreshed and the
+    call is sent to the proxy instead.
+
+    Parameters
+    ----------
+    proxy : BTrDBStub or ChannelPool
+        The stub used for the Info RPC, for RPCs that are not per-stream and
+        as a fallback.
+    open_channel : callable
+        Opens a channel given an "address:port" string, e.g.
+        `Connection.open_channel`.
+    refresh_interval : float, default: 60
+        Seconds between cluster map refreshes, or None to only refresh after
+        a failure.
+
+    """
+
+    def __init__(self, proxy, open_channel, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.proxy = proxy
+        self.open_channel = open_channel
+        self.refresh_interval = refresh_interval
+
+        self.revision = None
+        self.members = []
+        self._nodes = {}
+        self._refreshed = 0
+        self._lock = threading.Lock()
+
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        """
+        Fetches the cluster map from the proxy, rebuilding the node channels
+        if the map revision has changed (or `force` is True).
+        """
+        mash = self.proxy.Info(btrdb_pb2.InfoParams()).mash
+        with self._lock:
+            self._refreshed = time.monotonic()
+            if mash.revision == self.revision and not force:
+                return
+
+            members, nodes = [], {}
+            for member in mash.members:
+                if not (member.up and getattr(member, "in")):
+                    continue
+
+                addresses = [a.strip() for a in member.grpcEndpoints.replace(",", ";").split(";") if a.strip()]
+                if not addresses:
+                    continue
+
+                address = addresses[0]
+                if address not in nodes:
+                    if address in self._nodes:
+                        nodes[address] = self._nodes.pop(address)
+                    else:
+                        try:
+                            channel = self.open_channel(address)
+                        except ValueError:
+                            # e.g. an insecure node address when using an API key
+                            continue
+                        nodes[address] = (channel, btrdb_pb2_grpc.BTrDBStub(channel))
+                members.append((member.start, member.end, address))
+
+            for channel, _ in self._nodes.values():
+                channel.close()
+
+            self.members = members
+            self._nodes = nodes
+            self.revision = mash.revision
+
+    def _maybe_refresh(self, force=False):
+        if not force:
+            if not self.refresh_interval:
+                return
+            if time.monotonic() - self._refreshed < self.refresh_interval:
+                return
+
+        try:
+            self.refresh(force=force)
+        except grpc.RpcError:
+            # keep using the current map, the proxy is still the fallback
+            self._refreshed = time.monotonic()
+
+    def route(self, uu):
+        """
+        Returns the stub of the node owning the stream with UUID bytes `uu`,
+        or None if no node in the map owns it.
+        """
+        self._maybe_refresh()
+        hsh = murmur3_32(uu)
+        with self._lock:
+            for start, end, address in self.members:
+                if start < hsh <= end:
+                    return self._nodes[address][1]
+        return None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def fallback(request, *args, **kwargs):
+            self._maybe_refresh(force=True)
+            return getattr(self.proxy, name)(request, *args, **kwargs)
+
+        def dispatch(request, *args, **kwargs):
+            uu = getattr(request, "uuid", None)
+            stub = self.route(uu) if uu else None
+            if stub is None:
+                return getattr(self.proxy, name)(request, *args, **kwargs)
+
+            method = getattr(stub, name)
+            try:
+                result = method(request, *args, **kwargs)
+                if isinstance(method, grpc.UnaryStreamMultiCallable):
+                    return self._streaming(result, fallback, request, *args, **kwargs)
+            except grpc.RpcError as exc:
+                if exc.code() not in FALLBACK_CODES:
+                    raise
+                return fallback(request, *args, **kwargs)
+
+            if result.stat.code == WRONG_ENDPOINT:
+                return fallback(request, *args, **kwargs)
+            return result
+
+        dispatch.__name__ = name
+        return dispatch
+
+    def _streaming(self, responses, fallback, request, *args, **kwargs):
+        """
+        Reads the first response of a streaming call so that routing errors
+        are handled before any results are returned to the caller.
+        """
+        try:
+            first = next(responses)
+        except StopIteration:
+            return iter(())
+
+        if first.stat.code == WRONG_ENDPOINT:
+            responses.cancel()
+            return fallback(request, *args, **kwargs)
+
+        def chained():
+            try:
+                yield first
+                for response in responses:
+                    yield response
+            finally:
+                responses.cancel()
+        return chained()
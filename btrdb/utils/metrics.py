@@ -0,0 +1,384 @@
+# btrdb.utils.metrics
+# Per-RPC metrics collected by a gRPC client interceptor
+#
+# Author:   PingThings
+# Created:  Wed Oct 28 10:03:52 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: metrics.py [] allen@pingthings.io $
+
+"""
+Per-RPC metrics collected by a gRPC client interceptor.
+
+A Metrics object passed to `btrdb.connect` (or an Endpoint) is called with an
+RPCRecord for every call sent on the connection and with the time spent
+decoding query results into points, which tells apart time spent waiting on
+the network or server from time spent in the client.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import bisect
+import threading
+from collections import namedtuple, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+# latency histogram buckets in seconds
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+
+RPCRecord = namedtuple("RPCRecord", (
+    "method", "code", "latency", "first_message", "messages", "points",
+    "bytes_sent", "bytes_received",
+))
+RPCRecord.__doc__ = """
+The metrics of a single RPC: the method name, the gRPC status code name
+("OK" on success), the seconds until the call completed and until the first
+response (None for unary calls), the number of response messages and points
+and the serialized size of the request and responses in bytes.
+"""
+
+
+##########################################################################
+## Collectors
+##########################################################################
+
+class Metrics(object):
+    """
+    Base class of metrics collectors. The hooks do nothing; subclasses
+    override them to record or export the metrics. Hooks are called from the
+    threads sending the RPCs and must be thread safe.
+    """
+
+    def observe_rpc(self, record):
+        """
+        Called with the RPCRecord of each completed, failed or cancelled RPC.
+        """
+        pass
+
+    def observe_decode(self, kind, points, seconds):
+        """
+        Called with the number of points of kind ("RawPoint" or "StatPoint")
+        decoded from the results of a query and the seconds it took.
+        """
+        pass
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class InMemoryMetrics(Metrics):
+    """
+    Keeps every RPCRecord and decode observation in lists, e.g. for tests.
+
+    Attributes
+    ----------
+    rpcs : list of RPCRecord
+        The records of all RPCs.
+    decodes : list of tuple
+        (kind, points, seconds) tuples of all decoded query results.
+    """
+
+    def __init__(self):
+        self.rpcs = []
+        self.decodes = []
+        self._lock = threading.Lock()
+
+    def observe_rpc(self, record):
+        with self._lock:
+            self.rpcs.append(record)
+
+    def observe_decode(self, kind, points, seconds):
+        with self._lock:
+            self.decodes.append((kind, points, seconds))
+
+    def calls(self, method):
+        """
+        Returns the records of the RPCs of method, e.g. "RawValues".
+        """
+        with self._lock:
+            return [record for record in self.rpcs if record.method == method]
+
+    def clear(self):
+        with self._lock:
+            self.rpcs, self.decodes = [], []
+
+
+class Histogram(object):
+    """
+    A cumulative histogram in the style of Prometheus.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.counts):
+            self.counts[idx] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class PrometheusMetrics(Metrics):
+    """
+    Aggregates RPC and decode metrics into counters and latency histograms
+    labelled by method, which are exported in the Prometheus text format by
+    `expose` or over HTTP by `serve`.
+
+    Parameters
+    ----------
+    prefix : str, default: "btrdb"
+        The prefix of the metric names.
+    buckets : tuple of float
+        The upper bounds in seconds of the latency histogram buckets.
+    """
+
+    def __init__(self, prefix="btrdb", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.histograms = defaultdict(lambda: Histogram(self.buckets))
+        self.counters = defaultdict(float)
+        self.server = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = super(PrometheusMetrics, self).__getstate__()
+        state["histograms"] = dict(self.histograms)
+        state["counters"] = dict(self.counters)
+        state["server"] = None
+        return state
+
+    def __setstate__(self, state):
+        super(PrometheusMetrics, self).__setstate__(state)
+        histograms = self.histograms
+        self.histograms = defaultdict(lambda: Histogram(self.buckets))
+        self.histograms.update(histograms)
+        self.counters = defaultdict(float, self.counters)
+
+    def observe_rpc(self, record):
+        method = (("method", record.method),)
+        with self._lock:
+            self.histograms[("rpc_latency_seconds", method)].observe(record.latency)
+            if record.first_message is not None:
+                self.histograms[("rpc_first_message_seconds", method)].observe(record.first_message)
+            self.counters[("rpc_total", method + (("code", record.code),))] += 1
+            self.counters[("rpc_messages_total", method)] += record.messages
+            self.counters[("rpc_points_total", method)] += record.points
+            self.counters[("rpc_sent_bytes_total", method)] += record.bytes_sent
+            self.counters[("rpc_received_bytes_total", method)] += record.bytes_received
+
+    def observe_decode(self, kind, points, seconds):
+        kind = (("kind", kind),)
+        with self._lock:
+            self.counters[("decode_seconds_total", kind)] += seconds
+            self.counters[("decoded_points_total", kind)] += points
+
+    def expose(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(
+                (key, histogram.cumulative(), histogram.count, histogram.sum)
+                for key, histogram in self.histograms.items()
+            )
+
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            name = "{}_{}".format(self.prefix, name)
+            if name not in typed:
+                lines.append("# TYPE {} counter".format(name))
+                typed.add(name)
+            lines.append("{}{} {}".format(name, _labels(labels), _number(value)))
+
+        for (name, labels), buckets, count, total in histograms:
+            name = "{}_{}".format(self.prefix, name)
+            if name not in typed:
+                lines.append("# TYPE {} histogram".format(name))
+                typed.add(name)
+            for bound, value in buckets:
+                lines.append("{}_bucket{} {}".format(name, _labels(labels + (("le", _number(bound)),)), value))
+            lines.append("{}_bucket{} {}".format(name, _labels(labels + (("le", "+Inf"),)), count))
+            lines.append("{}_sum{} {}".format(name, _labels(labels), _number(total)))
+            lines.append("{}_count{} {}".format(name, _labels(labels), count))
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9090, addr=""):
+        """
+        Serves the metrics over HTTP for Prometheus to scrape from a daemon
+        thread, returning the server (call `shutdown()` to stop it).
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                body = metrics.expose().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((addr, port), Handler)
+        thread = threading.Thread(target=self.server.serve_forever, name="btrdb-metrics", daemon=True)
+        thread.start()
+        return self.server
+
+
+def _labels(labels):
+    return "{" + ",".join('{}="{}"'.format(key, value) for key, value in labels) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+##########################################################################
+## Interceptor
+##########################################################################
+
+def _message_stats(message):
+    """
+    Returns the number of points and serialized bytes of a message.
+    """
+    points = len(getattr(message, "values", ()))
+    size = getattr(message, "ByteSize", None)
+    return points, size() if size is not None else 0
+
+
+class MeteredResponses(object):
+    """
+    Wraps the response iterator of a streaming call, counting its messages,
+    points and bytes. `finish` is called once with the status code name and
+    the counts (a dict of first_message, messages, points and
+    bytes_received) when the responses are exhausted, fail or the call is
+    cancelled.
+    """
+
+    def __init__(self, call, started, finish):
+        self._call = call
+        self._iterator = iter(call)
+        self._counts = {"first_message": None, "messages": 0, "points": 0, "bytes_received": 0}
+        self._started = started
+        self._finish_call = finish
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self._iterator)
+        except StopIteration:
+            self._finish("OK")
+            raise
+        except grpc.RpcError as exc:
+            self._finish(_code(exc))
+            raise
+
+        counts = self._counts
+        if counts["first_message"] is None:
+            counts["first_message"] = time.monotonic() - self._started
+        points, nbytes = _message_stats(response)
+        counts["messages"] += 1
+        counts["points"] += points
+        counts["bytes_received"] += nbytes
+        return response
+
+    def _finish(self, code):
+        counts, self._counts = self._counts, None
+        if counts is not None:
+            self._finish_call(code, counts)
+
+    def cancel(self):
+        self._finish("CANCELLED")
+        return self._call.cancel()
+
+    def __getattr__(self, name):
+        return getattr(self._call, name)
+
+
+def unary_counts(future):
+    """
+    Returns the status code name and counts (see MeteredResponses) of a
+    completed unary call.
+    """
+    exc = future.exception()
+    if exc is not None:
+        return _code(exc), {"first_message": None, "messages": 0, "points": 0, "bytes_received": 0}
+    points, nbytes = _message_stats(future.result())
+    return "OK", {"first_message": None, "messages": 1, "points": points, "bytes_received": nbytes}
+
+
+class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """
+    A gRPC client interceptor reporting an RPCRecord of every call to metrics.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def _observer(self, method, started, bytes_sent):
+        def observe(code, counts):
+            self.metrics.observe_rpc(RPCRecord(
+                method=method, code=code, latency=time.monotonic() - started,
+                bytes_sent=bytes_sent, **counts
+            ))
+        return observe
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        observe = self._observer(method_name(client_call_details), time.monotonic(), request.ByteSize())
+        outcome = continuation(client_call_details, request)
+        outcome.add_done_callback(lambda future: observe(*unary_counts(future)))
+        return outcome
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        started = time.monotonic()
+        observe = self._observer(method_name(client_call_details), started, request.ByteSize())
+        return MeteredResponses(continuation(client_call_details, request), started, observe)
+
+
+def method_name(client_call_details):
+    method = client_call_details.method
+    if isinstance(method, bytes):
+        method = method.decode("utf-8")
+    return method.rsplit("/", 1)[-1]
+
+
+def _code(exc):
+    code = getattr(exc, "code", None)
+    code = code() if callable(code) else None
+    return code.name if isinstance(code, grpc.StatusCode) else "UNKNOWN"
@@ -0,0 +1,334 @@
+# btrdb.utils.parallel
+# Runs StreamSet queries across a pool of worker processes
+#
+# Author:   PingThings
+# Created:  Mon Oct 26 10:21:53 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: parallel.py [] allen@pingthings.io $
+
+"""
+Runs StreamSet queries across a pool of worker processes.
+
+Decoding query results into points is CPU bound and serialized by the GIL, so
+fetching streams from threads only uses a single core. The query engine sends
+each stream (or time shard of a stream) to a worker process that fetches,
+decodes and optionally transforms the data into a numpy array. The array is
+returned through a shared memory block rather than being pickled.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+from btrdb.stream import MINIMUM_TIME, MAXIMUM_TIME
+from btrdb.utils import profile
+from btrdb.exceptions import BTRDBValueError
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+RAW_FIELDS = (("time", "i8"), ("value", "f8"))
+STAT_FIELDS = (
+    ("time", "i8"), ("min", "f8"), ("mean", "f8"), ("max", "f8"), ("count", "u8"), ("stddev", "f8"),
+)
+
+# the start method of worker processes; forking a process with open gRPC
+# channels is unsafe
+DEFAULT_START_METHOD = "spawn"
+
+
+##########################################################################
+## Tasks
+##########################################################################
+
+def fetch_array(stream, start, end, version, query=None):
+    """
+    Fetches and decodes the data of a stream between start and end into a
+    numpy structured array with a "time" and "value" field for raw values or
+    the fields of a StatPoint for windows.
+
+    Parameters
+    ----------
+    stream : Stream
+        The stream to query.
+    start, end : int
+        The time range of the query in nanoseconds.
+    version : int
+        The version of the stream to query.
+    query : tuple, optional
+        ("aligned_windows", pointwidth) or ("windows", width, depth); raw
+        values are queried by default.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    import numpy as np
+
+    ep = stream._btrdb.ep
+    if query is None:
+        results = ep.rawValues(stream.uuid, start, end, version)
+        fields = RAW_FIELDS
+    elif query[0] == "aligned_windows":
+        results = ep.alignedWindows(stream.uuid, start, end, query[1], version)
+        fields = STAT_FIELDS
+    else:
+        results = ep.windows(stream.uuid, start, end, query[1], query[2], version)
+        fields = STAT_FIELDS
+
+    columns = [[] for _ in fields]
+    waiting = decoding = 0.0
+    messages = 0
+    results = iter(results)
+    while True:
+        started = time.perf_counter()
+        try:
+            points, _ = next(results)
+        except StopIteration:
+            break
+        finally:
+            waiting += time.perf_counter() - started
+
+        messages += 1
+        started = time.perf_counter()
+        for column, (name, _) in zip(columns, fields):
+            column.extend(getattr(point, name) for point in points)
+        decoding += time.perf_counter() - started
+
+    started = time.perf_counter()
+    arr = np.empty(len(columns[0]), dtype=list(fields))
+    for column, (name, _) in zip(columns, fields):
+        arr[name] = column
+    decoding += time.perf_counter() - started
+
+    report = profile.active()
+    if report is not None:
+        report.record_query(stream.uuid, messages, len(arr), waiting, decoding)
+    return arr
+
+
+def to_shared(arr):
+    """
+    Copies arr into a new shared memory block, returning a picklable handle
+    (name, shape, dtype) that `from_shared` reads the array back from. The
+    block is owned (and unlinked) by the process calling `from_shared`.
+    """
+    import numpy as np
+
+    block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    try:
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+        handle = (block.name, arr.shape, arr.dtype)
+    finally:
+        block.close()
+
+    # the block outlives this process, stop its resource tracker from
+    # unlinking it when the worker exits
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(block._name, "shared_memory")
+    except (ImportError, AttributeError):
+        pass
+    return handle
+
+
+def from_shared(handle):
+    """
+    Returns a copy of the array in the shared memory block of handle and
+    releases the block.
+    """
+    import numpy as np
+
+    name, shape, dtype = handle
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def run_task(task):
+    """
+    Fetches a (stream, start, end, version, query, transform) task in a
+    worker process, returning the shared memory handle of the result.
+    """
+    stream, start, end, version, query, transform = task
+    arr = fetch_array(stream, start, end, version, query)
+    if transform is not None:
+        arr = transform(arr)
+    return to_shared(arr)
+
+
+def window_query(streamset):
+    """
+    Returns the query tuple of fetch_array for the window operation requested
+    on the streamset and the alignment (in ns) of the results.
+    """
+    if streamset.pointwidth is not None:
+        return ("aligned_windows", streamset.pointwidth), 1 << streamset.pointwidth
+    if streamset.width is not None and streamset.depth is not None:
+        return ("windows", streamset.width, streamset.depth), streamset.width
+    return None, 1
+
+
+def shards(start, end, count, align=1):
+    """
+    Splits [start, end) into at most `count` consecutive ranges whose
+    boundaries (other than end) are multiples of `align` after start.
+    """
+    if count <= 1 or end - start <= align:
+        return [(start, end)]
+
+    step = -(-(end - start) // count)
+    step = -(-step // align) * align
+    bounds = list(range(start, end, step)) + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def query_tasks(streamset, count=1):
+    """
+    Returns a list with the (stream, start, end, version, query) fetch tasks
+    of each stream of the streamset, splitting each stream's query into at
+    most `count` time shards using the streamset's filters, window settings
+    and versions.
+    """
+    params = streamset._params_from_filters()
+    versions = streamset.versions()
+
+    query, align = window_query(streamset)
+
+    tasks = []
+    for stream in streamset:
+        version = versions[stream.uuid]
+        start = params.get("start", MINIMUM_TIME)
+        end = params.get("end", MAXIMUM_TIME)
+
+        if count > 1 and ("start" not in params or "end" not in params):
+            # shard the range the stream actually holds data in
+            earliest, latest = stream.earliest(version=version), stream.latest(version=version)
+            if earliest is not None and latest is not None:
+                start = max(start, earliest[0].time)
+                end = min(end, latest[0].time + 1)
+
+        if query is not None and query[0] == "aligned_windows":
+            start -= start % align
+
+        tasks.append([
+            (stream, lo, hi, version, query)
+            for lo, hi in shards(start, end, count, align)
+        ])
+    return tasks
+
+
+##########################################################################
+## Engine
+##########################################################################
+
+class ProcessQueryEngine(object):
+    """
+    Executes StreamSet queries in a pool of worker processes, e.g.
+    `streams.arrays(engine=ProcessQueryEngine())`. Each worker reconnects to
+    BTrDB once (see pickling of BTrDB objects) and then fetches, decodes and
+    transforms one stream or time shard at a time.
+
+    Parameters
+    ----------
+    processes : int, optional
+        The number of worker processes, by default the number of CPUs.
+    shards : int, default: 1
+        The number of time ranges each stream's query is split into. More
+        shards spread the work of a few large streams across more workers.
+    mp_context : str or multiprocessing context, default: "spawn"
+        The start method of the worker processes.
+    executor : concurrent.futures.Executor, optional
+        Use an existing executor instead of creating a process pool.
+
+    """
+
+    def __init__(self, processes=None, shards=1, mp_context=DEFAULT_START_METHOD, executor=None):
+        if shared_memory is None:
+            raise ImportError("ProcessQueryEngine requires Python 3.8 or later")
+        if shards < 1:
+            raise BTRDBValueError("shards must be at least 1")
+
+        self.processes = processes
+        self.shards = shards
+        self.mp_context = mp_context
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            context = self.mp_context
+            if isinstance(context, str):
+                context = mp.get_context(context)
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+        return self._executor
+
+    def close(self):
+        """
+        Shuts down the worker processes (if created by the engine).
+        """
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, streamset, transform=None):
+        """
+        Returns the data of each stream of the streamset as a numpy array,
+        using the streamset's filters, window settings and versions.
+
+        Parameters
+        ----------
+        streamset : StreamSet
+            The streams to query.
+        transform : callable, optional
+            A picklable function applied to each array (or time shard of an
+            array when using shards) in the worker, returning a numpy array.
+
+        Returns
+        -------
+        list of numpy.ndarray
+        """
+        import numpy as np
+
+        tasks = [
+            [task + (transform,) for task in stream_tasks]
+            for stream_tasks in query_tasks(streamset, self.shards)
+        ]
+        futures = [[self.executor.submit(run_task, task) for task in shard_tasks] for shard_tasks in tasks]
+
+        # collect every result so that no shared memory block is left behind
+        results, error = [], None
+        for shard_futures in futures:
+            parts = []
+            for future in shard_futures:
+                try:
+                    parts.append(from_shared(future.result()))
+                except Exception as exc:
+                    error = error or exc
+            results.append(parts)
+
+        if error is not None:
+            raise error
+        return [parts[0] if len(parts) == 1 else np.concatenate(parts) for parts in results]
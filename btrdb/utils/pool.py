@@ -0,0 +1,234 @@
+# btrdb.utils.pool
+# Dispatches RPCs across a pool of gRPC channels
+#
+# Author:   PingThings
+# Created:  Wed Oct 21 10:12:37 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: pool.py [] allen@pingthings.io $
+
+"""
+Dispatches RPCs across a pool of gRPC channels
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import threading
+from itertools import count
+
+import grpc
+
+from btrdb.grpcinterface import btrdb_pb2_grpc
+from btrdb.exceptions import BTRDBValueError
+from btrdb.utils.retry import IDEMPOTENT_METHODS
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+BALANCING_POLICIES = ("round_robin", "least_outstanding")
+DEFAULT_COOLDOWN = 5
+
+# status codes after which a call is retried on another channel
+FAILOVER_CODES = (grpc.StatusCode.UNAVAILABLE,)
+
+# RPCs without side effects, which fail over after any of the FAILOVER_CODES;
+# other RPCs (e.g. inserts) only fail over if they were never sent
+FAILOVER_METHODS = IDEMPOTENT_METHODS + (
+    "ListCollections", "Changes", "Info", "GetMetadataUsage", "GenerateCSV", "SQLQuery",
+)
+
+# the start of the details of an UNAVAILABLE error raised before the call was
+# sent, which gRPC follows with the last connection error
+NOT_SENT_DETAILS = "failed to connect to all addresses"
+
+
+##########################################################################
+## Classes
+##########################################################################
+
+class Responses(object):
+    """
+    Wraps the response iterator of a streaming call, calling `release` once
+    when the responses are exhausted, fail or are closed. Closing the
+    iterator before it is exhausted cancels the call.
+    """
+
+    def __init__(self, responses, release):
+        self._responses = responses
+        self._iterator = iter(responses)
+        self._release = release
+        self._buffer = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._buffer:
+            return self._buffer.pop()
+
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self._finish()
+            raise
+        except BaseException:
+            self.close()
+            raise
+
+    def prefetch(self):
+        """
+        Reads the first response so that errors establishing the call are
+        raised now rather than when the caller starts iterating.
+        """
+        try:
+            self._buffer.append(next(self))
+        except StopIteration:
+            pass
+
+    def _finish(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def close(self):
+        if self._release is not None:
+            cancel = getattr(self._responses, "cancel", None)
+            if cancel is not None:
+                cancel()
+            self._finish()
+
+    cancel = close
+
+    def __del__(self):
+        self.close()
+
+
+class ChannelPool(object):
+    """
+    A drop in replacement for the generated BTrDB stub that sends each RPC on
+    one of several channels (i.e. HTTP/2 connections, possibly to different
+    proxies). Calls are dispatched in turn ("round_robin") or to the channel
+    with the fewest calls in flight ("least_outstanding"). A streaming call
+    counts as outstanding until its responses have been consumed.
+
+    If a call fails because its channel is unavailable, the channel is
+    skipped for `cooldown` seconds and the call is retried on another
+    channel. Calls with side effects such as inserts are only retried if
+    the channel could not connect, so that they are never applied twice.
+    Streaming calls are only retried if no responses have been received;
+    the first response is read before the call is returned.
+
+    Parameters
+    ----------
+    channels : list of grpc.Channel
+        The channels to dispatch calls to.
+    balancing : str, default: "round_robin"
+        The policy used to choose a channel for each call.
+    cooldown : float, default: 5
+        Seconds an unavailable channel is skipped before it is tried again.
+
+    """
+
+    def __init__(self, channels, balancing="round_robin", cooldown=DEFAULT_COOLDOWN):
+        if balancing not in BALANCING_POLICIES:
+            raise BTRDBValueError("balancing must be one of {}".format(", ".join(BALANCING_POLICIES)))
+        if not channels:
+            raise BTRDBValueError("at least one channel is required")
+
+        self.balancing = balancing
+        self.cooldown = cooldown
+        self.stubs = [btrdb_pb2_grpc.BTrDBStub(channel) for channel in channels]
+        self.outstanding = [0] * len(self.stubs)
+        self.down_until = [0] * len(self.stubs)
+        self._counter = count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.stubs)
+
+    @property
+    def healthy(self):
+        """
+        Returns the indices of the channels that are not being skipped.
+        """
+        now = time.monotonic()
+        return [idx for idx, until in enumerate(self.down_until) if until <= now]
+
+    def _acquire(self, exclude=()):
+        with self._lock:
+            size = len(self.stubs)
+            start = next(self._counter) % size
+            order = [(start + i) % size for i in range(size)]
+            order = [idx for idx in order if idx not in exclude] or order
+
+            # prefer healthy channels but use any when none are healthy
+            now = time.monotonic()
+            order = [idx for idx in order if self.down_until[idx] <= now] or order
+
+            idx = order[0]
+            if self.balancing == "least_outstanding":
+                idx = min(order, key=self.outstanding.__getitem__)
+            self.outstanding[idx] += 1
+            return idx
+
+    def _release(self, idx):
+        with self._lock:
+            self.outstanding[idx] -= 1
+
+    def _fail_over(self, name, exc, idx, tried):
+        """
+        Returns True if the call should be retried on another channel,
+        marking the channel as unavailable.
+        """
+        code = getattr(exc, "code", None)
+        if not isinstance(exc, grpc.RpcError) or code is None or code() not in FAILOVER_CODES:
+            return False
+
+        with self._lock:
+            self.down_until[idx] = time.monotonic() + self.cooldown
+        tried.add(idx)
+
+        if name not in FAILOVER_METHODS:
+            details = getattr(exc, "details", None)
+            if details is None or not (details() or "").startswith(NOT_SENT_DETAILS):
+                return False
+        return len(tried) < len(self.stubs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def dispatch(request, *args, **kwargs):
+            tried = set()
+            while True:
+                idx = self._acquire(tried)
+                method = getattr(self.stubs[idx], name)
+                try:
+                    result = method(request, *args, **kwargs)
+                except BaseException as exc:
+                    self._release(idx)
+                    if self._fail_over(name, exc, idx, tried):
+                        continue
+                    raise
+
+                if not isinstance(method, grpc.UnaryStreamMultiCallable):
+                    self._release(idx)
+                    return result
+
+                responses = Responses(result, lambda idx=idx: self._release(idx))
+                if len(self.stubs) > 1:
+                    try:
+                        responses.prefetch()
+                    except BaseException as exc:
+                        if self._fail_over(name, exc, idx, tried):
+                            continue
+                        raise
+                return responses
+
+        dispatch.__name__ = name
+        return dispatch
@@ -0,0 +1,302 @@
+# btrdb.utils.profile
+# Profiling of StreamSet queries and transformations
+#
+# Author:   PingThings
+# Created:  Fri Oct 30 11:48:35 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: profile.py [] allen@pingthings.io $
+
+"""
+Profiling of StreamSet queries and transformations.
+
+While a QueryProfile is active (see `StreamSet.profile`), the RPCs sent,
+the time spent waiting for query results, converting them into point objects,
+aligning them into rows and transforming them (e.g. into a DataFrame) are
+recorded overall and per stream.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import OrderedDict, defaultdict
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+_ACTIVE = ContextVar("btrdb_profile", default=None)
+
+# the phase totals of the worker threads of the fan out being waited for
+_SHARES = ContextVar("btrdb_profile_shares", default=None)
+
+# the phases of a query in report order
+PHASES = ("rpc_wait", "decode", "align", "transform", "materialize")
+
+PHASE_LABELS = {
+    "rpc_wait": "RPC wait (network, server and protobuf parsing)",
+    "decode": "point object construction",
+    "align": "row alignment",
+    "transform": "transformation",
+    "materialize": "other StreamSet overhead",
+}
+
+
+##########################################################################
+## Profile
+##########################################################################
+
+class StreamProfile(object):
+    """
+    The profile of the queries of a single stream.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.messages = 0
+        self.points = 0
+        self.rpc_wait = 0.0
+        self.decode = 0.0
+
+    def to_dict(self):
+        return OrderedDict((
+            ("queries", self.queries), ("messages", self.messages), ("points", self.points),
+            ("rpc_wait", self.rpc_wait), ("decode", self.decode),
+        ))
+
+
+class QueryProfile(object):
+    """
+    Collects where the time of queries goes while it is active. Time spent
+    in nested phases (e.g. a query made while transforming) is only counted
+    for the innermost phase, so the phases add up to the time spent in
+    btrdb calls. While queries run on several threads at once (e.g.
+    `StreamSet.arrays`), the time the calling thread waits for them is split
+    across the phases in proportion to the time the threads spent in each,
+    so that the phases still add up to the elapsed time. The per stream
+    times are the full times of each query.
+
+    Attributes
+    ----------
+    elapsed : float
+        The seconds the profile was active.
+    phases : dict
+        The exclusive seconds spent in each phase (see PHASE_LABELS).
+    rpcs : dict
+        The number of RPCs sent by method.
+    streams : dict
+        The StreamProfile of each stream UUID queried.
+    """
+
+    def __init__(self, names=None):
+        self.names = dict(names or {})
+        self.elapsed = 0.0
+        self.phases = defaultdict(float)
+        self.rpcs = defaultdict(int)
+        self.streams = defaultdict(StreamProfile)
+        self._started = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    ##########################################################################
+    ## Recording
+    ##########################################################################
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, phase, seconds, elapsed=None):
+        """
+        Adds exclusive seconds to phase and removes the elapsed seconds of
+        the phase (by default the same) from the enclosing phase of this
+        thread.
+        """
+        stack = self._stack()
+        if stack:
+            stack[-1][1] += seconds if elapsed is None else elapsed
+
+        phases = _SHARES.get()
+        with self._lock:
+            (self.phases if phases is None else phases)[phase] += seconds
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager timing a block as phase name.
+        """
+        stack = self._stack()
+        frame = [name, 0.0]
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            self._add(name, elapsed - frame[1], elapsed)
+
+    @contextmanager
+    def waiting(self):
+        """
+        Context manager for a block in which the calling thread submits work
+        to other threads (in a copy of its context) and waits for it. The
+        phases recorded by the work are not added to the profile; instead
+        the time of the block is split across them in proportion.
+        """
+        shares = defaultdict(float)
+        token = _SHARES.set(shares)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            _SHARES.reset(token)
+            total = sum(shares.values())
+            if total > 0:
+                for name, seconds in shares.items():
+                    self._add(name, elapsed * seconds / total)
+
+    def record_rpc(self, method):
+        with self._lock:
+            self.rpcs[method] += 1
+
+    def record_query(self, uuid, messages, points, rpc_wait, decode):
+        """
+        Records a query of a stream that received messages with points,
+        waiting rpc_wait seconds for them and converting them in decode
+        seconds.
+        """
+        self._add("rpc_wait", rpc_wait)
+        self._add("decode", decode)
+        with self._lock:
+            stream = self.streams[uuid]
+            stream.queries += 1
+            stream.messages += messages
+            stream.points += points
+            stream.rpc_wait += rpc_wait
+            stream.decode += decode
+
+    ##########################################################################
+    ## Reporting
+    ##########################################################################
+
+    def to_dict(self):
+        """
+        Returns the profile as a dict of builtin types.
+        """
+        return OrderedDict((
+            ("elapsed", self.elapsed),
+            ("phases", OrderedDict((phase, self.phases.get(phase, 0.0)) for phase in PHASES)),
+            ("rpcs", dict(self.rpcs)),
+            ("streams", OrderedDict(
+                (str(uuid), stream.to_dict()) for uuid, stream in self.streams.items()
+            )),
+        ))
+
+    def report(self):
+        """
+        Returns a human readable report of the profile.
+        """
+        lines = ["elapsed: {:.4f}s".format(self.elapsed), "", "phases:"]
+        for phase in PHASES:
+            seconds = self.phases.get(phase, 0.0)
+            share = seconds / self.elapsed * 100 if self.elapsed else 0.0
+            lines.append("  {:<50} {:>10.4f}s {:>6.1f}%".format(PHASE_LABELS[phase], seconds, share))
+
+        lines.extend(["", "rpcs:"])
+        for method, count in sorted(self.rpcs.items()):
+            lines.append("  {:<50} {:>10}".format(method, count))
+
+        lines.extend(["", "streams:"])
+        lines.append("  {:<36} {:>8} {:>9} {:>10} {:>10} {:>10}".format(
+            "stream", "queries", "messages", "points", "rpc wait", "decode"
+        ))
+        for uuid, stream in self.streams.items():
+            lines.append("  {:<36} {:>8} {:>9} {:>10} {:>9.4f}s {:>9.4f}s".format(
+                self.names.get(uuid, str(uuid)), stream.queries, stream.messages, stream.points,
+                stream.rpc_wait, stream.decode,
+            ))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+##########################################################################
+## Activation
+##########################################################################
+
+def active():
+    """
+    Returns the QueryProfile active in this context or None.
+    """
+    return _ACTIVE.get()
+
+
+@contextmanager
+def profile(names=None):
+    """
+    Context manager activating a new QueryProfile for the block, e.g.
+    `with profile() as report: ...`. names optionally maps stream UUIDs to
+    the names shown in the report.
+    """
+    report = QueryProfile(names)
+    token = _ACTIVE.set(report)
+    report._started = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.elapsed = time.perf_counter() - report._started
+        _ACTIVE.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """
+    Times the block as phase name of the active profile, if any.
+    """
+    report = _ACTIVE.get()
+    if report is None:
+        yield
+        return
+    with report.phase(name):
+        yield
+
+
+@contextmanager
+def waiting():
+    """
+    Marks the block as waiting for work on other threads in the active
+    profile, if any (see `QueryProfile.waiting`).
+    """
+    report = _ACTIVE.get()
+    if report is None:
+        yield
+        return
+    with report.waiting():
+        yield
+
+
+def profiled(name):
+    """
+    Decorator timing calls of a function as phase name of the active profile.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE.get() is None:
+                return func(*args, **kwargs)
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,6 +1,8 @@
 from functools import partial
 
 import ray
+from ray.data.block import BlockMetadata
+from ray.data.datasource import Datasource, ReadTask
 
 import btrdb
 from btrdb.conn import BTrDB
@@ -54,3 +56,85 @@ def btrdb_deserializer(_, conn_str=None, apikey=None, profile=None):
         An instance of the BTrDB context to directly interact with the database.
     """
     return btrdb.connect(conn_str=conn_str, apikey=apikey, profile=profile)
+
+
+##########################################################################
+## Datasource
+##########################################################################
+
+def _read_blocks(tasks):
+    """
+    Fetches (stream, start, end, version, query) tasks in a Ray worker,
+    yielding one Arrow table per task.
+    """
+    import pyarrow as pa
+    from btrdb.utils.parallel import fetch_array
+
+    for stream, start, end, version, query in tasks:
+        arr = fetch_array(stream, start, end, version, query)
+        columns = {"uuid": pa.array([str(stream.uuid)] * len(arr), type=pa.string())}
+        columns.update((name, arr[name]) for name in arr.dtype.names)
+        yield pa.table(columns)
+
+
+class BTrDBDatasource(Datasource):
+    """
+    A Ray Datasource reading the data of a StreamSet, e.g.
+    `ray.data.read_datasource(BTrDBDatasource(streams))`. The query is split
+    into read tasks by stream and time range that fetch the data in Ray
+    workers and emit Arrow blocks with a "uuid", "time" and "value" column
+    (or the fields of a StatPoint when a window operation is requested).
+
+    The streamset's filters and window settings are used, and its versions
+    are pinned when the datasource is created. Streams must use a connection
+    created with `btrdb.connect` so that they can be sent to the workers.
+
+    Parameters
+    ----------
+    streamset : StreamSet
+        The streams to read.
+    shards : int, optional
+        The number of time ranges each stream's query is split into. By
+        default enough to create about `parallelism` read tasks.
+
+    """
+
+    def __init__(self, streamset, shards=None):
+        streamset = streamset.clone()
+        streamset.pin_versions(streamset.versions())
+        self.streamset = streamset
+        self.shards = shards
+
+    def get_name(self):
+        return "BTrDB"
+
+    def estimate_inmemory_data_size(self):
+        return None
+
+    def get_read_tasks(self, parallelism, **kwargs):
+        from btrdb.utils.parallel import query_tasks
+
+        streams = len(self.streamset)
+        if not streams:
+            return []
+
+        count = self.shards
+        if count is None:
+            count = max(1, -(-parallelism // streams))
+        tasks = [task for stream_tasks in query_tasks(self.streamset, count) for task in stream_tasks]
+
+        # group the tasks into at most parallelism read tasks
+        groups = max(1, min(parallelism, len(tasks)))
+        metadata = BlockMetadata(num_rows=None, size_bytes=None, exec_stats=None, input_files=None)
+        return [
+            ReadTask(partial(_read_blocks, tasks[i::groups]), metadata)
+            for i in range(groups)
+        ]
+
+
+def read_streamset(streamset, shards=None, **kwargs):
+    """
+    Returns a Ray Dataset of the data of a StreamSet (see BTrDBDatasource).
+    Additional keyword arguments are passed to `ray.data.read_datasource`.
+    """
+    return ray.data.read_datasource(BTrDBDatasource(streamset, shards=shards), **kwargs)
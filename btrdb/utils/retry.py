@@ -0,0 +1,236 @@
+# btrdb.utils.retry
+# Retry, backoff and hedging policy for idempotent RPCs
+#
+# Author:   PingThings
+# Created:  Thu Oct 22 09:17:44 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: retry.py [] allen@pingthings.io $
+
+"""
+Retry, backoff and hedging policy for idempotent RPCs
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+
+import grpc
+
+from btrdb.exceptions import BTRDBValueError
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+DEFAULT_RETRY_CODES = (
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+)
+
+# RPCs that may be safely sent more than once
+IDEMPOTENT_METHODS = (
+    "RawValues", "AlignedWindows", "Windows", "Nearest", "StreamInfo", "LookupStreams",
+)
+
+
+##########################################################################
+## Classes
+##########################################################################
+
+class RetryPolicy(object):
+    """
+    Describes how idempotent RPCs are retried. Failed calls are retried with
+    exponential backoff (with jitter) when the gRPC status code is one of
+    `codes`; streaming reads resume after the last result received instead
+    of starting over.
+
+    Unary calls may additionally be hedged: if a call has not completed
+    after the `hedge_percentile` latency of recent calls to the same method,
+    a second identical call is sent and whichever completes first is used.
+
+    Parameters
+    ----------
+    max_attempts : int, default: 5
+        The maximum number of attempts for a call, including the first one.
+        The count is reset whenever a streaming call makes progress.
+    initial_backoff : float, default: 0.1
+        Seconds to wait before the first retry.
+    max_backoff : float, default: 10
+        The maximum number of seconds to wait between attempts.
+    multiplier : float, default: 2
+        The factor the backoff grows by after each attempt.
+    jitter : float, default: 0.2
+        The fraction of the backoff that is randomized.
+    codes : tuple of grpc.StatusCode
+        The status codes that are retried.
+    hedge_percentile : float, optional
+        Hedge unary calls that take longer than this percentile (0-100) of
+        recent latencies, e.g. 95. Hedging is disabled by default.
+    hedge_min_samples : int, default: 20
+        The number of latencies recorded for a method before it is hedged.
+
+    """
+
+    def __init__(self, max_attempts=5, initial_backoff=0.1, max_backoff=10, multiplier=2,
+                 jitter=0.2, codes=DEFAULT_RETRY_CODES, hedge_percentile=None,
+                 hedge_min_samples=20):
+        if max_attempts < 1:
+            raise BTRDBValueError("max_attempts must be at least 1")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise BTRDBValueError("hedge_percentile must be between 0 and 100")
+
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.codes = tuple(codes)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self.retries = 0
+        self.hedged = 0
+
+        self._latencies = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attr in ("_executor", "_lock"):
+            del state[attr]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        """
+        Returns the number of seconds to wait after the given failed attempt
+        (starting at 0).
+        """
+        delay = min(self.max_backoff, self.initial_backoff * self.multiplier ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+    def retryable(self, exc):
+        code = getattr(exc, "code", None)
+        return isinstance(exc, grpc.RpcError) and code is not None and code() in self.codes
+
+    def _retry(self, exc, attempt):
+        """
+        Waits before the next attempt or re-raises exc if the call should not
+        be retried.
+        """
+        if not self.retryable(exc) or attempt + 1 >= self.max_attempts:
+            raise exc
+        with self._lock:
+            self.retries += 1
+        time.sleep(self.backoff(attempt))
+
+    ##########################################################################
+    ## Unary Calls
+    ##########################################################################
+
+    def call(self, method, func):
+        """
+        Calls func (which sends a unary `method` RPC) until it succeeds, it
+        fails with an error that is not retryable or the attempts run out.
+        """
+        attempt = 0
+        while True:
+            try:
+                if self.hedge_percentile is None:
+                    return self._timed(method, func)
+                return self._hedged(method, func)
+            except grpc.RpcError as exc:
+                self._retry(exc, attempt)
+                attempt += 1
+
+    def _timed(self, method, func):
+        started = time.monotonic()
+        result = func()
+        with self._lock:
+            samples = self._latencies.setdefault(method, deque(maxlen=max(self.hedge_min_samples, 100)))
+            samples.append(time.monotonic() - started)
+        return result
+
+    def hedge_delay(self, method):
+        """
+        Returns the latency after which a call to method is hedged, or None
+        if not enough calls have been recorded.
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(method, ()))
+        if self.hedge_percentile is None or len(samples) < self.hedge_min_samples:
+            return None
+        idx = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return samples[idx]
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="btrdb-hedge")
+            return self._executor
+
+    def _hedged(self, method, func):
+        delay = self.hedge_delay(method)
+        if delay is None:
+            return self._timed(method, func)
+
+        first = self.executor.submit(self._timed, method, func)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        with self._lock:
+            self.hedged += 1
+        second = self.executor.submit(self._timed, method, func)
+
+        # use the first successful response, raising only if both fail
+        error = None
+        for future in as_completed([first, second]):
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+        raise error
+
+    ##########################################################################
+    ## Streaming Calls
+    ##########################################################################
+
+    def stream(self, open_stream, resumable=True):
+        """
+        Yields the responses of the streaming call returned by open_stream,
+        calling it again after a retryable error. open_stream is responsible
+        for resuming after the responses that were already yielded; if
+        `resumable` is False the call is only retried if nothing was yielded.
+        """
+        attempt, progress = 0, False
+        while True:
+            responses = open_stream()
+            try:
+                for response in responses:
+                    attempt, progress = 0, True
+                    yield response
+                return
+            except grpc.RpcError as exc:
+                if progress and not resumable:
+                    raise
+                self._retry(exc, attempt)
+                attempt += 1
+            finally:
+                close = getattr(responses, "close", None)
+                if close is not None:
+                    close()
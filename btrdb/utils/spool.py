@@ -0,0 +1,399 @@
+# btrdb.utils.spool
+# Durable local spool for inserts made while the cluster is unreachable
+#
+# Author:   PingThings
+# Created:  Mon Oct 19 13:41:02 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: spool.py [] allen@pingthings.io $
+
+"""
+Durable local spool for inserts made while the cluster is unreachable
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import re
+import time
+import uuid
+import zlib
+import struct
+import threading
+from itertools import chain
+
+from btrdb.exceptions import (
+    SpoolFull, BTrDBError, BTRDBValueError, ConnectionError, DeadlineExceeded
+)
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+FSYNC_POLICIES = ("always", "segment", "never")
+MERGE_POLICIES = ("never", "equal", "retain", "replace")
+
+DEFAULT_MAX_BYTES = 1 << 30
+DEFAULT_SEGMENT_BYTES = 64 << 20
+
+# crc32, uuid, merge policy, number of points
+RECORD_HEADER = struct.Struct("<I16sBI")
+POINT_SIZE = struct.calcsize("<qd")
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{12})\.spool$")
+CURSOR_FILENAME = "cursor"
+DEAD_LETTER_FILENAME = "dead-letter.spool"
+
+# errors that leave a batch in the spool rather than dead-lettering it
+TRANSIENT_ERRORS = (ConnectionError, DeadlineExceeded)
+
+
+##########################################################################
+## Helpers
+##########################################################################
+
+def encode_record(uu, values, merge):
+    """
+    Returns the bytes of a spool record for a batch of (time, value) points.
+    """
+    payload = struct.pack(
+        "<" + "qd" * len(values),
+        *chain.from_iterable((int(p[0]), float(p[1])) for p in values)
+    )
+    body = uu.bytes + bytes([MERGE_POLICIES.index(merge)]) + struct.pack("<I", len(values))
+    crc = zlib.crc32(payload, zlib.crc32(body))
+    return RECORD_HEADER.pack(crc, uu.bytes, MERGE_POLICIES.index(merge), len(values)) + payload
+
+
+def read_records(fobj):
+    """
+    Yields (offset, end, uuid, values, merge) for each complete record in a
+    segment file. Reading stops at the first torn or corrupt record, which
+    can only be the tail of a segment that was being written during a crash.
+    """
+    offset = fobj.tell()
+    while True:
+        header = fobj.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+
+        crc, uu, merge, count = RECORD_HEADER.unpack(header)
+        payload = fobj.read(count * POINT_SIZE)
+        body = header[4:]
+        if len(payload) < count * POINT_SIZE or zlib.crc32(payload, zlib.crc32(body)) != crc:
+            return
+
+        flat = struct.unpack("<" + "qd" * count, payload)
+        values = list(zip(flat[0::2], flat[1::2]))
+        end = offset + len(header) + len(payload)
+        yield offset, end, uuid.UUID(bytes=uu), values, MERGE_POLICIES[merge]
+        offset = end
+
+
+##########################################################################
+## Classes
+##########################################################################
+
+class InsertSpool(object):
+    """
+    An append-only, on-disk write-ahead spool for insert batches that could
+    not be sent because the cluster was unreachable. Batches are replayed in
+    the order they were spooled once the connection recovers.
+
+    The spool is a directory of segment files. Each record holds a single
+    insert batch protected by a CRC so that a batch torn by a crash is
+    discarded rather than replayed. Replay progress is tracked in a cursor
+    file so that a replay interrupted by another outage resumes where it
+    stopped instead of inserting batches twice.
+
+    A batch the server rejects with anything other than a connection error
+    or deadline will never succeed, so it is moved to a dead-letter file
+    instead of blocking the batches spooled after it. Dead-lettered batches
+    are counted in the spool metrics and can be read with `dead_letters`.
+
+    Parameters
+    ----------
+    path : str
+        The directory holding the spool segments; created if required.
+    fsync : str, default: "always"
+        When spooled data is flushed to disk. Valid policies are:
+          - 'always': after every spooled batch (safest)
+          - 'segment': when a segment is closed
+          - 'never': leave it to the operating system
+    max_bytes : int, default: 1 GiB
+        The maximum total size of the spool on disk. Spooling a batch that
+        would exceed this size raises SpoolFull.
+    segment_bytes : int, default: 64 MiB
+        The size at which a new segment file is started.
+    merge : str, default: None
+        If set, overrides the merge policy recorded with each batch when
+        the spool is replayed.
+
+    """
+
+    def __init__(self, path, fsync="always", max_bytes=DEFAULT_MAX_BYTES,
+                 segment_bytes=DEFAULT_SEGMENT_BYTES, merge=None):
+        if fsync not in FSYNC_POLICIES:
+            raise BTRDBValueError("fsync must be one of {}".format(", ".join(FSYNC_POLICIES)))
+        if merge is not None and merge not in MERGE_POLICIES:
+            raise BTRDBValueError("merge must be one of {}".format(", ".join(MERGE_POLICIES)))
+
+        self.path = path
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.merge = merge
+
+        self._lock = threading.RLock()
+        self._writer = None
+        self._pending = 0
+        self._size = 0
+        self._metrics = {
+            "spooled_batches": 0,
+            "spooled_points": 0,
+            "replayed_batches": 0,
+            "replayed_points": 0,
+            "replay_seconds": 0.0,
+            "dead_letter_batches": 0,
+            "dead_letter_points": 0,
+        }
+
+        os.makedirs(path, exist_ok=True)
+        self._pending = sum(1 for _ in self._records())
+        self._size = self._disk_size()
+
+    ##########################################################################
+    ## Properties
+    ##########################################################################
+
+    @property
+    def pending(self):
+        """
+        Returns the number of spooled batches that have not been replayed.
+        """
+        return self._pending
+
+    @property
+    def size(self):
+        """
+        Returns the total size of the spool segments on disk in bytes.
+        """
+        return self._size
+
+    def metrics(self):
+        """
+        Returns a dict of spool and replay statistics including the replay
+        throughput in points per second.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["pending_batches"] = self._pending
+            metrics["bytes"] = self.size
+        seconds = metrics["replay_seconds"]
+        metrics["replay_points_per_second"] = metrics["replayed_points"] / seconds if seconds else 0.0
+        return metrics
+
+    ##########################################################################
+    ## Public Methods
+    ##########################################################################
+
+    def append(self, uu, values, merge="never"):
+        """
+        Durably records an insert batch for later replay.
+
+        Parameters
+        ----------
+        uu : UUID
+            The UUID of the stream the batch belongs to.
+        values : list[tuple[int, float]]
+            The (time, value) points of the batch.
+        merge : str
+            The merge policy of the insert.
+
+        Raises
+        ------
+        SpoolFull
+            Spooling the batch would exceed `max_bytes`.
+
+        """
+        record = encode_record(uu, values, merge)
+        with self._lock:
+            if self._size + len(record) > self.max_bytes:
+                raise SpoolFull("spool at `{}` would exceed {} bytes".format(self.path, self.max_bytes))
+
+            writer = self._open_writer(len(record))
+            writer.write(record)
+            writer.flush()
+            if self.fsync == "always":
+                os.fsync(writer.fileno())
+
+            self._size += len(record)
+            self._pending += 1
+            self._metrics["spooled_batches"] += 1
+            self._metrics["spooled_points"] += len(values)
+
+    def replay(self, btrdb):
+        """
+        Inserts all spooled batches, in the order they were spooled, using
+        the endpoint of the supplied BTrDB object. Fully replayed segments
+        are removed. If an insert fails because the server is unreachable
+        the error is raised and the next replay resumes with the failed
+        batch; batches failing with any other error are dead-lettered.
+
+        Parameters
+        ----------
+        btrdb : BTrDB
+            The connection used to insert the spooled batches.
+
+        Returns
+        -------
+        int
+            The number of batches replayed.
+
+        """
+        replayed = 0
+        with self._lock:
+            self._close_writer()
+            started = time.monotonic()
+            complete = False
+            try:
+                for seq, end, uu, values, merge in self._records():
+                    try:
+                        btrdb.ep.insert(uu, values, self.merge or merge)
+                    except TRANSIENT_ERRORS:
+                        raise
+                    except BTrDBError:
+                        self._dead_letter(uu, values, merge)
+                    else:
+                        replayed += 1
+                        self._metrics["replayed_batches"] += 1
+                        self._metrics["replayed_points"] += len(values)
+                    self._write_cursor(seq, end)
+                    self._pending -= 1
+                complete = True
+            finally:
+                self._metrics["replay_seconds"] += time.monotonic() - started
+                self._compact(complete)
+        return replayed
+
+    def dead_letters(self):
+        """
+        Yields (uuid, values, merge) for every batch that was dead-lettered
+        because the server rejected it during a replay.
+        """
+        try:
+            f = open(os.path.join(self.path, DEAD_LETTER_FILENAME), "rb")
+        except FileNotFoundError:
+            return
+
+        with f:
+            for _, _, uu, values, merge in read_records(f):
+                yield uu, values, merge
+
+    def close(self):
+        """
+        Closes the active segment file.
+        """
+        with self._lock:
+            self._close_writer()
+
+    ##########################################################################
+    ## Segment Management
+    ##########################################################################
+
+    def _disk_size(self):
+        return sum(
+            os.path.getsize(os.path.join(self.path, self._segment_name(seq)))
+            for seq in self._segments()
+        )
+
+    def _segment_name(self, seq):
+        return "segment-{:012d}.spool".format(seq)
+
+    def _segments(self):
+        seqs = []
+        for name in os.listdir(self.path):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                seqs.append(int(match.group(1)))
+        return sorted(seqs)
+
+    def _read_cursor(self):
+        try:
+            with open(os.path.join(self.path, CURSOR_FILENAME), "r") as f:
+                seq, offset = f.read().split()
+                return int(seq), int(offset)
+        except (FileNotFoundError, ValueError):
+            return -1, 0
+
+    def _write_cursor(self, seq, offset):
+        path = os.path.join(self.path, CURSOR_FILENAME)
+        with open(path + ".tmp", "w") as f:
+            f.write("{} {}".format(seq, offset))
+            f.flush()
+            if self.fsync == "always":
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _records(self):
+        """
+        Yields (segment, end offset, uuid, values, merge) for every record
+        after the replay cursor.
+        """
+        cursor_seq, cursor_offset = self._read_cursor()
+        for seq in self._segments():
+            if seq < cursor_seq:
+                continue
+            with open(os.path.join(self.path, self._segment_name(seq)), "rb") as f:
+                if seq == cursor_seq:
+                    f.seek(cursor_offset)
+                for _, end, uu, values, merge in read_records(f):
+                    yield seq, end, uu, values, merge
+
+    def _dead_letter(self, uu, values, merge):
+        with open(os.path.join(self.path, DEAD_LETTER_FILENAME), "ab") as f:
+            f.write(encode_record(uu, values, merge))
+            f.flush()
+            if self.fsync != "never":
+                os.fsync(f.fileno())
+        self._metrics["dead_letter_batches"] += 1
+        self._metrics["dead_letter_points"] += len(values)
+
+    def _compact(self, complete=False):
+        """
+        Removes segments that have been replayed. Once a replay completes,
+        every segment is removed including any torn record at a segment tail.
+        """
+        cursor_seq, _ = self._read_cursor()
+        for seq in self._segments():
+            if complete or seq < cursor_seq:
+                os.remove(os.path.join(self.path, self._segment_name(seq)))
+        if complete:
+            self._pending = 0
+        self._size = self._disk_size()
+
+    def _open_writer(self, nbytes):
+        if self._writer is not None and self._writer.tell() + nbytes > self.segment_bytes:
+            self._close_writer()
+
+        if self._writer is None:
+            segments = self._segments()
+            cursor_seq, _ = self._read_cursor()
+            seq = max(segments[-1] if segments else -1, cursor_seq) + 1
+            self._writer = open(os.path.join(self.path, self._segment_name(seq)), "ab")
+        return self._writer
+
+    def _close_writer(self):
+        if self._writer is None:
+            return
+        self._writer.flush()
+        if self.fsync != "never":
+            os.fsync(self._writer.fileno())
+        self._writer.close()
+        self._writer = None
+
+    def __repr__(self):
+        return "<{} path={} pending={}>".format(self.__class__.__name__, self.path, self._pending)
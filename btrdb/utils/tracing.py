@@ -0,0 +1,218 @@
+# btrdb.utils.tracing
+# Optional OpenTelemetry tracing of queries and inserts
+#
+# Author:   PingThings
+# Created:  Thu Oct 29 13:26:08 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: tracing.py [] allen@pingthings.io $
+
+"""
+Optional OpenTelemetry tracing of queries and inserts.
+
+If the opentelemetry-api package is installed, queries, inserts and StreamSet
+materializations create spans with the tracer provider configured by the
+application, every RPC gets a client span and the trace context is sent to
+the server in the gRPC metadata. Without opentelemetry the functions in this
+module do nothing.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import wraps
+
+import grpc
+
+from btrdb.utils.metrics import MeteredResponses, unary_counts, method_name
+
+try:
+    from opentelemetry import trace, context, propagate
+except ImportError:
+    trace = None
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+TRACER_NAME = "btrdb"
+
+# set to False to disable tracing even if opentelemetry is installed
+enabled = True
+
+
+def available():
+    """
+    Returns True if spans are created, i.e. opentelemetry is installed and
+    tracing has not been disabled.
+    """
+    return enabled and trace is not None
+
+
+##########################################################################
+## Spans
+##########################################################################
+
+class NoSpan(object):
+    """
+    Stands in for a span when tracing is not available.
+    """
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def is_recording(self):
+        return False
+
+
+NO_SPAN = NoSpan()
+
+
+def _attributes(attributes):
+    return {
+        "btrdb.{}".format(key): value for key, value in attributes.items() if value is not None
+    }
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Context manager running the block in a new span, e.g.
+    `with span("btrdb.values", uuid=str(uu)) as sp: ...`. Attribute names
+    are prefixed with "btrdb." and None values are omitted. Yields NO_SPAN if
+    tracing is not available.
+    """
+    if not available():
+        yield NO_SPAN
+        return
+
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(name, attributes=_attributes(attributes)) as current:
+        yield current
+
+
+def set_attributes(current, **attributes):
+    """
+    Sets btrdb attributes (see span) on a span.
+    """
+    if current.is_recording():
+        current.set_attributes(_attributes(attributes))
+
+
+def propagate_context(func):
+    """
+    Returns func wrapped to run in the trace context of the caller, for
+    functions submitted to a thread pool.
+    """
+    if not available():
+        return func
+
+    ctx = context.get_current()
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        token = context.attach(ctx)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            context.detach(token)
+    return run
+
+
+##########################################################################
+## Interceptor
+##########################################################################
+
+class _ClientCallDetails(
+    namedtuple("_ClientCallDetails", (
+        "method", "timeout", "metadata", "credentials", "wait_for_ready", "compression",
+    )),
+    grpc.ClientCallDetails,
+):
+    pass
+
+
+class TracingInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """
+    A gRPC client interceptor creating a client span for every RPC and
+    sending its trace context to the server in the call metadata. Responses
+    are only counted for spans that are recording, so that calls cost next
+    to nothing when no tracer provider is configured or the trace is not
+    sampled.
+    """
+
+    def _start(self, client_call_details, request):
+        method = method_name(client_call_details)
+        tracer = trace.get_tracer(TRACER_NAME)
+        current = tracer.start_span("BTrDB/{}".format(method), kind=trace.SpanKind.CLIENT)
+        if current.is_recording():
+            current.set_attributes({
+                "rpc.system": "grpc",
+                "rpc.service": "v5api.BTrDB",
+                "rpc.method": method,
+                "btrdb.bytes_sent": request.ByteSize(),
+            })
+        elif not current.get_span_context().is_valid:
+            # no trace to record or to continue on the server
+            return current, client_call_details
+
+        carrier = {}
+        propagate.inject(carrier, context=trace.set_span_in_context(current))
+        metadata = list(client_call_details.metadata or [])
+        metadata.extend(carrier.items())
+
+        details = _ClientCallDetails(
+            client_call_details.method,
+            client_call_details.timeout,
+            metadata,
+            client_call_details.credentials,
+            getattr(client_call_details, "wait_for_ready", None),
+            getattr(client_call_details, "compression", None),
+        )
+        return current, details
+
+    @staticmethod
+    def _finisher(current):
+        def finish(code, counts):
+            current.set_attributes({
+                "rpc.grpc.status_code": getattr(grpc.StatusCode, code).value[0],
+                "btrdb.messages": counts["messages"],
+                "btrdb.points": counts["points"],
+                "btrdb.bytes_received": counts["bytes_received"],
+            })
+            if code != "OK":
+                current.set_status(trace.Status(trace.StatusCode.ERROR, code))
+            current.end()
+        return finish
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        if not available():
+            return continuation(client_call_details, request)
+
+        current, details = self._start(client_call_details, request)
+        if not current.is_recording():
+            current.end()
+            return continuation(details, request)
+
+        finish = self._finisher(current)
+        outcome = continuation(details, request)
+        outcome.add_done_callback(lambda future: finish(*unary_counts(future)))
+        return outcome
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        if not available():
+            return continuation(client_call_details, request)
+
+        current, details = self._start(client_call_details, request)
+        if not current.is_recording():
+            current.end()
+            return continuation(details, request)
+        return MeteredResponses(continuation(details, request), time.monotonic(), self._finisher(current))
@@ -0,0 +1,257 @@
+# btrdb.writer
+# Module for buffered, background writing of points to many streams
+#
+# Author:   PingThings
+# Created:  Mon Oct 19 10:12:44 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: writer.py [] allen@pingthings.io $
+
+"""
+Module for buffered, background writing of points to many streams
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from btrdb.stream import INSERT_BATCH_SIZE
+from btrdb.utils.conversion import to_uuid
+from btrdb.exceptions import InvalidOperation, BTRDBValueError
+
+
+##########################################################################
+## Module Variables
+##########################################################################
+
+DEFAULT_MAX_AGE = 1.0
+DEFAULT_MAX_BUFFERED = 1000000
+DEFAULT_MAX_WORKERS = 4
+
+
+##########################################################################
+## Classes
+##########################################################################
+
+class BufferedWriter(object):
+    """
+    Accepts points for any number of streams, coalesces them per stream UUID
+    and inserts them in batches from a background thread pool. Small, frequent
+    writes are therefore amortized into a few large Insert calls.
+
+    A stream's buffer is sent once it holds `batch_size` points or once its
+    oldest point has waited `max_age` seconds. At most one batch per stream is
+    in flight at a time so that points for a stream are inserted in the order
+    they were received. When `max_buffered` points are waiting to be written,
+    calls to `insert` block until the background workers catch up.
+
+    Errors raised by background inserts are collected and re-raised by the
+    next call to `flush` or `close`.
+
+    Parameters
+    ----------
+    btrdb : BTrDB
+        The BTrDB object used to insert points.
+    merge : str, default: "never"
+        The merge policy used for every insert (see `Stream.insert`).
+    batch_size : int, default: 50000
+        The number of points for a single stream that triggers a flush of
+        that stream's buffer.
+    max_age : float, default: 1.0
+        The maximum number of seconds a point may wait in the buffer before
+        it is sent, regardless of batch size.
+    max_buffered : int, default: 1000000
+        The maximum number of points, across all streams, that may be buffered
+        or in flight before `insert` blocks.
+    max_workers : int, default: 4
+        The number of background threads used to send batches.
+
+    """
+
+    def __init__(self, btrdb, merge="never", batch_size=INSERT_BATCH_SIZE,
+                 max_age=DEFAULT_MAX_AGE, max_buffered=DEFAULT_MAX_BUFFERED,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        if batch_size < 1:
+            raise BTRDBValueError("batch_size must be a positive integer")
+        if max_buffered < batch_size:
+            raise BTRDBValueError("max_buffered must be at least batch_size")
+
+        self._btrdb = btrdb
+        self.merge = merge
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.max_buffered = max_buffered
+
+        self.versions = {}
+        self._buffers = {}
+        self._born = {}
+        self._inflight = set()
+        self._buffered = 0
+        self._flushing = 0
+        self._errors = []
+        self._closed = False
+
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="btrdb-writer"
+        )
+        self._stop = threading.Event()
+        self._ager = None
+        if max_age is not None:
+            self._ager = threading.Thread(
+                target=self._age_loop, name="btrdb-writer-ager", daemon=True
+            )
+            self._ager.start()
+
+    @property
+    def buffered(self):
+        """
+        Returns the number of points that are buffered or in flight.
+        """
+        return self._buffered
+
+    def insert(self, stream, data):
+        """
+        Buffers (time, value) points for a stream. The points are written in
+        the background; use `flush` to wait until they have been inserted.
+
+        Parameters
+        ----------
+        stream : Stream, UUID or str
+            The stream (or stream UUID) the points belong to.
+        data : list[tuple[int, float]]
+            A list of tuples in which each tuple contains a time (int) and
+            value (float) for insertion to the database
+
+        """
+        uu = getattr(stream, "uuid", stream)
+        uu = to_uuid(uu)
+        data = list(data)
+
+        with self._cond:
+            if self._closed:
+                raise InvalidOperation("cannot insert into a closed BufferedWriter")
+
+            # backpressure: wait for the background workers to catch up
+            while self._buffered > 0 and self._buffered + len(data) > self.max_buffered:
+                for key in list(self._buffers):
+                    self._dispatch(key)
+                self._cond.wait()
+
+            if uu not in self._buffers:
+                self._buffers[uu] = []
+                self._born[uu] = time.monotonic()
+            self._buffers[uu].extend(data)
+            self._buffered += len(data)
+
+            if len(self._buffers[uu]) >= self.batch_size:
+                self._dispatch(uu)
+
+    def flush(self):
+        """
+        Sends all buffered points and blocks until they have been inserted.
+        Re-raises the first error encountered by a background insert since
+        the last flush.
+
+        Returns
+        -------
+        dict
+            The latest known version of each stream written to.
+
+        """
+        with self._cond:
+            self._flushing += 1
+            try:
+                for uu in list(self._buffers):
+                    self._dispatch(uu)
+                while self._buffers or self._inflight:
+                    self._cond.wait()
+            finally:
+                self._flushing -= 1
+
+            errors, self._errors = self._errors, []
+
+        if errors:
+            raise errors[0][1]
+        return dict(self.versions)
+
+    def close(self):
+        """
+        Flushes all buffered points and shuts down the background workers.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+
+        try:
+            self.flush()
+        finally:
+            self._stop.set()
+            self._executor.shutdown(wait=True)
+
+    def _dispatch(self, uu):
+        """
+        Submits the next batch of a stream's buffer to the executor unless a
+        batch for that stream is already in flight. Must hold the lock.
+        """
+        if uu in self._inflight or uu not in self._buffers:
+            return
+
+        pending = self._buffers[uu]
+        batch, rest = pending[:self.batch_size], pending[self.batch_size:]
+        if rest:
+            self._buffers[uu] = rest
+        else:
+            del self._buffers[uu]
+            del self._born[uu]
+
+        self._inflight.add(uu)
+        self._executor.submit(self._send, uu, batch)
+
+    def _send(self, uu, batch):
+        try:
+            version = self._btrdb.stream_from_uuid(uu).insert(batch, merge=self.merge)
+        except Exception as exc:
+            with self._cond:
+                self._errors.append((uu, exc))
+        else:
+            with self._cond:
+                self.versions[uu] = version
+        finally:
+            with self._cond:
+                self._inflight.discard(uu)
+                self._buffered -= len(batch)
+
+                # keep draining this stream if it is due to be written
+                pending = self._buffers.get(uu)
+                if pending is not None:
+                    if self._flushing or len(pending) >= self.batch_size or self._is_stale(uu):
+                        self._dispatch(uu)
+                self._cond.notify_all()
+
+    def _is_stale(self, uu):
+        return self.max_age is not None and time.monotonic() - self._born[uu] >= self.max_age
+
+    def _age_loop(self):
+        interval = max(self.max_age / 4, 0.01)
+        while not self._stop.wait(interval):
+            with self._cond:
+                for uu in list(self._buffers):
+                    if self._is_stale(uu):
+                        self._dispatch(uu)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return "<{} buffered={} streams={}>".format(
+            self.__class__.__name__, self._buffered, len(self._buffers)
+        )
@@ -148,7 +148,10 @@ config = {
     },
     "zip_safe": False,
     "entry_points": {
-        "console_scripts": [],
+        "console_scripts": [
+            "btrdb-import=btrdb.cli.importer:main",
+            "btrdb-export=btrdb.cli.exporter:main",
+        ],
     },
     "install_requires": list(get_requires()),
     "python_requires": ">=3.6, <4",
@@ -0,0 +1,185 @@
+# tests.cli.test_exporter
+# Testing for the btrdb.cli.exporter module
+#
+# Author:   PingThings
+# Created:  Tue Oct 20 14:26:51 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_exporter.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.cli.exporter module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import json
+import uuid
+import pytest
+from unittest.mock import Mock
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.stream import Stream
+from btrdb.point import RawPoint, StatPoint
+from btrdb.exceptions import BTRDBValueError
+from btrdb.cli.exporter import main, day_partitions, window_partitions, partition_name, fetch, DAY
+
+np = pytest.importorskip("numpy")
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+
+
+@pytest.fixture
+def stream():
+    db = BTrDB(Mock(Endpoint))
+    stream = Stream(db, UU1, collection="sensors/a", tags={"name": "volts"},
+        annotations={"owner": "ABC"}, property_version=3)
+    stream.version = Mock(return_value=11)
+    db.streams_in_collection = Mock(return_value=[stream])
+    return stream
+
+
+##########################################################################
+## Helper Tests
+##########################################################################
+
+class TestHelpers(object):
+
+    def test_day_partitions(self):
+        """
+        Assert time ranges are split on UTC day boundaries
+        """
+        assert day_partitions(10, 20) == [(10, 20)]
+        assert day_partitions(DAY - 5, DAY + 5) == [(DAY - 5, DAY), (DAY, DAY + 5)]
+        assert day_partitions(0, 3 * DAY) == [(0, DAY), (DAY, 2 * DAY), (2 * DAY, 3 * DAY)]
+
+    def test_window_partitions(self):
+        """
+        Assert partitions are moved to window boundaries so that windows
+        straddling midnight are kept by the day they start in
+        """
+        width = 7
+        partitions = window_partitions(DAY - 10, DAY + 12, width)
+        assert partitions == [(DAY - 10, DAY + 4), (DAY + 4, DAY + 11)]
+
+        # a window not ending by the end is not exported, as with one query
+        assert window_partitions(0, 13, width) == [(0, 7)]
+        assert window_partitions(0, 5, width) == []
+
+    def test_partition_name(self):
+        """
+        Assert partitions are named after their UTC day
+        """
+        assert partition_name(DAY + 5, "csv") == "1970-01-02.csv"
+
+    def test_fetch_aligned_partition_boundaries(self, stream):
+        """
+        Assert aligned windows are assigned to the partition they start in
+        """
+        windows = [(StatPoint(t, 0, 0, 0, 1, 0), 11) for t in (0, 8, 16)]
+        stream.aligned_windows = Mock(return_value=windows)
+
+        points = fetch(stream, 4, 12, 11, mode="aligned", pointwidth=3)
+        stream.aligned_windows.assert_called_once_with(4, 16, 3, version=11)
+        assert [p.time for p in points] == [8]
+
+    def test_fetch_requires_known_mode(self, stream):
+        with pytest.raises(BTRDBValueError):
+            fetch(stream, 0, 1, 0, mode="bogus")
+
+
+##########################################################################
+## Command Tests
+##########################################################################
+
+class TestExportCommand(object):
+
+    def test_export_csv_resumable(self, stream, tmp_path, capsys):
+        """
+        Assert streams are exported per day and existing partitions skipped
+        """
+        def values(start, end, version=0):
+            return [(RawPoint(t, float(t)), version) for t in (5, DAY + 5) if start <= t < end]
+        stream.values = Mock(side_effect=values)
+
+        argv = ["-c", "sensors", "--start", "0", "--end", str(2 * DAY),
+                "-f", "csv", "-o", str(tmp_path)]
+        assert main(argv, db=stream.btrdb) == 0
+        assert "exported 2 points from 1 streams into 2 partitions" in capsys.readouterr().out
+
+        directory = tmp_path / str(UU1)
+        assert sorted(os.listdir(str(directory))) == ["1970-01-01.csv", "1970-01-02.csv", "stream.json"]
+        assert (directory / "1970-01-02.csv").read_text().splitlines() == [
+            "time,value", "{},{}".format(DAY + 5, float(DAY + 5)),
+        ]
+
+        meta = json.loads((directory / "stream.json").read_text())
+        assert meta["version"] == 11
+        assert meta["tags"] == {"name": "volts"}
+
+        # running again resumes and fetches nothing
+        stream.values.reset_mock()
+        assert main(argv, db=stream.btrdb) == 0
+        assert stream.values.call_count == 0
+        assert "(2 already exported)" in capsys.readouterr().out
+
+    def test_export_windows_across_midnight(self, stream, tmp_path):
+        """
+        Assert the window straddling midnight is exported once and empty
+        partitions are written so that they are not queried again
+        """
+        def windows(start, end, width, version=0):
+            return [
+                (StatPoint(t, 0, 0, 0, 1, 0), version)
+                for t in range(start, end - width + 1, width)
+            ]
+        stream.windows = Mock(side_effect=windows)
+
+        width = DAY // 2 + 1
+        argv = ["-c", "sensors", "--start", "0", "--end", str(3 * DAY), "--mode", "windows",
+                "--width", str(width), "-f", "csv", "-o", str(tmp_path)]
+        assert main(argv, db=stream.btrdb) == 0
+
+        directory = tmp_path / str(UU1)
+        times = [
+            int(line.split(",")[0])
+            for name in ("1970-01-01.csv", "1970-01-02.csv", "1970-01-03.csv")
+            for line in (directory / name).read_text().splitlines()[1:]
+        ]
+        assert times == [0, width, 2 * width, 3 * width, 4 * width]
+
+        stream.windows = Mock(return_value=[])
+        assert main(argv + ["--overwrite"], db=stream.btrdb) == 0
+        assert (directory / "1970-01-02.csv").read_text().splitlines() == [
+            "time,min,mean,max,count,stddev",
+        ]
+
+    def test_export_npz_aligned(self, stream, tmp_path):
+        """
+        Assert aligned windows are exported with all statistics
+        """
+        stream.aligned_windows = Mock(return_value=[(StatPoint(0, 1.0, 2.0, 3.0, 4, 0.5), 11)])
+        argv = ["-c", "sensors", "--start", "0", "--end", "16", "--mode", "aligned",
+                "--pointwidth", "4", "-f", "npz", "-o", str(tmp_path)]
+        assert main(argv, db=stream.btrdb) == 0
+
+        with np.load(str(tmp_path / str(UU1) / "1970-01-01.npz")) as data:
+            assert sorted(data.files) == sorted(["time", "min", "mean", "max", "count", "stddev"])
+            assert data["count"].tolist() == [4]
+
+    def test_export_requires_pointwidth(self, stream, tmp_path, capsys):
+        """
+        Assert aligned mode without a pointwidth is reported as an error
+        """
+        argv = ["-c", "sensors", "--mode", "aligned", "-o", str(tmp_path)]
+        assert main(argv, db=stream.btrdb) == 1
+        assert "--pointwidth is required" in capsys.readouterr().err
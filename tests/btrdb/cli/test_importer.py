@@ -0,0 +1,190 @@
+# tests.cli.test_importer
+# Testing for the btrdb.cli.importer module
+#
+# Author:   PingThings
+# Created:  Tue Oct 20 09:03:17 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_importer.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.cli.importer module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+import pytest
+from unittest.mock import Mock
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.stream import Stream
+from btrdb.exceptions import BTRDBValueError
+from btrdb.cli.importer import (
+    main, detect_format, parse_mapping, to_nanoseconds_array, StreamResolver
+)
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+UU2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+
+
+@pytest.fixture
+def db():
+    endpoint = Mock(Endpoint)
+    endpoint.insert = Mock(return_value=1)
+    endpoint.lookupStreams = Mock(return_value=[])
+    return BTrDB(endpoint)
+
+
+def inserted(db):
+    return {args[0]: args[1] for args, _ in db.ep.insert.call_args_list}
+
+
+##########################################################################
+## Helper Tests
+##########################################################################
+
+class TestHelpers(object):
+
+    def test_detect_format(self):
+        """
+        Assert the file format is detected from the extension
+        """
+        assert detect_format("a.csv") == "csv"
+        assert detect_format("a.CSV.gz") == "csv"
+        assert detect_format("a.parquet") == "parquet"
+        assert detect_format("a.npz") == "npz"
+        with pytest.raises(BTRDBValueError):
+            detect_format("a.xlsx")
+
+    def test_parse_mapping(self):
+        """
+        Assert COLUMN=STREAM arguments are parsed
+        """
+        assert parse_mapping(["a=x/y", "b={}".format(UU1)]) == {"a": "x/y", "b": str(UU1)}
+        with pytest.raises(BTRDBValueError):
+            parse_mapping(["a"])
+
+        with pytest.raises(BTRDBValueError, match="more than one column"):
+            parse_mapping(["a=x/y", "b=x/y"])
+
+    def test_to_nanoseconds_array(self):
+        """
+        Assert numeric and datetime time columns are converted to nanoseconds
+        """
+        assert to_nanoseconds_array(pd.Series([1, 2]), "s").tolist() == [10**9, 2 * 10**9]
+        assert to_nanoseconds_array(pd.Series([1.5]), "ms").tolist() == [1500000]
+        times = pd.Series(["1970-01-01 00:00:01", "1970-01-01 00:00:02"])
+        assert to_nanoseconds_array(times).tolist() == [10**9, 2 * 10**9]
+
+
+##########################################################################
+## StreamResolver Tests
+##########################################################################
+
+class TestStreamResolver(object):
+
+    def test_resolves_uuid(self, db):
+        """
+        Assert UUID targets are checked for existence
+        """
+        db.ep.streamInfo = Mock(return_value=("c", 0, {"name": "n"}, {}, 1))
+        resolver = StreamResolver(db, mapping={"a": str(UU1)})
+        assert resolver.resolve("a").uuid == UU1
+
+    def test_creates_missing_stream(self, db):
+        """
+        Assert missing collection/name streams are created when requested
+        """
+        resolver = StreamResolver(db, collection="sensors", create=True, unit="volts")
+        stream = resolver.resolve("temp")
+        assert resolver.resolve("temp") is stream
+
+        db.ep.create.assert_called_once()
+        args = db.ep.create.call_args[0]
+        assert args[1:] == ("sensors", {"name": "temp", "unit": "volts"}, {})
+        assert resolver.created == [stream]
+
+    def test_columns_mapping_to_same_stream_raise(self, db):
+        """
+        Assert two columns cannot be imported into the same stream
+        """
+        db.ep.streamInfo = Mock(return_value=("sensors", 0, {"name": "temp"}, {}, 1))
+        resolver = StreamResolver(db, mapping={"a": str(UU1), "temp": str(UU1).upper()})
+        resolver.resolve("a")
+        with pytest.raises(BTRDBValueError, match="both map to stream"):
+            resolver.resolve("temp")
+
+    def test_missing_stream_raises(self, db):
+        """
+        Assert missing streams raise unless creation was requested
+        """
+        resolver = StreamResolver(db, collection="sensors")
+        with pytest.raises(BTRDBValueError):
+            resolver.resolve("temp")
+
+        with pytest.raises(BTRDBValueError):
+            StreamResolver(db).resolve("temp")
+
+
+##########################################################################
+## Command Tests
+##########################################################################
+
+class TestImportCommand(object):
+
+    def test_import_csv(self, db, tmp_path, capsys):
+        """
+        Assert a CSV file is inserted into mapped streams skipping blanks
+        """
+        path = tmp_path / "data.csv"
+        path.write_text("time,a,b\n1,1.0,\n2,2.0,20.0\n3,,30.0\n")
+
+        s1, s2 = Stream(db, UU1), Stream(db, UU2)
+        db.ep.lookupStreams = Mock(return_value=[])
+        resolver_streams = {"x/a": s1, "x/b": s2}
+        db.streams_in_collection = Mock(
+            side_effect=lambda coll, **kw: [resolver_streams["{}/{}".format(coll, kw["tags"]["name"])]]
+        )
+
+        assert main(["--collection", "x", "--time-unit", "s", str(path)], db=db) == 0
+        assert inserted(db) == {
+            UU1: [(10**9, 1.0), (2 * 10**9, 2.0)],
+            UU2: [(2 * 10**9, 20.0), (3 * 10**9, 30.0)],
+        }
+        assert "imported 4 points into 2 streams" in capsys.readouterr().out
+
+    def test_import_npz_with_create(self, db, tmp_path):
+        """
+        Assert NPZ files are imported in chunks into created streams
+        """
+        path = tmp_path / "data.npz"
+        np.savez(str(path), time=np.arange(5, dtype=np.int64), volts=np.arange(5, dtype=np.float64))
+
+        assert main(["-c", "pmu", "--create", "--chunksize", "2", str(path)], db=db) == 0
+        assert db.ep.create.call_count == 1
+        assert db.ep.insert.call_count == 3
+
+        points = [p for args, _ in db.ep.insert.call_args_list for p in args[1]]
+        assert points == [(i, float(i)) for i in range(5)]
+
+    def test_import_reports_errors(self, db, tmp_path, capsys):
+        """
+        Assert errors are reported with a non-zero exit code
+        """
+        path = tmp_path / "data.csv"
+        path.write_text("timestamp,a\n1,1.0\n")
+
+        assert main(["-c", "x", "--create", str(path)], db=db) == 1
+        assert "time column `time` not found" in capsys.readouterr().err
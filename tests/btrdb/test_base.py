@@ -19,7 +19,7 @@ import os
 import pytest
 from unittest.mock import patch
 
-from btrdb import connect, __version__, BTRDB_ENDPOINTS, BTRDB_API_KEY
+from btrdb import connect, __version__, BTRDB_ENDPOINTS, BTRDB_API_KEY, Limiter
 from btrdb.exceptions import ConnectionError
 
 
@@ -101,3 +101,32 @@ class TestConnect(object):
         os.environ[BTRDB_API_KEY] = apikey
         btrdb = connect()
         mock_conn.assert_called_once_with(address, apikey=apikey)
+
+    @patch('btrdb.Connection')
+    def test_connect_warmup_and_keepalive(self, mock_conn):
+        """
+        Assert connect warms up the connection with the channel options
+        """
+        address = "127.0.0.1:4410"
+        connect(address, apikey="abcd", warmup=3, keepalive_time=60)
+        mock_conn.assert_called_once_with(address, apikey="abcd", pool_size=1, keepalive_time=60)
+        mock_conn.return_value.warmup.assert_called_once_with(3, drop_unready=False)
+
+    @patch('btrdb.Connection')
+    def test_connect_limiter(self, mock_conn):
+        """
+        Assert connect passes the limiter to the endpoint
+        """
+        limiter = Limiter(max_concurrency=4)
+        db = connect("127.0.0.1:4410", limiter=limiter)
+        assert db.ep.limiter is limiter
+        assert db.connection_spec["limiter"] is limiter
+
+    @patch('btrdb.Connection')
+    def test_connect_max_concurrency(self, mock_conn):
+        """
+        Assert connect sets the max concurrency and keeps it for pickling
+        """
+        db = connect("127.0.0.1:4410", max_concurrency=2)
+        assert db.max_concurrency == 2
+        assert db.connection_spec["max_concurrency"] == 2
@@ -15,11 +15,17 @@ Testing package for the btrdb connection module
 ## Imports
 ##########################################################################
 
+import gc
+import pickle
 import uuid as uuidlib
+import grpc
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, PropertyMock, patch, call
 
-from btrdb.conn import Connection, BTrDB
+from btrdb.conn import Connection, BTrDB, _reset_after_fork, _RESTORED
+from btrdb.utils.retry import RetryPolicy
+from btrdb.stream import Stream, StreamSet
 from btrdb.endpoint import Endpoint
 from btrdb.grpcinterface import btrdb_pb2
 from btrdb.exceptions import *
@@ -50,6 +56,70 @@ class TestConnection(object):
         assert "cannot use an API key with an insecure" in str(exc)
 
 
+    def test_keepalive_options(self):
+        """
+        Assert keepalive and idle settings are passed as channel options
+        """
+        conn = Connection("127.0.0.1:4410", keepalive_time=30, idle_timeout=600,
+                          options=[("grpc.max_receive_message_length", -1)])
+        options = dict(conn.chan_ops)
+        assert options["grpc.keepalive_time_ms"] == 30000
+        assert options["grpc.keepalive_timeout_ms"] == 20000
+        assert options["grpc.keepalive_permit_without_calls"] == 1
+        assert options["grpc.client_idle_timeout_ms"] == 600000
+        assert options["grpc.max_receive_message_length"] == -1
+
+        options = dict(Connection("127.0.0.1:4410").chan_ops)
+        assert "grpc.keepalive_time_ms" not in options
+
+
+    def test_warmup(self):
+        """
+        Assert warmup waits until the channels are connected
+        """
+        server = grpc.server(ThreadPoolExecutor(max_workers=1))
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        try:
+            conn = Connection("127.0.0.1:{}".format(port), pool_size=2)
+            conn.warmup(timeout=5)
+        finally:
+            server.stop(None)
+
+
+    def test_warmup_raises_on_timeout(self):
+        """
+        Assert warmup raises ConnectionError if the server cannot be reached
+        """
+        conn = Connection("127.0.0.1:1")
+        with pytest.raises(ConnectionError, match="could not connect"):
+            conn.warmup(timeout=0.2)
+
+        # at least one address must be ready when dropping unready ones
+        with pytest.raises(ConnectionError, match="could not connect"):
+            conn.warmup(timeout=0.2, drop_unready=True)
+
+    def test_warmup_drops_unready_addresses(self):
+        """
+        Assert warmup can drop the addresses that are not ready
+        """
+        server = grpc.server(ThreadPoolExecutor(max_workers=1))
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        try:
+            live = "127.0.0.1:{}".format(port)
+            conn = Connection("127.0.0.1:1,{}".format(live), pool_size=2)
+            with pytest.raises(ConnectionError, match="127.0.0.1:1 within"):
+                conn.warmup(timeout=0.5)
+
+            conn.warmup(timeout=0.5, drop_unready=True)
+            assert conn.addresses == [live]
+            assert len(conn.channels) == 2
+            assert conn.channel is conn.channels[0]
+        finally:
+            server.stop(None)
+
+
 ##########################################################################
 ## BTrDB Tests
 ##########################################################################
@@ -250,3 +320,214 @@ class TestBTrDB(object):
         annotations = {"size": "large"}
         streams = conn.streams_in_collection(annotations=annotations)
         assert endpoint.lookupStreams.called
+
+    def test_insert_many(self):
+        """
+        Assert insert_many inserts data for each stream and returns versions
+        """
+        uu1 = uuidlib.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuidlib.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(side_effect=lambda uu, values, policy: {uu1: 11, uu2: 22}[uu])
+
+        conn = BTrDB(endpoint)
+        data = {uu1: [(1, 1.0), (2, 2.0)], str(uu2): [(3, 3.0)]}
+        versions = conn.insert_many(data, merge="replace")
+
+        assert versions == {uu1: 11, uu2: 22}
+        assert sorted(endpoint.insert.call_args_list) == sorted([
+            call(uu1, [(1, 1.0), (2, 2.0)], "replace"),
+            call(uu2, [(3, 3.0)], "replace"),
+        ])
+
+    def test_create_many(self):
+        """
+        Assert create_many creates streams with cached metadata
+        """
+        uu1 = uuidlib.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        conn = BTrDB(endpoint)
+
+        streams = conn.create_many([
+            {"uuid": uu1, "collection": "sub/a", "tags": {"name": "va"}},
+            {"collection": "sub/a", "tags": {"name": "vb"}, "annotations": {"x": "1"}},
+        ])
+
+        assert endpoint.create.call_count == 2
+        assert streams[0].uuid == uu1
+        assert isinstance(streams[1].uuid, uuidlib.UUID)
+        assert [s.name for s in streams] == ["va", "vb"]
+        assert streams[1].annotations()[0] == {"x": "1"}
+        assert not endpoint.streamInfo.called
+
+    def test_create_many_existing_streams(self):
+        """
+        Assert StreamExists is handled per item according to on_exists
+        """
+        uu1 = uuidlib.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuidlib.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+
+        def create(uu, collection, tags, annotations):
+            if uu == uu1:
+                raise StreamExists("stream already exists")
+
+        endpoint = Mock(Endpoint)
+        endpoint.create = Mock(side_effect=create)
+        endpoint.streamInfo = Mock(return_value=("sub/a", 4, {"name": "old"}, {}, 10))
+        conn = BTrDB(endpoint)
+        specs = [
+            {"uuid": uu1, "collection": "sub/a", "tags": {"name": "va"}},
+            {"uuid": uu2, "collection": "sub/a", "tags": {"name": "vb"}},
+        ]
+
+        streams = conn.create_many(specs)
+        assert [s.uuid for s in streams] == [uu1, uu2]
+        assert streams[0].name == "old"
+
+        streams = conn.create_many(specs, on_exists="skip")
+        assert [s.uuid for s in streams] == [uu2]
+
+        endpoint.create.reset_mock()
+        with pytest.raises(StreamExists):
+            conn.create_many(specs, on_exists="raise")
+        assert endpoint.create.call_count == 2
+
+        with pytest.raises(BTRDBValueError):
+            conn.create_many(specs, on_exists="ignore")
+
+    def test_fan_out_respects_max_concurrency(self):
+        """
+        Assert fan out never has more than max_concurrency calls in flight
+        """
+        import time
+        import threading
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def work(item):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return item * 2
+
+        conn = BTrDB(Mock(Endpoint), max_concurrency=3)
+        assert conn._fan_out(work, range(12)) == [i * 2 for i in range(12)]
+        assert 1 < state["peak"] <= 3
+
+    def test_fan_out_raises_errors(self):
+        """
+        Assert fan out re-raises an exception raised by any call
+        """
+        def work(item):
+            if item == 3:
+                raise BTrDBError("bad item")
+            return item
+
+        conn = BTrDB(Mock(Endpoint))
+        with pytest.raises(BTrDBError, match="bad item"):
+            conn._fan_out(work, range(5))
+
+    def test_close(self):
+        """
+        Assert close shuts down the executor and closes the endpoint
+        """
+        endpoint = Mock(Endpoint)
+        with BTrDB(endpoint, max_concurrency=2) as conn:
+            executor = conn.executor
+            assert conn._fan_out(lambda x: x * 2, range(3)) == [0, 2, 4]
+
+        assert conn._executor is None
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+        endpoint.close.assert_called_once_with()
+
+
+##########################################################################
+## Pickling Tests
+##########################################################################
+
+class TestPickling(object):
+
+    SPEC = {"endpoints": "127.0.0.1:4410", "apikey": None}
+
+    def test_raises_without_connection_spec(self):
+        """
+        Assert objects not created by connect cannot be pickled
+        """
+        with pytest.raises(InvalidOperation):
+            pickle.dumps(BTrDB(Mock(Endpoint)))
+
+    @patch("btrdb._connect")
+    def test_reconnects_lazily(self, mock_connect):
+        """
+        Assert an unpickled object connects on first use
+        """
+        db = BTrDB(Mock(Endpoint), max_concurrency=4, connection_spec=self.SPEC)
+        restored = pickle.loads(pickle.dumps(db))
+        assert restored is not db
+        assert restored.max_concurrency == 4
+        mock_connect.assert_not_called()
+
+        assert restored.ep is mock_connect.return_value.ep
+        assert restored.ep is mock_connect.return_value.ep
+        mock_connect.assert_called_once_with(**self.SPEC)
+
+    def test_streams_share_connection(self):
+        """
+        Assert streams unpickled in a process share one BTrDB object
+        """
+        db = BTrDB(Mock(Endpoint), connection_spec=self.SPEC)
+        uu1, uu2 = uuidlib.uuid4(), uuidlib.uuid4()
+        streams = StreamSet([Stream(db, uu1), Stream(db, uu2)]).filter(start=1, end=10)
+
+        restored = pickle.loads(pickle.dumps(streams))
+        assert [s.uuid for s in restored] == [uu1, uu2]
+        assert restored.filters[0].start == 1
+
+        stream = pickle.loads(pickle.dumps(Stream(db, uu1)))
+        assert stream._btrdb is restored[0]._btrdb is restored[1]._btrdb
+
+    def test_reset_after_fork(self):
+        """
+        Assert the fork handler drops endpoints of reconnectable objects
+        """
+        db = BTrDB(Mock(Endpoint), connection_spec=self.SPEC)
+        plain = BTrDB(Mock(Endpoint))
+        db.executor
+
+        _reset_after_fork()
+        assert db._ep is None
+        assert db._executor is None
+        assert plain._ep is not None
+
+    def test_reset_after_fork_copies_retry_policy(self):
+        """
+        Assert the fork handler replaces the retry policy holding the
+        parent's lock and hedging executor
+        """
+        retry = RetryPolicy(max_attempts=3, hedge_percentile=95)
+        retry._executor = Mock()
+        db = BTrDB(Mock(Endpoint), connection_spec=dict(self.SPEC, retry=retry))
+
+        _reset_after_fork()
+        policy = db.connection_spec["retry"]
+        assert policy is not retry
+        assert policy.max_attempts == 3
+        assert policy._executor is None
+        assert policy._lock is not retry._lock
+
+    def test_restored_objects_are_released(self):
+        """
+        Assert restored objects are not kept alive once unreferenced
+        """
+        db = BTrDB(Mock(Endpoint), connection_spec=self.SPEC)
+        restored = pickle.loads(pickle.dumps(db))
+        assert _RESTORED[db._spec_id] is restored
+
+        del restored
+        gc.collect()
+        assert db._spec_id not in _RESTORED
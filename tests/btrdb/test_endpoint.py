@@ -0,0 +1,184 @@
+# tests.test_endpoint
+# Testing for the btrdb.endpoint module
+#
+# Author:   PingThings
+# Created:  Fri Oct 23 11:05:19 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_endpoint.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.endpoint module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+import grpc
+import pytest
+from unittest.mock import Mock
+
+from btrdb.endpoint import Endpoint
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.utils.retry import RetryPolicy
+from btrdb.exceptions import DeadlineExceeded
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+
+
+class Call(object):
+    """
+    Mimics the response iterator of a streaming gRPC call
+    """
+
+    def __init__(self, responses, error=None):
+        self.responses = iter(responses)
+        self.error = error
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.responses)
+        except StopIteration:
+            if self.error is not None:
+                raise self.error
+            raise
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class RpcError(grpc.RpcError):
+
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return "Deadline Exceeded"
+
+
+def raw(*times):
+    return btrdb_pb2.RawValuesResponse(
+        versionMajor=1,
+        values=[btrdb_pb2.RawPoint(time=t, value=float(t)) for t in times],
+    )
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = Endpoint(Mock(), timeout=30)
+    endpoint.stub = Mock()
+    return endpoint
+
+
+##########################################################################
+## Deadline Tests
+##########################################################################
+
+class TestDeadlines(object):
+
+    def test_default_timeout(self, endpoint):
+        """
+        Assert the default deadline is passed to each call
+        """
+        endpoint.stub.RawValues.return_value = Call([raw(1)])
+        list(endpoint.rawValues(UU, 0, 10))
+        assert endpoint.stub.RawValues.call_args[1] == {"timeout": 30}
+
+        endpoint.stub.Nearest.return_value = btrdb_pb2.NearestResponse(value=btrdb_pb2.RawPoint(time=1))
+        endpoint.nearest(UU, 0, 0, False)
+        assert endpoint.stub.Nearest.call_args[1] == {"timeout": 30}
+
+    def test_per_call_timeout(self, endpoint):
+        """
+        Assert a per-call deadline overrides the default
+        """
+        endpoint.stub.Windows.return_value = Call([])
+        list(endpoint.windows(UU, 0, 10, 5, 0, timeout=2.5))
+        assert endpoint.stub.Windows.call_args[1] == {"timeout": 2.5}
+
+    @pytest.mark.parametrize("method,call,args", [
+        ("listCollections", "ListCollections", ("foo",)),
+        ("changes", "Changes", (UU, 1, 2, 0)),
+        ("sql_query", "SQLQuery", ("select 1",)),
+    ])
+    def test_metadata_query_timeout(self, endpoint, method, call, args):
+        """
+        Assert streaming metadata queries are sent with a deadline
+        """
+        getattr(endpoint.stub, call).return_value = Call([])
+        list(getattr(endpoint, method)(*args))
+        assert getattr(endpoint.stub, call).call_args[1] == {"timeout": 30}
+
+        list(getattr(endpoint, method)(*args, timeout=2.5))
+        assert getattr(endpoint.stub, call).call_args[1] == {"timeout": 2.5}
+
+    def test_deadline_exceeded(self, endpoint):
+        """
+        Assert an expired deadline raises DeadlineExceeded
+        """
+        error = RpcError(grpc.StatusCode.DEADLINE_EXCEEDED)
+        endpoint.stub.RawValues.return_value = Call([raw(1)], error=error)
+        with pytest.raises(DeadlineExceeded):
+            list(endpoint.rawValues(UU, 0, 10))
+
+
+##########################################################################
+## Cancellation Tests
+##########################################################################
+
+class TestCancellation(object):
+
+    @pytest.mark.parametrize("retry", [None, RetryPolicy()])
+    def test_close_cancels_call(self, endpoint, retry):
+        """
+        Assert closing a read before it is exhausted cancels the call
+        """
+        endpoint.retry = retry
+        call = Call([raw(1), raw(2), raw(3)])
+        endpoint.stub.RawValues.return_value = call
+
+        results = endpoint.rawValues(UU, 0, 10)
+        next(results)
+        assert not call.cancelled
+
+        results.close()
+        assert call.cancelled
+
+    def test_close_cancels_sql_query(self, endpoint):
+        """
+        Assert closing a SQL query before it is exhausted cancels the call
+        """
+        page = btrdb_pb2.SQLQueryResponse(SQLQueryRow=[b"{}"])
+        call = Call([page, page])
+        endpoint.stub.SQLQuery.return_value = call
+
+        results = endpoint.sql_query("select 1")
+        next(results)
+        results.close()
+        assert call.cancelled
+
+    def test_abandoned_read_cancels_call(self, endpoint):
+        """
+        Assert a garbage collected read cancels the call
+        """
+        call = Call([raw(1), raw(2)])
+        endpoint.stub.RawValues.return_value = call
+
+        results = endpoint.rawValues(UU, 0, 10)
+        next(results)
+        del results
+        assert call.cancelled
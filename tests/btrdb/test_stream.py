@@ -34,7 +34,9 @@ from btrdb.exceptions import (
     InvalidOperation,
     StreamNotFoundError,
     InvalidCollection,
-    NoSuchPoint
+    NoSuchPoint,
+    BTRDBValueError,
+    PropertyVersionMismatch
 )
 from btrdb.grpcinterface import btrdb_pb2
 
@@ -588,6 +590,30 @@ class TestStream(object):
         )
 
 
+    def test_values_limit_cancels_read(self):
+        """
+        Assert values stops reading and closes the results after limit points
+        """
+        uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        received = []
+
+        def results():
+            for time in range(0, 10, 2):
+                received.append(time)
+                yield [RawPointProto(time=time, value=1.0), RawPointProto(time=time + 1, value=1.0)], 42
+
+        generator = results()
+        endpoint.rawValues = Mock(return_value=generator)
+        stream = Stream(btrdb=BTrDB(endpoint), uuid=uu)
+
+        result = stream.values(0, 100, limit=3, timeout=5)
+        assert [p.time for p, _ in result] == [0, 1, 2]
+        assert received == [0, 2]
+        assert generator.gi_frame is None
+        endpoint.rawValues.assert_called_once_with(uu, 0, 100, 0, timeout=5)
+
+
     def test_count(self):
         """
         Test that stream count method uses aligned windows
@@ -784,6 +810,88 @@ class TestStream(object):
         assert version == 3
 
 
+    def test_insert_generator(self):
+        """
+        Assert insert lazily batches points from an iterator
+        """
+        uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(side_effect=[1, 2, 3])
+        stream = Stream(btrdb=BTrDB(endpoint), uuid=uu)
+
+        data = ((t, float(t)) for t in range(110000))
+        version = stream.insert(data, merge="replace")
+
+        calls = endpoint.insert.call_args_list
+        assert [len(c[0][1]) for c in calls] == [INSERT_BATCH_SIZE, INSERT_BATCH_SIZE, 10000]
+        assert calls[1][0][1][0] == (INSERT_BATCH_SIZE, float(INSERT_BATCH_SIZE))
+        assert all(c[0][2] == "replace" for c in calls)
+        assert version == 3
+
+    def test_insert_iterable_of_chunks(self):
+        """
+        Assert insert accepts an iterable of point chunks including arrays
+        """
+        np = pytest.importorskip("numpy")
+        uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(return_value=9)
+        stream = Stream(btrdb=BTrDB(endpoint), uuid=uu)
+
+        chunks = iter([
+            [(1, 1.0), (2, 2.0)],
+            np.array([[3, 3.0], [4, 4.0]]),
+        ])
+        assert stream.insert(chunks) == 9
+        endpoint.insert.assert_called_once_with(
+            uu, [(1, 1.0), (2, 2.0), (3, 3.0), (4, 4.0)], "never"
+        )
+
+    def test_insert_list_of_chunks(self):
+        """
+        Assert insert accepts a list of point chunks including arrays
+        """
+        np = pytest.importorskip("numpy")
+        uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(return_value=9)
+        stream = Stream(btrdb=BTrDB(endpoint), uuid=uu)
+
+        chunks = [np.array([[1, 1.0], [2, 2.0]]), np.array([[3, 3.0]])]
+        assert stream.insert(chunks) == 9
+        assert stream.insert([[(4, 4.0), (5, 5.0)], [(6, 6.0)]]) == 9
+        assert endpoint.insert.call_args_list == [
+            call(uu, [(1, 1.0), (2, 2.0), (3, 3.0)], "never"),
+            call(uu, [(4, 4.0), (5, 5.0), (6, 6.0)], "never"),
+        ]
+
+    def test_insert_large_chunk(self):
+        """
+        Assert a chunk larger than a batch is split into consecutive batches
+        with the remainder carried into the next chunk
+        """
+        uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(return_value=9)
+        stream = Stream(btrdb=BTrDB(endpoint), uuid=uu)
+
+        size = INSERT_BATCH_SIZE * 2 + 10
+        chunks = iter([[(t, float(t)) for t in range(size)], [(size, float(size))]])
+        stream.insert(chunks)
+
+        batches = [c[0][1] for c in endpoint.insert.call_args_list]
+        assert [len(batch) for batch in batches] == [INSERT_BATCH_SIZE, INSERT_BATCH_SIZE, 11]
+        assert [p[0] for batch in batches for p in batch] == list(range(size + 1))
+
+    def test_insert_empty_iterable(self):
+        """
+        Assert inserting an empty iterator does not call the endpoint
+        """
+        endpoint = Mock(Endpoint)
+        stream = Stream(btrdb=BTrDB(endpoint), uuid=uuid.uuid4())
+        assert stream.insert(iter([])) == 0
+        endpoint.insert.assert_not_called()
+
     def test_nearest(self):
         """
         Assert nearest calls Endpoint.nearest with correct arguments
@@ -844,8 +952,9 @@ class TestStream(object):
         """
         uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
         stream = Stream(btrdb=BTrDB(Mock(Endpoint)), uuid=uu)
+        stream._btrdb.ep.flush.return_value = 42
 
-        stream.flush()
+        assert stream.flush() == 42
         stream._btrdb.ep.flush.assert_called_once_with(uu)
 
 
@@ -1681,6 +1790,54 @@ class TestStreamSet(object):
 
 
 
+    def test_limit(self, stream1, stream2):
+        """
+        Assert limit is passed to each stream's query
+        """
+        streams = StreamSet([stream1, stream2])
+        assert streams.limit(3) is streams
+        assert streams.point_limit == 3
+
+        stream1.aligned_windows = Mock(return_value=())
+        stream2.aligned_windows = Mock(return_value=())
+        streams.filter(start=1, end=100).aligned_windows(20).values()
+        stream1.aligned_windows.assert_called_once_with(start=1, end=100, pointwidth=20, version=11, limit=3)
+
+        with pytest.raises(BTRDBValueError):
+            streams.limit(-1)
+
+
+    def test_head(self, stream1, stream2):
+        """
+        Assert head reads the first points without changing the streamset
+        """
+        stream1.values = Mock(return_value=[(RawPoint(time=1, value=1), 1)])
+        stream2.values = Mock(return_value=[(RawPoint(time=2, value=2), 2)])
+        streams = StreamSet([stream1, stream2]).filter(start=1, end=100)
+
+        assert streams.head(1) == [[RawPoint(time=1, value=1)], [RawPoint(time=2, value=2)]]
+        stream1.values.assert_called_once_with(start=1, end=100, limit=1, version=11)
+        assert streams.point_limit is None
+
+    def test_head_with_only_start(self, stream1, stream2):
+        stream1.values = Mock(return_value=[(RawPoint(time=1, value=1), 1)])
+        stream2.values = Mock(return_value=[(RawPoint(time=2, value=2), 2)])
+        streams = StreamSet([stream1, stream2]).filter(start=1)
+        assert streams.head(1) == [[RawPoint(time=1, value=1)], [RawPoint(time=2, value=2)]]
+        stream1.values.assert_called_once_with(start=1, end=MAXIMUM_TIME, limit=1, version=11)
+        assert len(streams.filters) == 1
+
+    def test_head_without_filter(self, stream1, stream2):
+        stream1.values = Mock(return_value=[(RawPoint(time=1, value=1), 1)])
+        stream2.values = Mock(return_value=[(RawPoint(time=2, value=2), 2)])
+        streams = StreamSet([stream1, stream2])
+        assert streams.head(1) == [[RawPoint(time=1, value=1)], [RawPoint(time=2, value=2)]]
+        stream2.values.assert_called_once_with(
+            start=MINIMUM_TIME, end=MAXIMUM_TIME, limit=1, version=22
+        )
+        assert streams.filters == []
+
+
     ##########################################################################
     ## rows tests
     ##########################################################################
@@ -1764,6 +1921,209 @@ class TestStreamSet(object):
         ]
 
 
+    ##########################################################################
+    ## insert tests
+    ##########################################################################
+
+    def test_insert_dict(self):
+        """
+        Assert insert sends data for each stream and returns versions
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(side_effect=lambda uu, values, policy: {uu1: 11, uu2: 22}[uu])
+        conn = BTrDB(endpoint)
+        streams = StreamSet([Stream(conn, uu1), Stream(conn, uu2)])
+
+        versions = streams.insert({uu1: [(1, 1.0)], str(uu2): [(2, 2.0)]})
+        assert versions == {uu1: 11, uu2: 22}
+        assert sorted(endpoint.insert.call_args_list) == sorted([
+            call(uu1, [(1, 1.0)], "never"), call(uu2, [(2, 2.0)], "never"),
+        ])
+
+    def test_insert_list(self):
+        """
+        Assert insert accepts a list of data aligned with the streams
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(return_value=5)
+        conn = BTrDB(endpoint)
+        streams = StreamSet([Stream(conn, uu1), Stream(conn, uu2)])
+
+        assert streams.insert([[(1, 1.0)], [(2, 2.0)]], merge="equal") == {uu1: 5, uu2: 5}
+        assert streams.insert([[[(1, 1.0)], [(2, 2.0)]], [[(3, 3.0)]]]) == {uu1: 5, uu2: 5}
+        endpoint.insert.assert_any_call(uu1, [(1, 1.0), (2, 2.0)], "never")
+        with pytest.raises(BTRDBValueError):
+            streams.insert([[(1, 1.0)]])
+
+    def test_insert_unknown_stream(self):
+        """
+        Assert insert raises if data is supplied for a stream not in the set
+        """
+        conn = BTrDB(Mock(Endpoint))
+        streams = StreamSet([Stream(conn, uuid.uuid4())])
+        with pytest.raises(BTRDBValueError):
+            streams.insert({uuid.uuid4(): [(1, 1.0)]})
+
+    def test_insert_dataframe(self):
+        """
+        Assert insert converts a wide DataFrame skipping missing values
+        """
+        pd = pytest.importorskip("pandas")
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(return_value=7)
+        conn = BTrDB(endpoint)
+        stream1 = Stream(conn, uu1, collection="fruits", tags={"name": "apple"})
+        stream2 = Stream(conn, uu2, collection="fruits", tags={"name": "orange"})
+        streams = StreamSet([stream1, stream2])
+
+        index = pd.to_datetime([1, 2, 3], unit="s")
+        df = pd.DataFrame({
+            str(uu1): [1.0, None, 3.0],
+            "fruits/orange": [4.0, 5.0, None],
+        }, index=index)
+
+        assert streams.insert(df) == {uu1: 7, uu2: 7}
+        assert sorted(endpoint.insert.call_args_list) == sorted([
+            call(uu1, [(1000000000, 1.0), (3000000000, 3.0)], "never"),
+            call(uu2, [(1000000000, 4.0), (2000000000, 5.0)], "never"),
+        ])
+
+        with pytest.raises(BTRDBValueError):
+            streams.insert(pd.DataFrame({"unknown": [1.0]}, index=[1]))
+
+
+    ##########################################################################
+    ## delete and flush tests
+    ##########################################################################
+
+    def test_delete(self):
+        """
+        Assert delete removes the range from each stream and returns versions
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.deleteRange = Mock(side_effect=lambda uu, start, end: {uu1: 11, uu2: 22}[uu])
+        conn = BTrDB(endpoint)
+        streams = StreamSet([Stream(conn, uu1), Stream(conn, uu2)])
+
+        assert streams.delete(10, 20) == {uu1: 11, uu2: 22}
+        assert sorted(endpoint.deleteRange.call_args_list) == sorted([
+            call(uu1, 10, 20), call(uu2, 10, 20),
+        ])
+
+        with pytest.raises(BTRDBValueError):
+            streams.delete(20, 10)
+
+    def test_delete_dry_run(self):
+        """
+        Assert a dry run counts the points in the range without deleting
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        conn = BTrDB(Mock(Endpoint))
+        stream1, stream2 = Stream(conn, uu1), Stream(conn, uu2)
+        stream1.count = Mock(return_value=5)
+        stream2.count = Mock(return_value=0)
+        streams = StreamSet([stream1, stream2])
+        streams.pin_versions({uu1: 3, uu2: 4})
+
+        assert streams.delete(10, 20, dry_run=True) == {uu1: 5, uu2: 0}
+        stream1.count.assert_called_once_with(10, 20, version=3)
+        assert not conn.ep.deleteRange.called
+
+    def test_flush(self):
+        """
+        Assert flush flushes each stream and returns versions
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.flush = Mock(side_effect=lambda uu: {uu1: 11, uu2: 22}[uu])
+        conn = BTrDB(endpoint)
+        streams = StreamSet([Stream(conn, uu1), Stream(conn, uu2)])
+
+        assert streams.flush() == {uu1: 11, uu2: 22}
+        assert sorted(endpoint.flush.call_args_list) == sorted([call(uu1), call(uu2)])
+        endpoint.streamInfo.assert_not_called()
+
+
+    ##########################################################################
+    ## update tests
+    ##########################################################################
+
+    def test_update(self):
+        """
+        Assert update applies the metadata to each stream
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.streamInfo = Mock(return_value=("koala", 43, {}, {}, None))
+        conn = BTrDB(endpoint)
+        streams = StreamSet([
+            Stream(conn, uu1, collection="koala", tags={"name": "a"}, annotations={}, property_version=42),
+            Stream(conn, uu2, collection="koala", tags={"name": "b"}, annotations={}, property_version=42),
+        ])
+
+        assert streams.update(annotations={"site": "north"}) == {uu1: 43, uu2: 43}
+        assert endpoint.setStreamAnnotations.call_count == 2
+        for uu in (uu1, uu2):
+            endpoint.setStreamAnnotations.assert_any_call(
+                uu=uu, expected=42, changes={"site": "north"}, removals=[]
+            )
+
+        with pytest.raises(BTRDBValueError):
+            streams.update()
+
+    def test_update_callable(self):
+        """
+        Assert callables compute the metadata of each stream
+        """
+        uu1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        uu2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+        endpoint = Mock(Endpoint)
+        endpoint.streamInfo = Mock(return_value=("koala", 43, {}, {}, None))
+        conn = BTrDB(endpoint)
+        streams = StreamSet([
+            Stream(conn, uu1, collection="koala", tags={"name": "a"}, property_version=42),
+            Stream(conn, uu2, collection="koala", tags={"name": "b"}, property_version=42),
+        ])
+
+        rename = lambda s: {"name": s.name.upper()} if s.name == "a" else None
+        assert streams.update(tags=rename) == {uu1: 43, uu2: 42}
+        endpoint.setStreamTags.assert_called_once_with(
+            uu=uu1, expected=42, tags={"name": "A"}, collection="koala"
+        )
+
+    def test_update_retries_on_version_mismatch(self):
+        """
+        Assert updates are retried with refreshed metadata on a conflict
+        """
+        uu = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+        endpoint = Mock(Endpoint)
+        endpoint.streamInfo = Mock(return_value=("koala", 50, {"name": "a"}, {}, None))
+        endpoint.setStreamTags = Mock(side_effect=[PropertyVersionMismatch("conflict"), None])
+        conn = BTrDB(endpoint)
+        streams = StreamSet([
+            Stream(conn, uu, collection="koala", tags={"name": "a"}, property_version=42),
+        ])
+
+        assert streams.update(collection="wombat") == {uu: 50}
+        assert [c[1]["expected"] for c in endpoint.setStreamTags.call_args_list] == [42, 50]
+
+        endpoint.setStreamTags = Mock(side_effect=PropertyVersionMismatch("conflict"))
+        with pytest.raises(PropertyVersionMismatch):
+            streams.update(collection="wombat", retries=2)
+        assert endpoint.setStreamTags.call_count == 3
+
+
 ##########################################################################
 ## StreamFilter Tests
 ##########################################################################
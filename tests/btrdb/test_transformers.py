@@ -16,12 +16,13 @@ Testing package for the btrdb stream module
 ##########################################################################
 
 import os
+import uuid
 from io import StringIO, BytesIO
 
 import pytest
 from unittest.mock import Mock, PropertyMock
 import numpy as np
-from pandas import Series, DataFrame, Index
+from pandas import Series, DataFrame, Index, Timestamp
 
 from btrdb.stream import Stream, StreamSet
 from btrdb.point import RawPoint, StatPoint
@@ -95,6 +96,21 @@ def statpoint_streamset():
     return obj
 
 
+@pytest.fixture
+def dask_streamset(streamset):
+    # mock streams that answer values queries by time range
+    values = streamset.values()
+    for idx, stream in enumerate(streamset._streams):
+        type(stream).uuid = PropertyMock(return_value=uuid.UUID(int=idx))
+        stream.values.side_effect = lambda start, end, version, points=values[idx], **kw: [
+            (p, version) for p in points if start <= p.time < end
+        ]
+
+    obj = StreamSet(streamset._streams)
+    obj.pin_versions({s.uuid: 5 for s in obj._streams})
+    return obj
+
+
 expected = {
     "to_dict": [
         {'time': 1500000000000000000, 'test/stream0': None, 'test/stream1': 1.0, 'test/stream2': 1.0, 'test/stream3': 1.0},
@@ -180,6 +196,53 @@ class TestTransformers(object):
         ]
         assert to_dict(statpoint_streamset, agg='all') == expected
 
+    ##########################################################################
+    ## to_dask Tests
+    ##########################################################################
+
+    def test_to_dask(self, dask_streamset):
+        """
+        assert to_dask partitions the time range with known divisions
+        """
+        pytest.importorskip("dask.dataframe")
+        streams = dask_streamset.filter(start=1500000000000000000, end=1500000001000000000)
+        ddf = streams.to_dask(partition_freq="250ms")
+
+        assert ddf.npartitions == 4
+        assert ddf.known_divisions
+        assert ddf.divisions[0] == Timestamp(1500000000000000000)
+        assert ddf.divisions[-1] == Timestamp(1500000000999999999)
+
+        columns = ["time", "test/stream0", "test/stream1", "test/stream2", "test/stream3"]
+        df = DataFrame(expected["to_dict"], columns=columns).set_index("time")
+        df.index = Index(df.index, dtype="datetime64[ns]", name="time")
+        assert ddf.compute(scheduler="sync").equals(df.astype("float64"))
+
+        for stream in dask_streamset._streams:
+            assert stream.values.call_count == 4
+            assert all(call[1]["version"] == 5 for call in stream.values.call_args_list)
+
+    def test_to_dask_empty_partitions(self, dask_streamset):
+        """
+        assert to_dask returns empty frames for partitions without data
+        """
+        pytest.importorskip("dask.dataframe")
+        streams = dask_streamset.filter(start=1500000000000000000, end=1500000002000000000)
+        ddf = streams.to_dask(partition_freq=500000000, datetime64_index=False)
+
+        assert ddf.npartitions == 4
+        assert ddf.divisions[-1] == 1500000001999999999
+        assert len(ddf.get_partition(3).compute(scheduler="sync")) == 0
+        assert len(ddf.compute(scheduler="sync")) == 10
+
+    def test_to_dask_raises_on_agg_all(self, statpoint_streamset):
+        """
+        asserts to_dask raises error if using "all" as agg.
+        """
+        pytest.importorskip("dask.dataframe")
+        with pytest.raises(AttributeError):
+            statpoint_streamset.to_dask(agg="all")
+
     ##########################################################################
     ## to_array Tests
     ##########################################################################
@@ -0,0 +1,185 @@
+# tests.test_writer
+# Testing package for the btrdb writer module
+#
+# Author:   PingThings
+# Created:  Mon Oct 19 10:12:44 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_writer.py [] allen@pingthings.io $
+
+"""
+Testing package for the btrdb writer module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import uuid
+import threading
+import pytest
+from unittest.mock import Mock
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.writer import BufferedWriter
+from btrdb.exceptions import BTrDBError, InvalidOperation, BTRDBValueError
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+UU2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+
+
+@pytest.fixture
+def db():
+    endpoint = Mock(Endpoint)
+    endpoint.insert = Mock(return_value=42)
+    return BTrDB(endpoint)
+
+
+def inserted(db, uu):
+    """
+    Returns all points sent to the endpoint for the given uuid in order
+    """
+    return [
+        point
+        for args, _ in db.ep.insert.call_args_list if args[0] == uu
+        for point in args[1]
+    ]
+
+
+##########################################################################
+## BufferedWriter Tests
+##########################################################################
+
+class TestBufferedWriter(object):
+
+    def test_buffered_writer_from_btrdb(self, db):
+        """
+        Assert BTrDB.buffered_writer returns a configured writer
+        """
+        with db.buffered_writer(merge="replace", batch_size=10) as writer:
+            assert isinstance(writer, BufferedWriter)
+            assert writer.merge == "replace"
+            assert writer.batch_size == 10
+
+    def test_invalid_arguments(self, db):
+        """
+        Assert invalid batch sizes and buffer limits are rejected
+        """
+        with pytest.raises(BTRDBValueError):
+            BufferedWriter(db, batch_size=0)
+
+        with pytest.raises(BTRDBValueError):
+            BufferedWriter(db, batch_size=10, max_buffered=5)
+
+    def test_coalesces_points_per_stream(self, db):
+        """
+        Assert small writes are coalesced into a single insert per stream
+        """
+        writer = BufferedWriter(db, batch_size=100, max_age=None)
+        for i in range(10):
+            writer.insert(UU1, [(i, float(i))])
+            writer.insert(str(UU2), [(i, float(i) * 2)])
+
+        db.ep.insert.assert_not_called()
+        versions = writer.flush()
+
+        assert db.ep.insert.call_count == 2
+        assert inserted(db, UU1) == [(i, float(i)) for i in range(10)]
+        assert inserted(db, UU2) == [(i, float(i) * 2) for i in range(10)]
+        assert versions == {UU1: 42, UU2: 42}
+        writer.close()
+
+    def test_accepts_stream_objects(self, db):
+        """
+        Assert points may be buffered using a Stream object
+        """
+        stream = db.stream_from_uuid(UU1)
+        with BufferedWriter(db, max_age=None) as writer:
+            writer.insert(stream, [(1, 1.0)])
+
+        assert inserted(db, UU1) == [(1, 1.0)]
+
+    def test_flushes_on_batch_size(self, db):
+        """
+        Assert a full buffer is sent in batch sized pieces preserving order
+        """
+        writer = BufferedWriter(db, batch_size=10, max_age=None)
+        data = [(i, float(i)) for i in range(25)]
+        writer.insert(UU1, data)
+        writer.flush()
+
+        sizes = [len(args[1]) for args, _ in db.ep.insert.call_args_list]
+        assert sizes == [10, 10, 5]
+        assert inserted(db, UU1) == data
+        writer.close()
+
+    def test_flushes_on_age(self, db):
+        """
+        Assert buffered points are sent once they exceed max_age
+        """
+        writer = BufferedWriter(db, batch_size=100, max_age=0.05)
+        writer.insert(UU1, [(1, 1.0)])
+
+        deadline = time.monotonic() + 5
+        while writer.buffered and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert inserted(db, UU1) == [(1, 1.0)]
+        assert writer.buffered == 0
+        writer.close()
+
+    def test_backpressure(self, db):
+        """
+        Assert insert blocks while the buffer limit is reached
+        """
+        release = threading.Event()
+        db.ep.insert = Mock(side_effect=lambda *args: release.wait() and 1)
+
+        writer = BufferedWriter(db, batch_size=10, max_buffered=10, max_age=None)
+        writer.insert(UU1, [(i, 1.0) for i in range(10)])
+
+        blocked = threading.Thread(target=writer.insert, args=(UU2, [(1, 1.0)]))
+        blocked.start()
+        blocked.join(0.1)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(5)
+        assert not blocked.is_alive()
+        writer.close()
+        assert db.ep.insert.call_count == 2
+
+    def test_errors_raised_on_flush(self, db):
+        """
+        Assert background insert errors are re-raised by flush
+        """
+        db.ep.insert = Mock(side_effect=BTrDBError("boom"))
+        writer = BufferedWriter(db, max_age=None)
+        writer.insert(UU1, [(1, 1.0)])
+
+        with pytest.raises(BTrDBError, match="boom"):
+            writer.flush()
+
+        # errors are only reported once
+        writer.flush()
+        writer.close()
+
+    def test_insert_after_close(self, db):
+        """
+        Assert inserting into a closed writer raises InvalidOperation
+        """
+        writer = BufferedWriter(db, max_age=None)
+        writer.insert(UU1, [(1, 1.0)])
+        writer.close()
+        writer.close()
+
+        assert inserted(db, UU1) == [(1, 1.0)]
+        with pytest.raises(InvalidOperation):
+            writer.insert(UU1, [(2, 1.0)])
@@ -0,0 +1,219 @@
+# tests.utils.test_fake
+# Testing for the btrdb.utils.fake module
+#
+# Author:   PingThings
+# Created:  Sat Oct 31 10:17:42 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_fake.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.fake module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import uuid
+
+import pytest
+
+from btrdb.point import RawPoint, StatPoint
+from btrdb.exceptions import StreamNotFoundError, StreamExists, PropertyVersionMismatch
+from btrdb.utils.fake import FakeServer, INITIAL_VERSION
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+POINTS = [(t, float(t)) for t in range(100, 200)]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeServer(chunk_size=30) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def db(server):
+    return server.connect()
+
+
+@pytest.fixture
+def stream(server, db):
+    uu = server.add_stream("sensors/fake", tags={"name": "voltage", "unit": "V"}, points=POINTS)
+    return db.stream_from_uuid(uu)
+
+
+##########################################################################
+## Query Tests
+##########################################################################
+
+class TestFakeQueries(object):
+
+    def test_values(self, server, stream):
+        """
+        Assert raw values are returned in chunks of chunk_size points
+        """
+        ep = stream.btrdb.ep
+        messages = list(ep.rawValues(stream.uuid, 110, 190, 0))
+        assert [len(points) for points, _ in messages] == [30, 30, 20]
+        assert messages[0][1] == INITIAL_VERSION + 1
+
+        points = stream.values(110, 190)
+        assert [p.time for p, _ in points] == list(range(110, 190))
+        assert points[0][0] == RawPoint(110, 110.0)
+
+    def test_aligned_windows(self, stream):
+        """
+        Assert aligned windows summarize the points in each window
+        """
+        windows = stream.aligned_windows(96, 160, 4)
+        assert [w.time for w, _ in windows] == [96, 112, 128, 144]
+        first = windows[0][0]
+        assert first == StatPoint(96, 100.0, 105.5, 111.0, 12, first.stddev)
+        assert first.stddev == pytest.approx(3.452052529534663)
+
+    def test_windows(self, stream):
+        """
+        Assert windows that do not fit before the end are omitted
+        """
+        windows = stream.windows(150, 185, 10)
+        assert [(w.time, w.count, w.mean) for w, _ in windows] == [
+            (150, 10, 154.5), (160, 10, 164.5), (170, 10, 174.5),
+        ]
+
+    def test_nearest(self, stream):
+        """
+        Assert nearest searches forward and backward
+        """
+        assert stream.nearest(150, 0)[0] == RawPoint(150, 150.0)
+        assert stream.nearest(150, 0, backward=True)[0] == RawPoint(149, 149.0)
+        assert stream.nearest(500, 0) is None
+
+    def test_not_found(self, db):
+        """
+        Assert unknown streams raise StreamNotFoundError
+        """
+        missing = db.stream_from_uuid(uuid.uuid4())
+        assert not missing.exists()
+        with pytest.raises(StreamNotFoundError):
+            missing.values(0, 10)
+
+
+##########################################################################
+## Write Tests
+##########################################################################
+
+class TestFakeWrites(object):
+
+    def test_versions(self, stream):
+        """
+        Assert inserts and deletes create versions that remain queryable
+        """
+        version = stream.version()
+        new = stream.insert([(50, 1.0), (150, -1.0)], merge="replace")
+        assert new == version + 1
+
+        assert stream.values(0, 300, version=version)[0][0] == RawPoint(100, 100.0)
+        latest = [p for p, _ in stream.values(0, 300)]
+        assert latest[0] == RawPoint(50, 1.0)
+        assert RawPoint(150, -1.0) in latest and RawPoint(150, 150.0) not in latest
+
+        assert stream.delete(0, 120) == new + 1
+        assert stream.earliest()[0].time == 120
+
+        ranges = list(stream.btrdb.ep.changes(stream.uuid, version, 0, 0))
+        assert [(r.start, r.end) for r in ranges[0][0]] == [(0, 151)]
+
+    def test_merge_policies(self, server, db):
+        """
+        Assert retain keeps and never duplicates existing points
+        """
+        uu = server.add_stream("sensors/fake", points=[(1, 1.0)])
+        stream = db.stream_from_uuid(uu)
+        stream.insert([(1, 2.0)], merge="retain")
+        assert [p.value for p, _ in stream.values(0, 10)] == [1.0]
+        stream.insert([(1, 2.0)], merge="never")
+        assert [p.value for p, _ in stream.values(0, 10)] == [1.0, 2.0]
+
+
+##########################################################################
+## Metadata Tests
+##########################################################################
+
+class TestFakeMetadata(object):
+
+    def test_create_and_update(self, db):
+        """
+        Assert created streams have metadata that can be updated
+        """
+        uu = uuid.uuid4()
+        db.create(uu, "sensors/meta", tags={"name": "current"}, annotations={"owner": "ops"})
+        with pytest.raises(StreamExists):
+            db.create(uu, "sensors/meta")
+
+        stream = db.stream_from_uuid(uu)
+        assert stream.exists()
+        assert stream.annotations()[0] == {"owner": "ops"}
+        stream.update(annotations={"site": "north"})
+        assert stream.annotations(refresh=True) == ({"owner": "ops", "site": "north"}, 1)
+
+        stale = db.stream_from_uuid(uu)
+        stale._property_version = 0
+        stale._tags, stale._collection, stale._known_to_exist = {"name": "current"}, "sensors/meta", True
+        with pytest.raises(PropertyVersionMismatch):
+            stale.update(tags={"name": "other"})
+
+    def test_lookup(self, server, db):
+        """
+        Assert streams are looked up by collection and tags
+        """
+        uu = server.add_stream("lookup/a", tags={"name": "one"})
+        server.add_stream("lookup/b", tags={"name": "two"})
+
+        assert "lookup/a" in db.list_collections("lookup")
+        assert [s.uuid for s in db.streams("lookup/a/one")] == [uu]
+        assert len(db.streams_in_collection("lookup", is_collection_prefix=True)) == 2
+        assert len(db.streams_in_collection("lookup", is_collection_prefix=False)) == 0
+
+    def test_sql(self, server, db):
+        """
+        Assert the SQL subset filters streams
+        """
+        uu = server.add_stream("sql/test", tags={"name": "sql_stream", "unit": "A"})
+        rows = db.query("select uuid, unit from streams where collection = $1", ["sql/test"])
+        assert rows == [{"uuid": str(uu), "unit": "A"}]
+
+        rows = db.query("SELECT name FROM streams WHERE name LIKE 'sql%' AND unit = 'A' LIMIT 5")
+        assert rows == [{"name": "sql_stream"}]
+
+
+##########################################################################
+## Server Tests
+##########################################################################
+
+def test_latency():
+    """
+    Assert calls are delayed by the configured latency
+    """
+    with FakeServer(latency=0.05) as server:
+        db = server.connect()
+        started = time.perf_counter()
+        db.info()
+        assert time.perf_counter() - started >= 0.05
+        assert server.servicer.calls["Info"] == 1
+
+
+def test_connect_options(server):
+    """
+    Assert connection options such as max_concurrency are passed through
+    """
+    with server.connect(max_concurrency=2, timeout=5) as db:
+        assert db.max_concurrency == 2
+        assert db.ep.timeout == 5
+        db.info()
@@ -0,0 +1,203 @@
+# tests.utils.test_limiter
+# Testing for the btrdb.utils.limiter module
+#
+# Author:   PingThings
+# Created:  Tue Oct 27 09:41:26 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_limiter.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.limiter module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import uuid
+import pickle
+import threading
+import pytest
+from unittest.mock import Mock
+
+from btrdb.endpoint import Endpoint
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.utils.limiter import Limiter, TokenBucket
+from btrdb.exceptions import BTRDBValueError
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+
+
+def raw(*times):
+    return btrdb_pb2.RawValuesResponse(
+        versionMajor=1,
+        values=[btrdb_pb2.RawPoint(time=t, value=float(t)) for t in times],
+    )
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = Endpoint(Mock())
+    endpoint.stub = Mock()
+    return endpoint
+
+
+##########################################################################
+## Token Bucket Tests
+##########################################################################
+
+class TestTokenBucket(object):
+
+    def test_overdraw_delay(self):
+        """
+        Assert an overdrawn bucket reports the time until it is repaid
+        """
+        bucket = TokenBucket(100, burst=1)
+        now = bucket.updated
+        assert bucket.delay(now) == 0
+
+        bucket.consume(150)
+        assert bucket.delay(now) == pytest.approx(0.5)
+        assert bucket.delay(now + 0.5) == pytest.approx(0, abs=1e-9)
+
+    def test_refill_is_capped(self):
+        bucket = TokenBucket(10, burst=2)
+        bucket.refill(bucket.updated + 100)
+        assert bucket.tokens == 20
+
+    def test_invalid_rate(self):
+        with pytest.raises(BTRDBValueError):
+            TokenBucket(0)
+
+
+##########################################################################
+## Limiter Tests
+##########################################################################
+
+class TestLimiter(object):
+
+    def test_invalid_arguments(self):
+        with pytest.raises(BTRDBValueError):
+            Limiter(max_concurrency=0)
+        with pytest.raises(BTRDBValueError):
+            Limiter(burst=0)
+
+    def test_max_concurrency(self):
+        """
+        Assert no more than max_concurrency calls run at once
+        """
+        limiter = Limiter(max_concurrency=2)
+        lock, active, peak = threading.Lock(), [0], [0]
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = limiter.stats()
+        assert peak[0] == 2
+        assert stats["admitted"] == 6
+        assert stats["queued"] >= 3
+        assert stats["max_wait"] > 0.01
+        assert stats["in_flight"] == 0
+
+    def test_write_budget(self):
+        """
+        Assert writes wait once the points budget is overdrawn
+        """
+        limiter = Limiter(write_points=1000)
+        limiter.call(lambda: None, "write", points=1100)
+
+        started = time.monotonic()
+        limiter.call(lambda: None, "write", points=10)
+        assert time.monotonic() - started >= 0.09
+        assert limiter.stats()["queued"] == 1
+
+    def test_pickle(self):
+        """
+        Assert limiters are picklable without their state
+        """
+        limiter = Limiter(max_concurrency=3, read_points=10)
+        limiter.call(lambda: None)
+        restored = pickle.loads(pickle.dumps(limiter))
+        assert restored.max_concurrency == 3
+        assert restored.stats()["admitted"] == 1
+        assert restored.call(lambda: 5) == 5
+
+
+##########################################################################
+## Endpoint Tests
+##########################################################################
+
+class TestEndpointLimits(object):
+
+    def test_reads_are_charged(self, endpoint):
+        """
+        Assert streaming reads charge the read budgets per response
+        """
+        endpoint.limiter = Limiter(read_points=100, read_bytes=1000)
+        endpoint.stub.RawValues.return_value = iter([raw(1, 2), raw(3)])
+
+        results = list(endpoint.rawValues(UU, 0, 10))
+        assert [len(values) for values, _ in results] == [2, 1]
+
+        points, nbytes = endpoint.limiter._buckets["read"]
+        assert points.tokens == pytest.approx(97, abs=0.5)
+        assert nbytes.tokens < 1000 - raw(1, 2).ByteSize()
+        assert endpoint.limiter.stats()["admitted"] == 3
+
+    def test_open_reads_do_not_hold_slots(self, endpoint):
+        """
+        Assert interleaved reads do not deadlock with a single slot
+        """
+        endpoint.limiter = Limiter(max_concurrency=1)
+        endpoint.stub.RawValues.side_effect = lambda *args, **kwargs: iter([raw(1), raw(2)])
+
+        first, second = endpoint.rawValues(UU, 0, 10), endpoint.rawValues(UU, 0, 10)
+        assert next(first)[0][0].time == 1
+        assert next(second)[0][0].time == 1
+        assert next(first)[0][0].time == 2
+
+    def test_inserts_are_charged(self, endpoint):
+        """
+        Assert inserts charge the write budgets before they are sent
+        """
+        endpoint.limiter = Limiter(write_points=100, write_bytes=1000)
+        endpoint.stub.Insert.return_value = btrdb_pb2.InsertResponse(versionMajor=2)
+
+        assert endpoint.insert(UU, [(1, 1.0), (2, 2.0)], "never") == 2
+        points, nbytes = endpoint.limiter._buckets["write"]
+        assert points.tokens == pytest.approx(98, abs=0.5)
+        assert nbytes.tokens < 1000 - 20
+
+    def test_metadata_queries_are_admitted(self, endpoint):
+        """
+        Assert SQL queries and collection listings are admitted by the limiter
+        """
+        endpoint.limiter = Limiter(max_concurrency=1)
+        endpoint.stub.SQLQuery.return_value = iter([btrdb_pb2.SQLQueryResponse(SQLQueryRow=[b"{}"])])
+        endpoint.stub.ListCollections.return_value = iter([
+            btrdb_pb2.ListCollectionsResponse(collections=["foo"])
+        ])
+
+        assert list(endpoint.sql_query("select 1")) == [[b"{}"]]
+        assert list(endpoint.listCollections("f")) == [["foo"]]
+
+        # each response and the end of each call is admitted
+        assert endpoint.limiter.stats()["admitted"] == 4
@@ -0,0 +1,161 @@
+# tests.utils.test_mash
+# Testing for the btrdb.utils.mash module
+#
+# Author:   PingThings
+# Created:  Wed Oct 21 15:40:08 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_mash.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.mash module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+import grpc
+import pytest
+from unittest.mock import Mock
+
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.utils.mash import MashRouter, murmur3_32, WRONG_ENDPOINT
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+HALF = 1 << 31
+
+
+class Unavailable(grpc.RpcError):
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+
+def make_info(revision, members):
+    mash = btrdb_pb2.Mash(revision=revision)
+    for start, end, address in members:
+        member = mash.members.add(start=start, end=end, up=True, grpcEndpoints=address)
+        setattr(member, "in", True)
+    return btrdb_pb2.InfoResponse(mash=mash)
+
+
+def uuid_in(low, high):
+    """
+    Returns a UUID whose hash is in (low, high]
+    """
+    while True:
+        uu = uuid.uuid4()
+        if low < murmur3_32(uu.bytes) <= high:
+            return uu
+
+
+@pytest.fixture
+def router():
+    proxy = Mock()
+    proxy.Info = Mock(return_value=make_info(1, [
+        (-1, HALF, "node1:4410"), (HALF, (1 << 32) - 1, "node2:4410;node2b:4410"),
+    ]))
+    router = MashRouter(proxy, open_channel=Mock(side_effect=lambda addr: Mock(name=addr)))
+    for address, (channel, stub) in router._nodes.items():
+        stub.Flush = Mock(return_value=btrdb_pb2.FlushResponse(versionMajor=1))
+    return router
+
+
+##########################################################################
+## Hashing Tests
+##########################################################################
+
+def test_murmur3_32():
+    """
+    Assert the hash matches the reference MurmurHash3_x86_32 implementation
+    """
+    assert murmur3_32(b"") == 0
+    assert murmur3_32(b"", seed=1) == 0x514e28b7
+    assert murmur3_32(b"hello") == 0x248bfa47
+    assert murmur3_32(b"The quick brown fox jumps over the lazy dog") == 0x2e4ff723
+
+
+##########################################################################
+## MashRouter Tests
+##########################################################################
+
+class TestMashRouter(object):
+
+    def test_builds_node_channels(self, router):
+        """
+        Assert a channel is opened to the first endpoint of each member
+        """
+        assert sorted(router._nodes) == ["node1:4410", "node2:4410"]
+        assert router.revision == 1
+
+    def test_routes_by_uuid(self, router):
+        """
+        Assert per-stream calls go to the owning node and others to the proxy
+        """
+        uu1, uu2 = uuid_in(-1, HALF), uuid_in(HALF, (1 << 32) - 1)
+        node1, node2 = router._nodes["node1:4410"][1], router._nodes["node2:4410"][1]
+
+        router.Flush(btrdb_pb2.FlushParams(uuid=uu1.bytes))
+        router.Flush(btrdb_pb2.FlushParams(uuid=uu2.bytes))
+        assert node1.Flush.call_count == 1
+        assert node2.Flush.call_count == 1
+        assert not router.proxy.Flush.called
+
+        router.ListCollections(btrdb_pb2.ListCollectionsParams(prefix="a"))
+        assert router.proxy.ListCollections.called
+
+    def test_fallback_on_unavailable(self, router):
+        """
+        Assert calls fall back to the proxy and refresh the map on failure
+        """
+        node1 = router._nodes["node1:4410"][1]
+        node1.Flush = Mock(side_effect=Unavailable())
+        router.proxy.Info.return_value = make_info(2, [(-1, (1 << 32) - 1, "node2:4410")])
+
+        router.Flush(btrdb_pb2.FlushParams(uuid=uuid_in(-1, HALF).bytes))
+        assert router.proxy.Flush.call_count == 1
+        assert router.revision == 2
+        assert sorted(router._nodes) == ["node2:4410"]
+
+    def test_fallback_on_wrong_endpoint(self, router):
+        """
+        Assert calls fall back to the proxy if the node does not own the stream
+        """
+        node1 = router._nodes["node1:4410"][1]
+        node1.Flush = Mock(return_value=btrdb_pb2.FlushResponse(stat=btrdb_pb2.Status(code=WRONG_ENDPOINT)))
+
+        router.Flush(btrdb_pb2.FlushParams(uuid=uuid_in(-1, HALF).bytes))
+        assert router.proxy.Flush.call_count == 1
+        assert router.proxy.Info.call_count == 2
+
+    def test_streaming_wrong_endpoint(self, router):
+        """
+        Assert streaming calls check the first response before returning
+        """
+        node1 = router._nodes["node1:4410"][1]
+        responses = Mock()
+        responses.__next__ = Mock(return_value=btrdb_pb2.RawValuesResponse(
+            stat=btrdb_pb2.Status(code=WRONG_ENDPOINT)
+        ))
+        node1.RawValues = Mock(spec=grpc.UnaryStreamMultiCallable, return_value=responses)
+        router.proxy.RawValues = Mock(return_value=iter(["proxied"]))
+
+        result = router.RawValues(btrdb_pb2.RawValuesParams(uuid=uuid_in(-1, HALF).bytes))
+        assert list(result) == ["proxied"]
+        assert responses.cancel.called
+
+    def test_periodic_refresh(self, router):
+        """
+        Assert the map is refreshed after the refresh interval
+        """
+        router.refresh_interval = 0.0001
+        router._refreshed = 0
+        router.Flush(btrdb_pb2.FlushParams(uuid=uuid_in(-1, HALF).bytes))
+        assert router.proxy.Info.call_count == 2
+        assert sorted(router._nodes) == ["node1:4410", "node2:4410"]
@@ -0,0 +1,182 @@
+# tests.utils.test_metrics
+# Testing for the btrdb.utils.metrics module
+#
+# Author:   PingThings
+# Created:  Wed Oct 28 10:03:52 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_metrics.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.metrics module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+import pickle
+import urllib.request
+from concurrent import futures
+
+import grpc
+import pytest
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.grpcinterface import btrdb_pb2, btrdb_pb2_grpc
+from btrdb.exceptions import BTrDBError
+from btrdb.utils.metrics import InMemoryMetrics, PrometheusMetrics, RPCRecord
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+
+
+class Servicer(btrdb_pb2_grpc.BTrDBServicer):
+
+    def RawValues(self, request, context):
+        for start in range(0, 30, 10):
+            yield btrdb_pb2.RawValuesResponse(
+                versionMajor=3,
+                values=[btrdb_pb2.RawPoint(time=t, value=t) for t in range(start, start + 10)],
+            )
+
+    def Nearest(self, request, context):
+        return btrdb_pb2.NearestResponse(versionMajor=3, value=btrdb_pb2.RawPoint(time=1, value=2))
+
+    def Flush(self, request, context):
+        context.abort(grpc.StatusCode.UNAVAILABLE, "unavailable")
+
+
+@pytest.fixture(scope="module")
+def address():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    btrdb_pb2_grpc.add_BTrDBServicer_to_server(Servicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield "127.0.0.1:{}".format(port)
+    server.stop(None)
+
+
+@pytest.fixture
+def metrics():
+    return InMemoryMetrics()
+
+
+@pytest.fixture
+def db(address, metrics):
+    return BTrDB(Endpoint(grpc.insecure_channel(address), metrics=metrics))
+
+
+##########################################################################
+## Interceptor Tests
+##########################################################################
+
+class TestInterceptor(object):
+
+    def test_streaming_call(self, db, metrics):
+        """
+        Assert streaming calls record messages, points, bytes and decoding
+        """
+        points = db.stream_from_uuid(UU).values(0, 100)
+        assert len(points) == 30
+
+        record, = metrics.calls("RawValues")
+        assert record.code == "OK"
+        assert record.messages == 3
+        assert record.points == 30
+        assert record.bytes_sent > 0 and record.bytes_received > 0
+        assert 0 <= record.first_message <= record.latency
+
+        kind, decoded, seconds = metrics.decodes[0]
+        assert (kind, decoded) == ("RawPoint", 30)
+        assert seconds >= 0
+
+    def test_cancelled_call(self, db, metrics):
+        """
+        Assert a call closed early is recorded as cancelled
+        """
+        assert len(db.stream_from_uuid(UU).values(0, 100, limit=5)) == 5
+        record, = metrics.calls("RawValues")
+        assert record.code == "CANCELLED"
+        assert record.messages == 1
+
+    def test_unary_calls(self, db, metrics):
+        """
+        Assert unary calls record their status code
+        """
+        db.stream_from_uuid(UU).nearest(5, 0)
+        with pytest.raises(BTrDBError):
+            db.stream_from_uuid(UU).flush()
+
+        nearest, = metrics.calls("Nearest")
+        assert nearest.code == "OK"
+        assert nearest.first_message is None
+        assert nearest.messages == 1
+
+        flush, = metrics.calls("Flush")
+        assert flush.code == "UNAVAILABLE"
+        assert flush.messages == 0
+
+    def test_channel_pool(self, address, metrics):
+        """
+        Assert every channel of a pool is instrumented
+        """
+        channels = [grpc.insecure_channel(address) for _ in range(2)]
+        db = BTrDB(Endpoint(channels, metrics=metrics))
+        for _ in range(2):
+            db.stream_from_uuid(UU).values(0, 100)
+        assert [r.code for r in metrics.calls("RawValues")] == ["OK", "OK"]
+
+
+##########################################################################
+## Prometheus Tests
+##########################################################################
+
+class TestPrometheusMetrics(object):
+
+    def test_expose(self):
+        """
+        Assert metrics are exposed in the Prometheus text format
+        """
+        metrics = PrometheusMetrics()
+        metrics.observe_rpc(RPCRecord("RawValues", "OK", 0.02, 0.004, 3, 30, 20, 900))
+        metrics.observe_rpc(RPCRecord("RawValues", "UNAVAILABLE", 0.5, None, 0, 0, 20, 0))
+        metrics.observe_decode("RawPoint", 30, 0.25)
+
+        text = metrics.expose()
+        assert "# TYPE btrdb_rpc_total counter" in text
+        assert 'btrdb_rpc_total{method="RawValues",code="OK"} 1' in text
+        assert 'btrdb_rpc_points_total{method="RawValues"} 30' in text
+        assert 'btrdb_decoded_points_total{kind="RawPoint"} 30' in text
+        assert "# TYPE btrdb_rpc_latency_seconds histogram" in text
+        assert 'btrdb_rpc_latency_seconds_bucket{method="RawValues",le="0.025"} 1' in text
+        assert 'btrdb_rpc_latency_seconds_bucket{method="RawValues",le="+Inf"} 2' in text
+        assert 'btrdb_rpc_latency_seconds_count{method="RawValues"} 2' in text
+        assert 'btrdb_rpc_first_message_seconds_count{method="RawValues"} 1' in text
+
+    def test_serve(self):
+        """
+        Assert the metrics are served over HTTP
+        """
+        metrics = PrometheusMetrics(prefix="test")
+        metrics.observe_decode("StatPoint", 4, 0.5)
+        server = metrics.serve(port=0, addr="127.0.0.1")
+        try:
+            url = "http://127.0.0.1:{}/metrics".format(server.server_address[1])
+            body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+        finally:
+            server.shutdown()
+        assert 'test_decode_seconds_total{kind="StatPoint"} 0.5' in body
+
+    def test_pickle(self):
+        metrics = PrometheusMetrics()
+        metrics.observe_rpc(RPCRecord("Nearest", "OK", 0.01, None, 1, 0, 10, 10))
+        restored = pickle.loads(pickle.dumps(metrics))
+        restored.observe_rpc(RPCRecord("Insert", "OK", 0.01, None, 1, 0, 10, 10))
+        assert 'btrdb_rpc_total{method="Nearest",code="OK"} 1' in restored.expose()
@@ -0,0 +1,141 @@
+# tests.utils.test_parallel
+# Testing for the btrdb.utils.parallel module
+#
+# Author:   PingThings
+# Created:  Mon Oct 26 10:21:53 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_parallel.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.parallel module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+import pytest
+from unittest.mock import Mock
+from concurrent.futures import ThreadPoolExecutor
+
+np = pytest.importorskip("numpy")
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.stream import Stream, StreamSet
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.exceptions import BTRDBValueError
+from btrdb.utils.parallel import (
+    ProcessQueryEngine, fetch_array, to_shared, from_shared, shards, shared_memory,
+)
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+def raw_values(uu, start, end, version=0):
+    """
+    Returns a point at every multiple of 10ns in [start, end) in two messages
+    """
+    times = range(start + -start % 10, end, 10)
+    points = [btrdb_pb2.RawPoint(time=t, value=t / 10) for t in times]
+    half = len(points) // 2
+    return iter([(points[:half], 3), (points[half:], 3)])
+
+
+@pytest.fixture
+def streams():
+    endpoint = Mock(Endpoint)
+    endpoint.rawValues = Mock(side_effect=raw_values)
+    db = BTrDB(endpoint)
+    streams = StreamSet([Stream(db, uuid.uuid4()), Stream(db, uuid.uuid4())])
+    streams.pin_versions({s.uuid: 3 for s in streams})
+    return streams
+
+
+##########################################################################
+## Task Tests
+##########################################################################
+
+class TestTasks(object):
+
+    def test_fetch_raw_values(self, streams):
+        """
+        Assert raw values are decoded into a structured array
+        """
+        arr = fetch_array(streams[0], 0, 50, 3)
+        assert arr.dtype.names == ("time", "value")
+        assert arr["time"].tolist() == [0, 10, 20, 30, 40]
+        assert arr["value"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    def test_fetch_aligned_windows(self):
+        """
+        Assert windows are decoded into an array of StatPoint fields
+        """
+        endpoint = Mock(Endpoint)
+        endpoint.alignedWindows.return_value = [
+            ([btrdb_pb2.StatPoint(time=16, min=1, mean=2, max=3, count=4, stddev=0.5)], 3),
+        ]
+        stream = Stream(BTrDB(endpoint), uuid.uuid4())
+
+        arr = fetch_array(stream, 0, 64, 3, ("aligned_windows", 4))
+        assert arr.dtype.names == ("time", "min", "mean", "max", "count", "stddev")
+        assert arr[0].tolist() == (16, 1.0, 2.0, 3.0, 4, 0.5)
+        endpoint.alignedWindows.assert_called_once_with(stream.uuid, 0, 64, 4, 3)
+
+    def test_shared_memory_round_trip(self):
+        """
+        Assert arrays are passed through shared memory and released
+        """
+        arr = np.arange(10, dtype=np.float64)
+        handle = to_shared(arr)
+        assert np.array_equal(from_shared(handle), arr)
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle[0])
+
+        empty = from_shared(to_shared(np.empty(0, dtype=[("time", "i8")])))
+        assert len(empty) == 0
+
+    def test_shards(self):
+        """
+        Assert time ranges are split at aligned boundaries
+        """
+        assert shards(0, 100, 1) == [(0, 100)]
+        assert shards(0, 100, 4) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+        assert shards(0, 100, 3, align=16) == [(0, 48), (48, 96), (96, 100)]
+        assert shards(0, 10, 4, align=16) == [(0, 10)]
+
+
+##########################################################################
+## Engine Tests
+##########################################################################
+
+class TestProcessQueryEngine(object):
+
+    def test_invalid_shards(self):
+        with pytest.raises(BTRDBValueError):
+            ProcessQueryEngine(shards=0)
+
+    def test_run_with_shards(self, streams):
+        """
+        Assert sharded results are concatenated per stream
+        """
+        streams = streams.filter(start=100, end=200)
+        with ThreadPoolExecutor(2) as executor:
+            engine = ProcessQueryEngine(shards=4, executor=executor)
+            arrays = streams.arrays(engine=engine, transform=lambda arr: arr[arr["value"] >= 12])
+
+        assert len(arrays) == 2
+        assert arrays[0]["time"].tolist() == list(range(120, 200, 10))
+        assert streams[0]._btrdb.ep.rawValues.call_count == 8
+
+    def test_arrays_without_engine(self, streams):
+        """
+        Assert arrays fetches each stream in this process
+        """
+        arrays = streams.filter(start=10, end=40).arrays()
+        assert [arr["time"].tolist() for arr in arrays] == [[10, 20, 30], [10, 20, 30]]
@@ -0,0 +1,270 @@
+# tests.utils.test_pool
+# Testing for the btrdb.utils.pool module
+#
+# Author:   PingThings
+# Created:  Wed Oct 21 10:12:37 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_pool.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.pool module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import grpc
+import pytest
+from unittest.mock import Mock, patch
+
+from btrdb import _connect
+from btrdb.conn import Connection
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.endpoint import Endpoint
+from btrdb.utils.pool import ChannelPool
+from btrdb.utils.fake import FakeServer
+from btrdb.exceptions import BTRDBValueError
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+# the details of gRPC's error for a channel that could not connect
+NOT_SENT = (
+    "failed to connect to all addresses; last error: UNKNOWN: ipv4:127.0.0.1:1: "
+    "Failed to connect to remote host: Connection refused"
+)
+
+
+class Unavailable(grpc.RpcError):
+
+    def __init__(self, details="Socket closed"):
+        self._details = details
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return self._details
+
+
+def make_pool(size, balancing="round_robin"):
+    """
+    Returns a pool whose stubs are mocks that record the index of the stub
+    """
+    channels = [grpc.insecure_channel("localhost:4410") for _ in range(size)]
+    pool = ChannelPool(channels, balancing)
+    for idx, stub in enumerate(pool.stubs):
+        stub.Info = Mock(spec=grpc.UnaryUnaryMultiCallable, return_value=idx)
+        stub.RawValues = Mock(
+            spec=grpc.UnaryStreamMultiCallable, side_effect=lambda params, idx=idx: iter([idx, idx])
+        )
+    return pool
+
+
+##########################################################################
+## ChannelPool Tests
+##########################################################################
+
+class TestChannelPool(object):
+
+    def test_invalid_arguments(self):
+        """
+        Assert unknown balancing policies and empty pools are rejected
+        """
+        with pytest.raises(BTRDBValueError):
+            ChannelPool([grpc.insecure_channel("localhost:4410")], "random")
+
+        with pytest.raises(BTRDBValueError):
+            ChannelPool([])
+
+    def test_round_robin(self):
+        """
+        Assert calls are sent to each channel in turn
+        """
+        pool = make_pool(3)
+        assert [pool.Info(None) for _ in range(6)] == [0, 1, 2, 0, 1, 2]
+        assert pool.outstanding == [0, 0, 0]
+
+    def test_least_outstanding(self):
+        """
+        Assert calls are sent to the channel with the fewest calls in flight
+        """
+        pool = make_pool(3, "least_outstanding")
+
+        # streams are outstanding until they are consumed
+        first = pool.RawValues(None)
+        second = pool.RawValues(None)
+        assert pool.outstanding == [1, 1, 0]
+
+        assert pool.Info(None) == 2
+        assert pool.Info(None) == 2
+
+        assert list(first) == [0, 0]
+        assert pool.outstanding == [0, 1, 0]
+        assert pool.Info(None) in (0, 2)
+
+        # closing a stream early releases and cancels it
+        second.close()
+        assert pool.outstanding == [0, 0, 0]
+        second.close()
+        assert pool.outstanding == [0, 0, 0]
+
+    def test_release_on_error(self):
+        """
+        Assert failed calls do not remain outstanding
+        """
+        pool = make_pool(2, "least_outstanding")
+        pool.stubs[0].Info.side_effect = grpc.RpcError()
+        with pytest.raises(grpc.RpcError):
+            pool.Info(None)
+        assert pool.outstanding == [0, 0]
+
+
+    def test_failover_unary(self):
+        """
+        Assert unary calls are retried on another channel when unavailable
+        """
+        pool = make_pool(3)
+        pool.stubs[0].Info.side_effect = Unavailable()
+
+        assert pool.Info(None) == 1
+        assert pool.healthy == [1, 2]
+        assert pool.outstanding == [0, 0, 0]
+
+        # the unavailable channel is skipped until the cooldown has passed
+        assert sorted(pool.Info(None) for _ in range(4)) == [1, 1, 2, 2]
+
+        pool.down_until[0] = 0
+        pool.stubs[0].Info.side_effect = None
+        assert sorted(pool.Info(None) for _ in range(3)) == [0, 1, 2]
+
+    def test_no_failover_of_sent_writes(self):
+        """
+        Assert inserts are not sent again after the channel failed during
+        the call, but are when the channel could not connect
+        """
+        pool = make_pool(2)
+        for idx, stub in enumerate(pool.stubs):
+            stub.Insert = Mock(spec=grpc.UnaryUnaryMultiCallable, return_value=idx)
+        pool.stubs[0].Insert.side_effect = Unavailable()
+
+        with pytest.raises(Unavailable):
+            pool.Insert(None)
+        assert pool.stubs[1].Insert.call_count == 0
+        assert pool.healthy == [1]
+
+        pool.down_until[0] = 0
+        pool.stubs[0].Insert.side_effect = Unavailable(NOT_SENT)
+        assert [pool.Insert(None) for _ in range(2)] == [1, 1]
+
+    def test_failover_streaming(self):
+        """
+        Assert streaming calls fail over if the first response fails
+        """
+        pool = make_pool(2)
+
+        def unavailable(params):
+            yield from ()
+            raise Unavailable()
+
+        pool.stubs[0].RawValues.side_effect = unavailable
+        assert list(pool.RawValues(None)) == [1, 1]
+        assert pool.outstanding == [0, 0]
+        assert pool.healthy == [1]
+
+    def test_failover_exhausted(self):
+        """
+        Assert the error is raised when every channel is unavailable
+        """
+        pool = make_pool(2)
+        for stub in pool.stubs:
+            stub.Info.side_effect = Unavailable()
+
+        with pytest.raises(Unavailable):
+            pool.Info(None)
+        assert pool.healthy == []
+        assert all(stub.Info.call_count == 1 for stub in pool.stubs)
+
+
+##########################################################################
+## Integration Tests
+##########################################################################
+
+class TestPooledConnection(object):
+
+    def test_connection_pool_size(self):
+        """
+        Assert the connection opens a channel per pool slot
+        """
+        conn = Connection("localhost:4410", pool_size=3)
+        assert len(conn.channels) == 3
+        assert conn.channel is conn.channels[0]
+
+        with pytest.raises(ValueError):
+            Connection("localhost:4410", pool_size=0)
+
+    def test_connection_addresses(self):
+        """
+        Assert a channel is opened to each of several addresses
+        """
+        conn = Connection("proxy1:4410, proxy2:4410", pool_size=2)
+        assert conn.addresses == ["proxy1:4410", "proxy2:4410"]
+        assert len(conn.channels) == 4
+
+        assert conn.add_address("proxy3:4410")
+        assert not conn.add_address("proxy1:4410")
+        assert len(conn.channels) == 6
+
+        with pytest.raises(ValueError):
+            Connection("proxy1:4410,proxy2")
+
+    @patch("btrdb.Endpoint.info")
+    def test_discover_proxies(self, mock_info):
+        """
+        Assert proxies listed in the server info are added to the pool
+        """
+        mock_info.return_value = btrdb_pb2.InfoResponse(
+            proxy=btrdb_pb2.ProxyInfo(proxyEndpoints=["proxy1:4410", "proxy2:4410"])
+        )
+        db = _connect("proxy1:4410", discover_proxies=True)
+        assert isinstance(db.ep.stub, ChannelPool)
+        assert len(db.ep.stub) == 2
+
+    @patch("btrdb.Connection.warmup")
+    @patch("btrdb.Endpoint.info")
+    def test_discover_proxies_warmup(self, mock_info, mock_warmup):
+        """
+        Assert warming up discovered proxies drops those that are not ready
+        """
+        mock_info.return_value = btrdb_pb2.InfoResponse(
+            proxy=btrdb_pb2.ProxyInfo(proxyEndpoints=["proxy1:4410", "proxy2:4410"])
+        )
+        _connect("proxy1:4410", discover_proxies=True, warmup=2)
+        mock_warmup.assert_called_once_with(2, drop_unready=True)
+
+    def test_endpoint_uses_pool(self):
+        """
+        Assert endpoints created with several channels dispatch over a pool
+        """
+        conn = Connection("localhost:4410", pool_size=2)
+        endpoint = Endpoint(conn.channels, balancing="least_outstanding")
+        assert isinstance(endpoint.stub, ChannelPool)
+        assert len(endpoint.stub) == 2
+        assert endpoint.stub.balancing == "least_outstanding"
+
+    def test_insert_fails_over_from_unreachable_proxy(self):
+        """
+        Assert inserts are sent to a live proxy when another cannot connect
+        """
+        with FakeServer() as server:
+            uu = server.add_stream("pool/insert")
+            db = _connect("127.0.0.1:1,{}".format(server.address))
+            stream = db.stream_from_uuid(uu)
+            for t in range(4):
+                stream.insert([(t + 1, float(t))])
+            assert len(stream.values(0, 10)) == 4
+            db.close()
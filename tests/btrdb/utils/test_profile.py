@@ -0,0 +1,220 @@
+# tests.utils.test_profile
+# Testing for the btrdb.utils.profile module
+#
+# Author:   PingThings
+# Created:  Fri Oct 30 11:48:35 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_profile.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.profile module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import uuid
+from contextvars import copy_context
+from concurrent import futures
+
+import grpc
+import pytest
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.stream import StreamSet
+from btrdb.grpcinterface import btrdb_pb2, btrdb_pb2_grpc
+from btrdb.utils import profile
+from btrdb.utils.profile import QueryProfile
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+UU2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+
+
+class Servicer(btrdb_pb2_grpc.BTrDBServicer):
+
+    def StreamInfo(self, request, context):
+        return btrdb_pb2.StreamInfoResponse(
+            versionMajor=4,
+            descriptor=btrdb_pb2.StreamDescriptor(
+                uuid=request.uuid, collection="sensors", propertyVersion=1,
+                tags=[btrdb_pb2.KeyOptValue(key="name", val=btrdb_pb2.OptValue(value=b"current"))],
+            ),
+        )
+
+    def RawValues(self, request, context):
+        time.sleep(0.01)
+        for offset in (1, 6):
+            yield btrdb_pb2.RawValuesResponse(
+                versionMajor=4,
+                values=[btrdb_pb2.RawPoint(time=t, value=t) for t in range(offset, offset + 5)],
+            )
+
+
+@pytest.fixture(scope="module")
+def address():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    btrdb_pb2_grpc.add_BTrDBServicer_to_server(Servicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield "127.0.0.1:{}".format(port)
+    server.stop(None)
+
+
+@pytest.fixture
+def streams(address):
+    db = BTrDB(Endpoint(grpc.insecure_channel(address)))
+    streams = StreamSet([db.stream_from_uuid(UU), db.stream_from_uuid(UU2)])
+    for stream, name in zip(streams, ("voltage", "current")):
+        stream._collection = "sensors"
+        stream._tags = {"name": name}
+    streams.pin_versions({UU: 4, UU2: 4})
+    return streams.filter(start=1, end=100)
+
+
+##########################################################################
+## QueryProfile Tests
+##########################################################################
+
+class TestQueryProfile(object):
+
+    def test_exclusive_phases(self):
+        """
+        Assert time of nested phases is only counted for the inner phase
+        """
+        report = QueryProfile()
+        with report.phase("transform"):
+            time.sleep(0.02)
+            with report.phase("materialize"):
+                time.sleep(0.05)
+
+        assert 0.05 <= report.phases["materialize"] < 0.1
+        assert 0.02 <= report.phases["transform"] < 0.05
+
+    def test_record_query(self):
+        """
+        Assert queries are recorded per stream and removed from the phase
+        """
+        report = QueryProfile()
+        with report.phase("materialize"):
+            report.record_query(UU, 2, 10, 0.5, 0.25)
+            report.record_query(UU, 1, 5, 0.5, 0.25)
+
+        stream = report.streams[UU]
+        assert (stream.queries, stream.messages, stream.points) == (2, 3, 15)
+        assert report.phases["rpc_wait"] == 1.0
+        assert report.phases["decode"] == 0.5
+        assert report.phases["materialize"] < 0
+
+    def test_waiting(self):
+        """
+        Assert the time spent waiting for other threads is split across the
+        phases of their work
+        """
+        report = QueryProfile()
+
+        def work():
+            time.sleep(0.05)
+            report.record_query(UU, 1, 1, 0.04, 0.01)
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            with report.phase("materialize"):
+                with report.waiting():
+                    futures.wait([executor.submit(copy_context().run, work) for _ in range(4)])
+
+        assert report.streams[UU].rpc_wait == pytest.approx(0.16)
+        assert 0.04 <= report.phases["rpc_wait"] < 0.1
+        assert report.phases["rpc_wait"] == pytest.approx(report.phases["decode"] * 4)
+        assert report.phases["materialize"] < 0.01
+
+    def test_inactive(self):
+        """
+        Assert profile hooks do nothing outside of a profile
+        """
+        assert profile.active() is None
+        with profile.phase("align"):
+            pass
+
+        with profile.profile() as report:
+            assert profile.active() is report
+        assert profile.active() is None
+        assert report.elapsed > 0
+
+
+##########################################################################
+## StreamSet Profile Tests
+##########################################################################
+
+class TestStreamSetProfile(object):
+
+    def test_values(self, streams):
+        """
+        Assert values reports the RPCs, messages and points of each stream
+        """
+        with streams.profile() as report:
+            streams.values()
+
+        assert dict(report.rpcs) == {"RawValues": 2}
+        for uu in (UU, UU2):
+            assert report.streams[uu].to_dict()["points"] == 10
+            assert report.streams[uu].messages == 2
+            assert report.streams[uu].queries == 1
+
+        assert report.phases["rpc_wait"] > 0
+        assert report.phases["decode"] > 0
+        assert report.phases["align"] == 0
+
+    def test_rows_and_transform(self, streams):
+        """
+        Assert row alignment and transformation are reported separately and
+        the phases do not exceed the elapsed time
+        """
+        with streams.profile() as report:
+            streams.rows()
+            streams.to_dict()
+
+        assert dict(report.rpcs) == {"RawValues": 4}
+        assert report.phases["align"] > 0
+        assert report.phases["transform"] > 0
+        assert sum(report.to_dict()["phases"].values()) <= report.elapsed
+
+    def test_arrays(self, streams):
+        """
+        Assert queries run on the executor are recorded
+        """
+        pytest.importorskip("numpy")
+        streams[0].btrdb.max_concurrency = 4
+        with streams.profile() as report:
+            streams.arrays()
+
+        assert report.streams[UU].points == 10
+        assert report.streams[UU2].points == 10
+
+        # the executor threads' waits are not counted on top of the caller's
+        phases = report.to_dict()["phases"]
+        assert sum(phases.values()) <= report.elapsed
+        assert phases["rpc_wait"] > phases["materialize"]
+
+    def test_report(self, streams):
+        """
+        Assert the report names streams, fetching unknown metadata first, and
+        lists the phases
+        """
+        streams[1]._tags = None
+        with streams.profile() as report:
+            streams.values()
+
+        text = str(report)
+        assert "sensors/voltage" in text
+        assert "sensors/current" in text
+        assert "StreamInfo" not in text
+        assert "RawValues" in text
+        assert "row alignment" in text
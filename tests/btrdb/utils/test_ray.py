@@ -0,0 +1,100 @@
+# tests.utils.test_ray
+# Testing for the btrdb.utils.ray module
+#
+# Author:   PingThings
+# Created:  Mon Oct 26 14:02:11 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_ray.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.ray module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+import pytest
+from unittest.mock import Mock
+
+pytest.importorskip("ray.data")
+pytest.importorskip("pyarrow")
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.stream import Stream, StreamSet
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.utils.ray import BTrDBDatasource
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+def raw_values(uu, start, end, version=0):
+    """
+    Returns a point at every multiple of 10ns in [start, end)
+    """
+    times = range(start + -start % 10, end, 10)
+    return iter([([btrdb_pb2.RawPoint(time=t, value=t / 10) for t in times], version)])
+
+
+@pytest.fixture
+def streams():
+    endpoint = Mock(Endpoint)
+    endpoint.rawValues = Mock(side_effect=raw_values)
+    db = BTrDB(endpoint)
+    streams = StreamSet([Stream(db, uuid.uuid4()), Stream(db, uuid.uuid4())])
+    streams.pin_versions({s.uuid: 7 for s in streams})
+    return streams.filter(start=100, end=200)
+
+
+def read(task):
+    return list(task.read_fn())
+
+
+##########################################################################
+## Datasource Tests
+##########################################################################
+
+class TestBTrDBDatasource(object):
+
+    def test_read_tasks_by_stream_and_time(self, streams):
+        """
+        Assert the query is split into read tasks emitting arrow blocks
+        """
+        source = BTrDBDatasource(streams)
+        tasks = source.get_read_tasks(4)
+        assert len(tasks) == 4
+
+        blocks = [block for task in tasks for block in read(task)]
+        assert len(blocks) == 4
+        assert sum(block.num_rows for block in blocks) == 20
+        assert blocks[0].column_names == ["uuid", "time", "value"]
+
+        uuids = {str(s.uuid) for s in streams}
+        assert set(uu for block in blocks for uu in block.column("uuid").to_pylist()) == uuids
+
+    def test_pinned_versions(self, streams):
+        """
+        Assert the versions pinned on the streamset are read
+        """
+        for task in BTrDBDatasource(streams).get_read_tasks(1):
+            read(task)
+
+        endpoint = streams[0]._btrdb.ep
+        assert endpoint.rawValues.call_count == 2
+        assert all(call[0][3] == 7 for call in endpoint.rawValues.call_args_list)
+
+    def test_shards(self, streams):
+        """
+        Assert explicit shards are grouped into at most parallelism tasks
+        """
+        tasks = BTrDBDatasource(streams, shards=5).get_read_tasks(3)
+        assert len(tasks) == 3
+        assert sum(len(read(task)) for task in tasks) == 10
+
+    def test_empty_streamset(self):
+        assert BTrDBDatasource(StreamSet([])).get_read_tasks(4) == []
@@ -0,0 +1,201 @@
+# tests.utils.test_retry
+# Testing for the btrdb.utils.retry module
+#
+# Author:   PingThings
+# Created:  Thu Oct 22 09:17:44 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_retry.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.retry module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import time
+import uuid
+import grpc
+import pytest
+from unittest.mock import Mock
+
+from btrdb.endpoint import Endpoint
+from btrdb.grpcinterface import btrdb_pb2
+from btrdb.utils.retry import RetryPolicy
+from btrdb.exceptions import BTrDBError, BTRDBValueError
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+
+
+class RpcError(grpc.RpcError):
+
+    def __init__(self, code=grpc.StatusCode.UNAVAILABLE):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return str(self._code)
+
+
+def raw(times, version=7):
+    return btrdb_pb2.RawValuesResponse(
+        versionMajor=version,
+        values=[btrdb_pb2.RawPoint(time=t, value=float(t)) for t in times],
+    )
+
+
+def failing(*responses):
+    """
+    Returns a generator yielding responses and then failing as unavailable
+    """
+    def stream():
+        yield from responses
+        raise RpcError()
+    return stream()
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = Endpoint(Mock(), retry=RetryPolicy(initial_backoff=0))
+    endpoint.stub = Mock()
+    return endpoint
+
+
+##########################################################################
+## RetryPolicy Tests
+##########################################################################
+
+class TestRetryPolicy(object):
+
+    def test_invalid_arguments(self):
+        with pytest.raises(BTRDBValueError):
+            RetryPolicy(max_attempts=0)
+        with pytest.raises(BTRDBValueError):
+            RetryPolicy(hedge_percentile=100)
+
+    def test_backoff(self):
+        """
+        Assert the backoff grows exponentially up to the maximum
+        """
+        policy = RetryPolicy(initial_backoff=1, max_backoff=5, multiplier=2, jitter=0)
+        assert [policy.backoff(i) for i in range(4)] == [1, 2, 4, 5]
+
+        policy.jitter = 0.5
+        assert all(0.5 <= policy.backoff(0) <= 1 for _ in range(20))
+
+    def test_call_retries(self):
+        """
+        Assert retryable errors are retried until the call succeeds
+        """
+        policy = RetryPolicy(initial_backoff=0)
+        func = Mock(side_effect=[RpcError(), RpcError(), "ok"])
+        assert policy.call("Nearest", func) == "ok"
+        assert func.call_count == 3
+        assert policy.retries == 2
+
+    def test_call_gives_up(self):
+        """
+        Assert errors are raised when not retryable or attempts run out
+        """
+        policy = RetryPolicy(max_attempts=3, initial_backoff=0)
+
+        func = Mock(side_effect=RpcError(grpc.StatusCode.INVALID_ARGUMENT))
+        with pytest.raises(RpcError):
+            policy.call("Nearest", func)
+        assert func.call_count == 1
+
+        func = Mock(side_effect=RpcError())
+        with pytest.raises(RpcError):
+            policy.call("Nearest", func)
+        assert func.call_count == 3
+
+    def test_hedged_call(self):
+        """
+        Assert slow calls are hedged after the latency percentile
+        """
+        policy = RetryPolicy(hedge_percentile=90, hedge_min_samples=5)
+        for _ in range(5):
+            policy.call("StreamInfo", lambda: None)
+        assert policy.hedge_delay("StreamInfo") < 0.1
+
+        calls = []
+        def func():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(1)
+                return "slow"
+            return "fast"
+
+        assert policy.call("StreamInfo", func) == "fast"
+        assert policy.hedged == 1
+
+
+##########################################################################
+## Endpoint Tests
+##########################################################################
+
+class TestEndpointRetries(object):
+
+    def test_raw_values_resume(self, endpoint):
+        """
+        Assert raw values resume at the last time, skipping received points
+        """
+        endpoint.stub.RawValues = Mock(side_effect=[
+            failing(raw([1, 2, 2], version=7)),
+            iter([raw([2, 2, 3], version=7)]),
+        ])
+
+        results = list(endpoint.rawValues(UU, 0, 10))
+        assert [p.time for values, _ in results for p in values] == [1, 2, 2, 3]
+
+        params = endpoint.stub.RawValues.call_args_list[1][0][0]
+        assert params.start == 2
+        assert params.versionMajor == 7
+
+    def test_aligned_windows_resume(self, endpoint):
+        """
+        Assert aligned windows resume at the next window
+        """
+        endpoint.stub.AlignedWindows = Mock(side_effect=[
+            failing(btrdb_pb2.AlignedWindowsResponse(
+                versionMajor=3, values=[btrdb_pb2.StatPoint(time=16, count=1)]
+            )),
+            iter([btrdb_pb2.AlignedWindowsResponse(
+                versionMajor=3, values=[btrdb_pb2.StatPoint(time=32, count=1)]
+            )]),
+        ])
+
+        results = list(endpoint.alignedWindows(UU, 0, 64, 4))
+        assert [p.time for values, _ in results for p in values] == [16, 32]
+        assert endpoint.stub.AlignedWindows.call_args_list[1][0][0].start == 32
+
+    def test_lookup_streams_not_resumed(self, endpoint):
+        """
+        Assert lookups are only retried if nothing was received
+        """
+        response = btrdb_pb2.LookupStreamsResponse()
+        endpoint.stub.LookupStreams = Mock(side_effect=[failing(), iter([response])])
+        assert len(list(endpoint.lookupStreams("a", False, {}, {}))) == 1
+
+        endpoint.stub.LookupStreams = Mock(side_effect=[failing(response), iter([response])])
+        with pytest.raises(BTrDBError):
+            list(endpoint.lookupStreams("a", False, {}, {}))
+
+    def test_no_policy(self):
+        """
+        Assert calls are not retried without a policy
+        """
+        endpoint = Endpoint(Mock())
+        endpoint.stub = Mock()
+        endpoint.stub.RawValues = Mock(side_effect=[failing(raw([1]))])
+        with pytest.raises(BTrDBError):
+            list(endpoint.rawValues(UU, 0, 10))
@@ -0,0 +1,223 @@
+# tests.utils.test_spool
+# Testing for the btrdb.utils.spool module
+#
+# Author:   PingThings
+# Created:  Mon Oct 19 13:41:02 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_spool.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.spool module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import uuid
+import grpc
+import pytest
+from unittest.mock import Mock, call
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.utils.spool import InsertSpool
+from btrdb.exceptions import ConnectionError, SpoolFull, BTRDBValueError, BTRDBServerError
+
+##########################################################################
+## Test Constants
+##########################################################################
+
+UU1 = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+UU2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+
+
+##########################################################################
+## InsertSpool Tests
+##########################################################################
+
+class TestInsertSpool(object):
+
+    def test_invalid_policies(self, tmp_path):
+        """
+        Assert unknown fsync and merge policies are rejected
+        """
+        with pytest.raises(BTRDBValueError):
+            InsertSpool(str(tmp_path), fsync="sometimes")
+
+        with pytest.raises(BTRDBValueError):
+            InsertSpool(str(tmp_path), merge="overwrite")
+
+    def test_replay_in_order(self, tmp_path):
+        """
+        Assert spooled batches are replayed in order and then removed
+        """
+        spool = InsertSpool(str(tmp_path), segment_bytes=64)
+        spool.append(UU1, [(1, 1.0), (2, 2.0)], "never")
+        spool.append(UU2, [(3, 3.5)], "replace")
+        spool.append(UU1, [(4, 4.0)], "equal")
+        assert spool.pending == 3
+        assert spool.size > 0
+
+        db = BTrDB(Mock(Endpoint))
+        assert spool.replay(db) == 3
+        assert db.ep.insert.call_args_list == [
+            call(UU1, [(1, 1.0), (2, 2.0)], "never"),
+            call(UU2, [(3, 3.5)], "replace"),
+            call(UU1, [(4, 4.0)], "equal"),
+        ]
+        assert spool.pending == 0
+        assert spool.size == 0
+
+        metrics = spool.metrics()
+        assert metrics["spooled_batches"] == 3
+        assert metrics["replayed_points"] == 4
+
+    def test_merge_override(self, tmp_path):
+        """
+        Assert the spool merge policy overrides the recorded policy
+        """
+        spool = InsertSpool(str(tmp_path), merge="retain")
+        spool.append(UU1, [(1, 1.0)], "never")
+
+        db = BTrDB(Mock(Endpoint))
+        spool.replay(db)
+        db.ep.insert.assert_called_once_with(UU1, [(1, 1.0)], "retain")
+
+    def test_replay_resumes_after_failure(self, tmp_path):
+        """
+        Assert a failed replay resumes with the failed batch
+        """
+        spool = InsertSpool(str(tmp_path))
+        for i in range(3):
+            spool.append(UU1, [(i, float(i))])
+
+        db = BTrDB(Mock(Endpoint))
+        db.ep.insert = Mock(side_effect=[1, ConnectionError("down")])
+        with pytest.raises(ConnectionError):
+            spool.replay(db)
+        assert spool.pending == 2
+
+        # a new spool object picks up the cursor from disk
+        spool = InsertSpool(str(tmp_path))
+        assert spool.pending == 2
+
+        db.ep.insert = Mock(return_value=2)
+        assert spool.replay(db) == 2
+        assert db.ep.insert.call_args_list == [
+            call(UU1, [(1, 1.0)], "never"), call(UU1, [(2, 2.0)], "never"),
+        ]
+
+    def test_rejected_batch_dead_lettered(self, tmp_path):
+        """
+        Assert a batch the server rejects is dead-lettered and does not block
+        the batches spooled after it
+        """
+        spool = InsertSpool(str(tmp_path))
+        for i in range(3):
+            spool.append(UU1, [(i, float(i))])
+
+        db = BTrDB(Mock(Endpoint))
+        db.ep.insert = Mock(side_effect=[1, BTRDBServerError("rejected"), 3])
+        assert spool.replay(db) == 2
+        assert spool.pending == 0
+        assert list(spool.dead_letters()) == [(UU1, [(1, 1.0)], "never")]
+
+        metrics = spool.metrics()
+        assert metrics["replayed_batches"] == 2
+        assert metrics["dead_letter_batches"] == 1
+        assert metrics["dead_letter_points"] == 1
+
+        # new inserts are still accepted and replayed
+        spool.append(UU2, [(4, 4.0)])
+        db.ep.insert = Mock(return_value=4)
+        assert spool.replay(db) == 1
+
+    def test_torn_record_ignored(self, tmp_path):
+        """
+        Assert a torn record at the tail of a segment is not replayed
+        """
+        spool = InsertSpool(str(tmp_path))
+        spool.append(UU1, [(1, 1.0)])
+        spool.append(UU1, [(2, 2.0)])
+        spool.close()
+
+        segment = [n for n in os.listdir(str(tmp_path)) if n.endswith(".spool")][0]
+        path = os.path.join(str(tmp_path), segment)
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 3)
+
+        spool = InsertSpool(str(tmp_path))
+        assert spool.pending == 1
+
+        db = BTrDB(Mock(Endpoint))
+        spool.replay(db)
+        db.ep.insert.assert_called_once_with(UU1, [(1, 1.0)], "never")
+        assert spool.size == 0
+
+    def test_spool_full(self, tmp_path):
+        """
+        Assert spooling beyond max_bytes raises SpoolFull
+        """
+        spool = InsertSpool(str(tmp_path), max_bytes=100)
+        spool.append(UU1, [(1, 1.0)])
+        with pytest.raises(SpoolFull):
+            spool.append(UU1, [(i, 1.0) for i in range(10)])
+        assert spool.pending == 1
+
+
+##########################################################################
+## Stream Integration Tests
+##########################################################################
+
+class TestStreamSpooling(object):
+
+    def test_insert_spools_on_connection_error(self, tmp_path):
+        """
+        Assert inserts are spooled while unreachable and replayed in order
+        """
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(side_effect=ConnectionError("down"))
+        db = BTrDB(endpoint)
+        db.enable_spool(str(tmp_path))
+        stream = db.stream_from_uuid(UU1)
+
+        assert stream.insert([(1, 1.0)]) is None
+        assert db.spool.pending == 1
+
+        endpoint.insert = Mock(return_value=7)
+        assert stream.insert([(2, 2.0)]) == 7
+        assert endpoint.insert.call_args_list == [
+            call(UU1, [(1, 1.0)], "never"), call(UU1, [(2, 2.0)], "never"),
+        ]
+        assert db.spool.pending == 0
+
+    def test_insert_spools_on_unavailable(self, tmp_path):
+        """
+        Assert inserts failing with UNAVAILABLE are spooled
+        """
+        error = grpc.RpcError()
+        error.code = lambda: grpc.StatusCode.UNAVAILABLE
+        error.details = lambda: "connection reset"
+
+        endpoint = Endpoint(Mock())
+        endpoint.stub = Mock()
+        endpoint.stub.Insert = Mock(side_effect=error)
+        db = BTrDB(endpoint)
+        db.enable_spool(str(tmp_path))
+
+        assert db.stream_from_uuid(UU1).insert([(1, 1.0)]) is None
+        assert db.spool.pending == 1
+
+    def test_insert_raises_without_spool(self):
+        """
+        Assert connection errors are raised when no spool is enabled
+        """
+        endpoint = Mock(Endpoint)
+        endpoint.insert = Mock(side_effect=ConnectionError("down"))
+        stream = BTrDB(endpoint).stream_from_uuid(UU1)
+
+        with pytest.raises(ConnectionError):
+            stream.insert([(1, 1.0)])
@@ -0,0 +1,176 @@
+# tests.utils.test_tracing
+# Testing for the btrdb.utils.tracing module
+#
+# Author:   PingThings
+# Created:  Thu Oct 29 13:26:08 2026 -0400
+#
+# For license information, see LICENSE.txt
+# ID: test_tracing.py [] allen@pingthings.io $
+
+"""
+Testing for the btrdb.utils.tracing module
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import uuid
+from concurrent import futures
+from unittest.mock import Mock, patch
+
+import grpc
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from btrdb.conn import BTrDB
+from btrdb.endpoint import Endpoint
+from btrdb.stream import StreamSet
+from btrdb.grpcinterface import btrdb_pb2, btrdb_pb2_grpc
+from btrdb.utils import tracing
+
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+UU = uuid.UUID('0d22a53b-e2ef-4e0a-ab89-b2d48fb2592a')
+UU2 = uuid.UUID('17dbe387-89ea-42b6-864b-f505cdb483f5')
+
+EXPORTER = InMemorySpanExporter()
+
+
+class Servicer(btrdb_pb2_grpc.BTrDBServicer):
+
+    def __init__(self):
+        self.metadata = []
+
+    def RawValues(self, request, context):
+        self.metadata.append(dict(context.invocation_metadata()))
+        yield btrdb_pb2.RawValuesResponse(
+            versionMajor=4, values=[btrdb_pb2.RawPoint(time=t, value=t) for t in range(5)],
+        )
+
+    def Insert(self, request, context):
+        self.metadata.append(dict(context.invocation_metadata()))
+        return btrdb_pb2.InsertResponse(versionMajor=5)
+
+
+@pytest.fixture(scope="module")
+def servicer():
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(EXPORTER))
+    trace.set_tracer_provider(provider)
+
+    servicer = Servicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    btrdb_pb2_grpc.add_BTrDBServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    servicer.address = "127.0.0.1:{}".format(port)
+    yield servicer
+    server.stop(None)
+
+
+@pytest.fixture
+def db(servicer):
+    EXPORTER.clear()
+    servicer.metadata.clear()
+    return BTrDB(Endpoint(grpc.insecure_channel(servicer.address)))
+
+
+def spans(name):
+    return [span for span in EXPORTER.get_finished_spans() if span.name == name]
+
+
+##########################################################################
+## Tracing Tests
+##########################################################################
+
+class TestTracing(object):
+
+    def test_values_span(self, db, servicer):
+        """
+        Assert queries create a span with a child RPC span and send the trace
+        context to the server
+        """
+        assert len(db.stream_from_uuid(UU).values(10, 20, version=3)) == 5
+
+        query, = spans("btrdb.values")
+        assert query.attributes["btrdb.uuid"] == str(UU)
+        assert query.attributes["btrdb.start"] == 10
+        assert query.attributes["btrdb.end"] == 20
+        assert query.attributes["btrdb.version"] == 3
+        assert query.attributes["btrdb.points"] == 5
+
+        rpc, = spans("BTrDB/RawValues")
+        assert rpc.parent.span_id == query.context.span_id
+        assert rpc.attributes["btrdb.points"] == 5
+        assert rpc.attributes["btrdb.bytes_received"] > 0
+
+        traceparent = servicer.metadata[0]["traceparent"]
+        assert "{:032x}-{:016x}".format(rpc.context.trace_id, rpc.context.span_id) in traceparent
+
+    def test_insert_span(self, db):
+        """
+        Assert inserts record the number of points and version
+        """
+        db.stream_from_uuid(UU).insert(iter([(1, 1.0), (2, 2.0), (3, 3.0)]))
+
+        insert, = spans("btrdb.insert")
+        assert insert.attributes["btrdb.points"] == 3
+        assert insert.attributes["btrdb.version"] == 5
+
+        # the batch is sent from another thread in the same trace
+        rpc, = spans("BTrDB/Insert")
+        assert rpc.parent.span_id == insert.context.span_id
+
+    def test_streamset_span(self, db):
+        """
+        Assert StreamSet materializations parent the per-stream queries
+        """
+        streams = StreamSet([db.stream_from_uuid(UU), db.stream_from_uuid(UU2)])
+        streams.pin_versions({UU: 1, UU2: 1})
+        streams.filter(start=1, end=100).values()
+
+        materialize, = spans("btrdb.streamset.values")
+        assert materialize.attributes["btrdb.streams"] == 2
+        assert materialize.attributes["btrdb.points"] == 10
+        assert len(spans("BTrDB/RawValues")) == 2
+        assert all(s.context.trace_id == materialize.context.trace_id for s in spans("BTrDB/RawValues"))
+
+    def test_disabled(self, db, servicer):
+        """
+        Assert no spans or metadata are created when tracing is disabled
+        """
+        tracing.enabled = False
+        try:
+            db.stream_from_uuid(UU).values(10, 20)
+        finally:
+            tracing.enabled = True
+
+        assert EXPORTER.get_finished_spans() == ()
+        assert "traceparent" not in servicer.metadata[0]
+
+    def test_not_recording(self):
+        """
+        Assert calls are passed through without counting responses when the
+        span is not recording
+        """
+        details = Mock(method="/v5api.BTrDB/RawValues", metadata=None)
+        request, call = Mock(), Mock()
+        continuation = Mock(return_value=call)
+
+        interceptor = tracing.TracingInterceptor()
+        with patch.object(trace, "get_tracer", return_value=trace.NoOpTracer()):
+            assert interceptor.intercept_unary_stream(continuation, details, request) is call
+            assert interceptor.intercept_unary_unary(continuation, details, request) is call
+
+        continuation.assert_called_with(details, request)
+        request.ByteSize.assert_not_called()